@@ -11,7 +11,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import hashlib
+import time
 
 from oslo.config import cfg
 import requests
@@ -25,6 +27,7 @@ from heat.openstack.common.gettextutils import _
 from heat.openstack.common import importutils
 from heat.openstack.common import jsonutils as json
 from heat.openstack.common import log as logging
+from heat.openstack.common import timeutils
 
 gettextutils.install('heat')
 
@@ -41,7 +44,16 @@ opts = [
                 default=[],
                 help=_('Allowed keystone endpoints for auth_uri when '
                        'multi_cloud is enabled. At least one endpoint needs '
-                       'to be specified.'))
+                       'to be specified.')),
+    cfg.IntOpt('cache_size',
+               default=1000,
+               help=_('Maximum number of successful EC2 signature '
+                      'validations to cache. Set to 0 to disable caching.')),
+    cfg.IntOpt('cache_ttl',
+               default=60,
+               help=_('Seconds for which a successful EC2 signature '
+                      'validation is cached, if the token it returned does '
+                      'not expire sooner.'))
 ]
 cfg.CONF.register_opts(opts, group='ec2authtoken')
 
@@ -52,6 +64,10 @@ class EC2Token(wsgi.Middleware):
     def __init__(self, app, conf):
         self.conf = conf
         self.application = app
+        # Reuse connections to keystone across requests
+        self._session = requests.Session()
+        # Maps request cache keys to (expiry time, auth headers), oldest first
+        self._auth_cache = collections.OrderedDict()
 
     def _conf_get(self, name):
         # try config from paste-deploy first
@@ -113,6 +129,43 @@ class EC2Token(wsgi.Middleware):
 
         return access
 
+    @staticmethod
+    def _auth_cache_key(ec2_uri, access, signature, req, params, body_hash):
+        params_hash = hashlib.sha256(json.dumps(
+            [req.host, req.method, req.path,
+             sorted(params.items()), body_hash])).hexdigest()
+        return (ec2_uri, access, signature, params_hash)
+
+    def _auth_cache_get(self, key):
+        try:
+            expiry, auth_headers = self._auth_cache.pop(key)
+        except KeyError:
+            return None
+        if expiry <= time.time():
+            return None
+        # most recently used entries are evicted last
+        self._auth_cache[key] = (expiry, auth_headers)
+        return auth_headers
+
+    def _auth_cache_put(self, key, auth_headers, token):
+        cache_size = int(self._conf_get('cache_size'))
+        if cache_size <= 0:
+            return
+        ttl = int(self._conf_get('cache_ttl'))
+        expires = token.get('expires')
+        if expires:
+            token_expiry = timeutils.normalize_time(
+                timeutils.parse_isotime(expires))
+            ttl = min(ttl, timeutils.delta_seconds(timeutils.utcnow(),
+                                                   token_expiry))
+        if ttl <= 0:
+            return
+
+        self._auth_cache.pop(key, None)
+        while len(self._auth_cache) >= cache_size:
+            self._auth_cache.popitem(last=False)
+        self._auth_cache[key] = (time.time() + ttl, auth_headers)
+
     @webob.dec.wsgify(RequestClass=wsgi.Request)
     def __call__(self, req):
         if not self._conf_get('multi_cloud'):
@@ -181,18 +234,30 @@ class EC2Token(wsgi.Middleware):
                                     'headers': req.headers,
                                     'body_hash': body_hash
                                     }}
+        keystone_ec2_uri = self._conf_get_keystone_ec2_uri(auth_uri)
+
+        # Reuse the result of an identical request that keystone validated
+        # recently
+        cache_key = self._auth_cache_key(keystone_ec2_uri, access, signature,
+                                         req, auth_params, body_hash)
+        auth_headers = self._auth_cache_get(cache_key)
+        if auth_headers is not None:
+            LOG.info(_("AWS authentication successful (cached)."))
+            req.headers.update(auth_headers)
+            return self.application
+
         creds_json = json.dumps(creds)
         headers = {'Content-Type': 'application/json'}
 
-        keystone_ec2_uri = self._conf_get_keystone_ec2_uri(auth_uri)
         LOG.info(_('Authenticating with %s') % keystone_ec2_uri)
-        response = requests.post(keystone_ec2_uri, data=creds_json,
-                                 headers=headers)
+        response = self._session.post(keystone_ec2_uri, data=creds_json,
+                                      headers=headers)
         result = response.json()
         try:
-            token_id = result['access']['token']['id']
-            tenant = result['access']['token']['tenant']['name']
-            tenant_id = result['access']['token']['tenant']['id']
+            token = result['access']['token']
+            token_id = token['id']
+            tenant = token['tenant']['name']
+            tenant_id = token['tenant']['id']
             LOG.info(_("AWS authentication successful."))
         except (AttributeError, KeyError):
             LOG.info(_("AWS authentication failure."))
@@ -213,15 +278,18 @@ class EC2Token(wsgi.Middleware):
         # Authenticated!
         ec2_creds = {'ec2Credentials': {'access': access,
                                         'signature': signature}}
-        req.headers['X-Auth-EC2-Creds'] = json.dumps(ec2_creds)
-        req.headers['X-Auth-Token'] = token_id
-        req.headers['X-Tenant-Name'] = tenant
-        req.headers['X-Tenant-Id'] = tenant_id
-        req.headers['X-Auth-URL'] = auth_uri
-
         metadata = result['access'].get('metadata', {})
         roles = metadata.get('roles', [])
-        req.headers['X-Roles'] = ','.join(roles)
+        auth_headers = {
+            'X-Auth-EC2-Creds': json.dumps(ec2_creds),
+            'X-Auth-Token': token_id,
+            'X-Tenant-Name': tenant,
+            'X-Tenant-Id': tenant_id,
+            'X-Auth-URL': auth_uri,
+            'X-Roles': ','.join(roles),
+        }
+        self._auth_cache_put(cache_key, auth_headers, token)
+        req.headers.update(auth_headers)
 
         return self.application
 
@@ -287,6 +287,7 @@ def map_remote_error(ex):
         denied_errors = ('Forbidden', 'NotAuthorized')
         already_exists_errors = ('StackExists')
         invalid_action_errors = ('ActionInProgress',)
+        unavailable_errors = ('EngineOverloaded',)
 
         ex_type = ex.__class__.__name__
 
@@ -301,6 +302,8 @@ def map_remote_error(ex):
             return AlreadyExistsError(detail=six.text_type(ex))
         elif ex_type in invalid_action_errors:
             return HeatActionInProgressError(detail=six.text_type(ex))
+        elif ex_type in unavailable_errors:
+            return HeatServiceUnavailableError(detail=six.text_type(ex))
         else:
             # Map everything else to internal server error for now
             return HeatInternalFailureError(detail=six.text_type(ex))
@@ -57,6 +57,7 @@ class FaultWrapper(wsgi.Middleware):
     error_map = {
         'AttributeError': webob.exc.HTTPBadRequest,
         'ActionInProgress': webob.exc.HTTPConflict,
+        'EngineOverloaded': webob.exc.HTTPServiceUnavailable,
         'ValueError': webob.exc.HTTPBadRequest,
         'StackNotFound': webob.exc.HTTPNotFound,
         'NotFound': webob.exc.HTTPNotFound,
@@ -89,7 +89,8 @@ class EventController(object):
                                              limit=limit,
                                              marker=marker,
                                              sort_keys=sort_keys,
-                                             sort_dir=sort_dir)
+                                             sort_dir=sort_dir,
+                                             detail=detail)
         keys = None if detail else summary_keys
 
         return [format_event(req, e, keys) for e in events if filter_func(e)]
@@ -122,8 +123,15 @@ class EventController(object):
         else:
             res_match = lambda e: e[engine_api.EVENT_RES_NAME] == resource_name
 
+            # Filter in the engine too, so that pages are not cut short
+            filters = dict(filter_params or {})
+            names = filters.get(engine_api.EVENT_RES_NAME, resource_name)
+            if resource_name in (names if isinstance(names, list)
+                                 else [names]):
+                filters[engine_api.EVENT_RES_NAME] = resource_name
+
             events = self._event_list(req, identity, res_match,
-                                      filters=filter_params, **params)
+                                      filters=filters, **params)
             if not events:
                 msg = _('No events found for resource %s') % resource_name
                 raise exc.HTTPNotFound(msg)
@@ -141,7 +149,10 @@ class EventController(object):
             return (ev[engine_api.EVENT_RES_NAME] == resource_name and
                     identity.event_id == event_id)
 
-        events = self._event_list(req, identity, event_match, True)
+        filters = {engine_api.EVENT_RES_NAME: resource_name,
+                   'uuid': event_id}
+        events = self._event_list(req, identity, event_match, True,
+                                  filters=filters)
         if not events:
             raise exc.HTTPNotFound(_('No event %s found') % event_id)
 
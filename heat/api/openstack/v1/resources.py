@@ -106,13 +106,19 @@ class ResourceController(object):
     def metadata(self, req, identity, resource_name):
         """
         Gets metadata information for a resource
-        """
 
-        res = self.rpc_client.describe_stack_resource(req.context,
-                                                      identity,
-                                                      resource_name)
+        An If-None-Match header containing the ETag of a previous response
+        results in a 304 Not Modified response if the metadata is unchanged.
+        """
+        etag = req.headers.get('If-None-Match')
+        if etag:
+            etag = etag.split(',')[0].strip()
+            if etag.startswith('W/'):
+                etag = etag[2:]
+            etag = etag.strip('"')
 
-        return {engine_api.RES_METADATA: res[engine_api.RES_METADATA]}
+        return self.rpc_client.describe_stack_resource_metadata(
+            req.context, identity, resource_name, etag=etag)
 
     @util.identified_stack
     def signal(self, req, identity, resource_name, body=None):
@@ -122,10 +128,23 @@ class ResourceController(object):
                                         details=body)
 
 
+class ResourceSerializer(serializers.JSONResponseSerializer):
+    """Handles serialization of specific controller method responses."""
+
+    def metadata(self, response, result):
+        response.etag = result[engine_api.RES_METADATA_ETAG]
+        if engine_api.RES_METADATA not in result:
+            response.status = 304
+            return response
+        metadata = result[engine_api.RES_METADATA]
+        self.default(response, {engine_api.RES_METADATA: metadata})
+        return response
+
+
 def create_resource(options):
     """
     Resources resource factory method.
     """
     deserializer = wsgi.JSONRequestDeserializer()
-    serializer = serializers.JSONResponseSerializer()
+    serializer = ResourceSerializer()
     return wsgi.Resource(ResourceController(options), deserializer, serializer)
@@ -17,17 +17,26 @@
   CLI interface for heat management.
 """
 
+import json
+import resource
 import sys
+import time
 
 from oslo.config import cfg
+from oslo import messaging
 
+from heat.common import context
+from heat.common import messaging as rpc_messaging
 from heat.db import api
 from heat.db import utils
 from heat.openstack.common import log
+from heat.rpc import client as rpc_client
 from heat import version
 
 
 CONF = cfg.CONF
+CONF.import_opt('engine_heartbeat_timeout', 'heat.common.config')
+CONF.import_opt('engine_life_check_timeout', 'heat.common.config')
 
 
 def do_db_version():
@@ -47,7 +56,102 @@ def purge_deleted():
     """
     Remove database records that have been previously soft deleted
     """
-    utils.purge_deleted(CONF.command.age, CONF.command.granularity)
+    def print_counts(counts):
+        print(', '.join('%s: %d' % (table, counts[table])
+                        for table in sorted(counts)))
+
+    counts = utils.purge_deleted(CONF.command.age,
+                                 CONF.command.granularity,
+                                 batch_size=CONF.command.batch_size,
+                                 dry_run=CONF.command.dry_run,
+                                 batch_pause=CONF.command.batch_pause,
+                                 progress=print_counts)
+    if CONF.command.dry_run:
+        print_counts(counts)
+
+
+def generate_plugin_manifest():
+    """
+    Write a manifest of the modules providing each resource type and
+    constraint, for use as the plugin_manifest option.
+    """
+    from heat.engine import resources
+
+    manifest = json.dumps(resources.generate_manifest(), indent=2,
+                          separators=(',', ': '), sort_keys=True)
+    if CONF.command.path:
+        with open(CONF.command.path, 'w') as manifest_fd:
+            manifest_fd.write(manifest + '\n')
+    else:
+        print(manifest)
+
+
+def benchmark_startup():
+    """
+    Report the time taken and the memory used to load the resource plugins,
+    as an engine worker does at startup.
+    """
+    def rss_kb():
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start_rss = rss_kb()
+    start = time.time()
+    from heat.engine import resources
+    resources.initialise()
+    elapsed = time.time() - start
+
+    env = resources.global_env()
+    if CONF.command.load_all:
+        for type_name in env.get_types():
+            env.get_class(type_name)
+        elapsed = time.time() - start
+
+    print('Plugin loading: %s' % ('lazy' if CONF.plugin_manifest
+                                  else 'eager'))
+    print('Resource types: %d' % len(env.get_types()))
+    print('Startup time: %.3fs' % elapsed)
+    print('Max RSS growth: %d KiB' % (rss_kb() - start_rss))
+
+
+def print_engine_stats(method):
+    """
+    Print the statistics returned by the given EngineClient method for each
+    engine named on the command line, or for each engine with a recent
+    heartbeat.
+    """
+    engine_ids = CONF.command.engine_ids
+    if not engine_ids:
+        heartbeats = api.engine_heartbeat_get_all_alive(
+            CONF.engine_heartbeat_timeout)
+        engine_ids = [hb.engine_id for hb in heartbeats]
+
+    rpc_messaging.setup()
+    engine_client = rpc_client.EngineClient()
+    ctxt = context.get_admin_context()
+    stats = {}
+    for engine_id in engine_ids:
+        try:
+            stats[engine_id] = getattr(engine_client, method)(
+                ctxt, engine_id, timeout=CONF.engine_life_check_timeout)
+        except messaging.MessagingTimeout:
+            stats[engine_id] = None
+    print(json.dumps(stats, indent=2, separators=(',', ': '),
+                     sort_keys=True))
+
+
+def queue_stats():
+    """
+    Print the numbers of stack actions running and queued on each engine.
+    """
+    print_engine_stats('queue_stats')
+
+
+def db_stats():
+    """
+    Print the database statements made by each RPC method and stack action,
+    and the use of the connection pool, on each engine.
+    """
+    print_engine_stats('db_stats')
 
 
 def add_command_parsers(subparsers):
@@ -67,6 +171,36 @@ def add_command_parsers(subparsers):
         '-g', '--granularity', default='days',
         choices=['days', 'hours', 'minutes', 'seconds'],
         help=_('Granularity to use for age argument, defaults to days.'))
+    parser.add_argument(
+        '-b', '--batch-size', type=int, default=1000,
+        help=_('Number of stacks to purge in each transaction, defaults '
+               'to 1000.'))
+    parser.add_argument(
+        '-p', '--batch-pause', type=float, default=0,
+        help=_('Seconds to wait between batches, defaults to 0.'))
+    parser.add_argument(
+        '-n', '--dry-run', action='store_true',
+        help=_('Only count the records that would be purged.'))
+
+    parser = subparsers.add_parser('generate_plugin_manifest')
+    parser.set_defaults(func=generate_plugin_manifest)
+    parser.add_argument('path', nargs='?',
+                        help=_('File to write the manifest to, defaults to '
+                               'standard output.'))
+
+    parser = subparsers.add_parser('benchmark_startup')
+    parser.set_defaults(func=benchmark_startup)
+    parser.add_argument(
+        '-a', '--load-all', action='store_true',
+        help=_('Also load the class of every resource type.'))
+
+    for name, func in (('queue_stats', queue_stats),
+                       ('db_stats', db_stats)):
+        parser = subparsers.add_parser(name)
+        parser.set_defaults(func=func)
+        parser.add_argument('engine_ids', nargs='*',
+                            help=_('Engines to report on, defaults to all '
+                                   'engines with a recent heartbeat.'))
 
 command_opt = cfg.SubCommandOpt('command',
                                 title='Commands',
@@ -95,6 +95,13 @@ engine_opts = [
     cfg.ListOpt('plugin_dirs',
                 default=['/usr/lib64/heat', '/usr/lib/heat'],
                 help='List of directories to search for plug-ins.'),
+    cfg.StrOpt('plugin_manifest',
+               default='',
+               help=_('Manifest of the resource types and constraints '
+                      'provided by each plug-in module, as written by '
+                      '"heat-manage generate_plugin_manifest". When set, '
+                      'plug-in modules are only imported when first '
+                      'needed.')),
     cfg.StrOpt('environment_dir',
                default='/etc/heat/environment.d',
                help='The directory to search for environment files.'),
@@ -109,6 +116,22 @@ engine_opts = [
     cfg.IntOpt('max_resources_per_stack',
                default=1000,
                help='Maximum resources allowed per top-level stack.'),
+    cfg.BoolOpt('bulk_create_resources',
+                default=False,
+                help=_('Store all of the resources of a new stack in the '
+                       'database at once, in the INIT_COMPLETE state, when '
+                       'the stack is first stored. Otherwise each resource '
+                       'is stored when its creation starts.')),
+    cfg.IntOpt('group_scale_batch_size',
+               default=0,
+               help=_('Maximum number of members that are created or '
+                      'deleted at once when a scaling group or resource '
+                      'group changes size. Larger changes are made in '
+                      'batches. 0 means no limit.')),
+    cfg.IntOpt('group_scale_batch_pause',
+               default=0,
+               help=_('Number of seconds to pause between the batches of '
+                      'a scaling group or resource group size change.')),
     cfg.IntOpt('max_stacks_per_tenant',
                default=100,
                help=_('Maximum number of stacks any one tenant may have'
@@ -124,6 +147,10 @@ engine_opts = [
                help=_('Maximum events that will be available per stack. Older'
                       ' events will be deleted when this is reached. Set to 0'
                       ' for unlimited events per stack.')),
+    cfg.BoolOpt('compress_event_properties',
+                default=False,
+                help=_('Compress the resource properties recorded with'
+                       ' events, when that makes them smaller.')),
     cfg.IntOpt('stack_action_timeout',
                default=3600,
                help=_('Timeout in seconds for stack action (ie. create or'
@@ -132,6 +159,77 @@ engine_opts = [
                default=2,
                help=_('RPC timeout for the engine liveness check that is used'
                       ' for stack locking.')),
+    cfg.BoolOpt('async_stack_validation',
+                default=False,
+                help=_('Validate new stacks in the background, after the '
+                       'create request has returned the stack identifier. '
+                       'Validation failures are then reported as the stack '
+                       'status and an event, rather than as an error '
+                       'response.')),
+    cfg.IntOpt('engine_heartbeat_interval',
+               default=10,
+               help=_('Interval in seconds at which each engine records a '
+                      'heartbeat in the database. The liveness of the engine '
+                      'holding a stack lock is then checked by reading its '
+                      'heartbeat rather than with an RPC call. Set to 0 to '
+                      'disable heartbeats.')),
+    cfg.IntOpt('engine_heartbeat_timeout',
+               default=60,
+               help=_('Number of seconds after its last heartbeat that an '
+                      'engine is considered dead, and the stack locks it '
+                      'holds are released.')),
+    cfg.BoolOpt('software_config_direct_db',
+                default=True,
+                help=_('Software config and deployment resources access the'
+                       ' engine database directly instead of calling the'
+                       ' Orchestration API through heatclient.')),
+    cfg.IntOpt('signal_wait_recheck_interval',
+               default=30,
+               help=_('Seconds between state checks by resources waiting for'
+                      ' a signal, such as wait conditions and software'
+                      ' deployments, when no signal notification has woken'
+                      ' them. Set to 0 to check on every scheduler step.')),
+    cfg.IntOpt('metadata_cache_ttl',
+               default=10,
+               help=_('Seconds for which an engine caches resource metadata'
+                      ' served to servers. Changes made through other'
+                      ' engines may be seen this much later. Set to 0 to'
+                      ' disable the cache.')),
+    cfg.IntOpt('metadata_cache_size',
+               default=10000,
+               help=_('Maximum number of resources whose metadata an engine'
+                      ' caches.')),
+    cfg.BoolOpt('nested_stack_rpc_dispatch',
+                default=False,
+                help=_('Dispatch actions on nested stacks over RPC to any'
+                       ' engine, which runs them under its own stack lock,'
+                       ' rather than running them in the engine processing'
+                       ' the parent stack.')),
+    cfg.IntOpt('max_concurrent_stack_actions',
+               default=0,
+               help=_('Maximum number of stack actions, such as creates,'
+                      ' updates and deletes, that an engine runs at once.'
+                      ' Further actions are queued, and the queued actions'
+                      ' of the tenants with the fewest running actions are'
+                      ' started first. Actions on nested stacks are not'
+                      ' limited. Set to 0 for no limit.')),
+    cfg.IntOpt('max_queued_stack_actions',
+               default=100,
+               help=_('Maximum number of stack actions an engine queues'
+                      ' when it is running max_concurrent_stack_actions.'
+                      ' Further actions are rejected, so that they can be'
+                      ' retried on a less busy engine.')),
+    cfg.IntOpt('slow_query_time',
+               default=0,
+               help=_('Log database queries that take at least this many'
+                      ' milliseconds. Set to 0 to log none.')),
+    cfg.IntOpt('repeated_query_limit',
+               default=0,
+               help=_('Log database queries that are repeated more than'
+                      ' this many times while handling a single RPC call'
+                      ' or stack action, which usually means that rows'
+                      ' are being loaded one at a time. Set to 0 to log'
+                      ' none.')),
     cfg.StrOpt('onready',
                help=_('onready allows you to send a notification when the'
                       ' heat processes are ready to serve.  This is either a'
@@ -173,7 +271,13 @@ clients_opts = [
     cfg.BoolOpt('insecure',
                 default=False,
                 help=_("If set, then the server's certificate will not "
-                       "be verified."))]
+                       "be verified.")),
+    cfg.IntOpt('max_concurrent_calls',
+               default=0,
+               help=_('Maximum number of resource handle_* and '
+                      'check_*_complete calls using this client that an '
+                      'engine makes at once. Further calls wait for a free '
+                      'slot. 0 means no limit.'))]
 
 heat_client_opts = [
     cfg.StrOpt('url',
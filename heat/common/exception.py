@@ -348,6 +348,11 @@ class ActionInProgress(HeatException):
                 "in progress.")
 
 
+class EngineOverloaded(HeatException):
+    msg_fmt = _("The engine is too busy to start another stack action; "
+                "please try again later.")
+
+
 class SoftwareConfigMissing(HeatException):
     msg_fmt = _("The config (%(software_config_id)s) could not be found.")
 
@@ -80,6 +80,10 @@ def resource_get(context, resource_id):
     return IMPL.resource_get(context, resource_id)
 
 
+def resource_update(context, resource_id, values):
+    return IMPL.resource_update(context, resource_id, values)
+
+
 def resource_get_all(context):
     return IMPL.resource_get_all(context)
 
@@ -88,10 +92,18 @@ def resource_create(context, values):
     return IMPL.resource_create(context, values)
 
 
+def resource_create_all(context, values):
+    return IMPL.resource_create_all(context, values)
+
+
 def resource_exchange_stacks(context, resource_id1, resource_id2):
     return IMPL.resource_exchange_stacks(context, resource_id1, resource_id2)
 
 
+def resource_metadata_set_all(context, metadata):
+    return IMPL.resource_metadata_set_all(context, metadata)
+
+
 def resource_get_all_by_stack(context, stack_id):
     return IMPL.resource_get_all_by_stack(context, stack_id)
 
@@ -153,6 +165,10 @@ def stack_delete(context, stack_id):
     return IMPL.stack_delete(context, stack_id)
 
 
+def stack_lock_get_engine_id(stack_id):
+    return IMPL.stack_lock_get_engine_id(stack_id)
+
+
 def stack_lock_create(stack_id, engine_id):
     return IMPL.stack_lock_create(stack_id, engine_id)
 
@@ -165,6 +181,22 @@ def stack_lock_release(stack_id, engine_id):
     return IMPL.stack_lock_release(stack_id, engine_id)
 
 
+def stack_lock_release_dead_engines(timeout):
+    return IMPL.stack_lock_release_dead_engines(timeout)
+
+
+def engine_heartbeat_update(engine_id, hostname):
+    return IMPL.engine_heartbeat_update(engine_id, hostname)
+
+
+def engine_heartbeat_alive(engine_id, timeout):
+    return IMPL.engine_heartbeat_alive(engine_id, timeout)
+
+
+def engine_heartbeat_get_all_alive(timeout):
+    return IMPL.engine_heartbeat_get_all_alive(timeout)
+
+
 def user_creds_create(context):
     return IMPL.user_creds_create(context)
 
@@ -186,23 +218,27 @@ def event_get_all(context):
 
 
 def event_get_all_by_tenant(context, limit=None, marker=None,
-                            sort_keys=None, sort_dir=None, filters=None):
+                            sort_keys=None, sort_dir=None, filters=None,
+                            detail=False):
     return IMPL.event_get_all_by_tenant(context,
                                         limit=limit,
                                         marker=marker,
                                         sort_keys=sort_keys,
                                         sort_dir=sort_dir,
-                                        filters=filters)
+                                        filters=filters,
+                                        detail=detail)
 
 
 def event_get_all_by_stack(context, stack_id, limit=None, marker=None,
-                           sort_keys=None, sort_dir=None, filters=None):
+                           sort_keys=None, sort_dir=None, filters=None,
+                           detail=False):
     return IMPL.event_get_all_by_stack(context, stack_id,
                                        limit=limit,
                                        marker=marker,
                                        sort_keys=sort_keys,
                                        sort_dir=sort_dir,
-                                       filters=filters)
+                                       filters=filters,
+                                       detail=detail)
 
 
 def event_count_all_by_stack(context, stack_id):
@@ -297,6 +333,14 @@ def snapshot_delete(context, snapshot_id):
     return IMPL.snapshot_delete(context, snapshot_id)
 
 
+def db_stats():
+    return IMPL.db_stats()
+
+
+def track_statements(name):
+    return IMPL.track_statements(name)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return IMPL.db_sync(engine, version=version)
@@ -12,11 +12,15 @@
 #    under the License.
 
 '''Implementation of SQLAlchemy backend.'''
-from datetime import datetime
 from datetime import timedelta
+import hashlib
 import sys
+import time
+import uuid
+import zlib
 
 from oslo.config import cfg
+from oslo.db import exception as db_exception
 from oslo.db.sqlalchemy import session as db_session
 from oslo.db.sqlalchemy import utils
 import sqlalchemy
@@ -28,10 +32,14 @@ from heat.common import exception
 from heat.db.sqlalchemy import filters as db_filters
 from heat.db.sqlalchemy import migration
 from heat.db.sqlalchemy import models
+from heat.db.sqlalchemy import profiling
 from heat.openstack.common.gettextutils import _
+from heat.openstack.common import jsonutils
+from heat.openstack.common import timeutils
 
 CONF = cfg.CONF
 CONF.import_opt('max_events_per_stack', 'heat.common.config')
+CONF.import_opt('compress_event_properties', 'heat.common.config')
 
 _facade = None
 
@@ -41,6 +49,7 @@ def get_facade():
 
     if not _facade:
         _facade = db_session.EngineFacade.from_config(CONF)
+        profiling.attach(_facade.get_engine())
     return _facade
 
 get_engine = lambda: get_facade().get_engine()
@@ -88,7 +97,50 @@ def raw_template_get(context, template_id):
     return result
 
 
+def _reuse_shared(session, model, result):
+    '''
+    Mark a stored row that is shared by content as recently used, so that a
+    concurrent purge_deleted() does not delete it before it is referred to.
+    Return None if the row has already been purged.
+    '''
+    if result is None:
+        return None
+    touched = session.query(model).filter_by(id=result.id).update(
+        {'updated_at': timeutils.utcnow()}, synchronize_session=False)
+    return result if touched else None
+
+
+def _raw_template_files(context, files):
+    '''
+    Return the stored copy of the given template files, creating it if no
+    other template has stored the same files before.
+    '''
+    data_hash = hashlib.sha256(jsonutils.dumps(files,
+                                               sort_keys=True)).hexdigest()
+    session = _session(context)
+
+    def get():
+        return session.query(models.RawTemplateFiles).\
+            filter_by(hash=data_hash).first()
+
+    result = _reuse_shared(session, models.RawTemplateFiles, get())
+    if result is not None:
+        return result
+
+    result = models.RawTemplateFiles(hash=data_hash, files=files)
+    try:
+        result.save(session)
+    except db_exception.DBDuplicateEntry:
+        # stored concurrently by another engine
+        result = get()
+    return result
+
+
 def raw_template_create(context, values):
+    values = dict(values)
+    files = values.pop('files', None)
+    if files is not None:
+        values['files_data'] = _raw_template_files(context, files)
     raw_template_ref = models.RawTemplate()
     raw_template_ref.update(values)
     raw_template_ref.save(_session(context))
@@ -112,6 +164,23 @@ def resource_get(context, resource_id):
     return result
 
 
+def resource_update(context, resource_id, values):
+    """Update the given columns of a resource without loading it first."""
+    values = dict(values)
+    if 'status_reason' in values:
+        # the model truncates status_reason, but that is not applied here
+        reason = values.pop('status_reason')
+        values[models.Resource._status_reason] = reason and reason[:255] or ''
+
+    updated = model_query(context, models.Resource).\
+        filter_by(id=resource_id).\
+        update(values, synchronize_session='evaluate')
+
+    if not updated:
+        raise exception.NotFound(_("resource with id %s not found") %
+                                 resource_id)
+
+
 def resource_get_by_name_and_stack(context, resource_name, stack_id):
     result = model_query(context, models.Resource).\
         filter_by(name=resource_name).\
@@ -213,17 +282,20 @@ def resource_data_set(resource, key, value, redact=False):
         method, value = _encrypt(value)
     else:
         method = ''
-    try:
-        current = resource_data_get_by_key(resource.context, resource.id, key)
-    except exception.NotFound:
-        current = models.ResourceData()
-        current.key = key
-        current.resource_id = resource.id
-    current.redact = redact
-    current.value = value
-    current.decrypt_method = method
-    current.save(session=resource.context.session)
-    return current
+    values = {'redact': redact,
+              'value': value,
+              'decrypt_method': method}
+
+    # Most keys are only set once, but updating first saves looking up the
+    # existing row of those that are not.
+    updated = model_query(resource.context, models.ResourceData).\
+        filter_by(resource_id=resource.id).\
+        filter_by(key=key).\
+        update(values, synchronize_session='evaluate')
+    if not updated:
+        current = models.ResourceData(key=key, resource_id=resource.id,
+                                      **values)
+        current.save(session=resource.context.session)
 
 
 def resource_exchange_stacks(context, resource_id1, resource_id2):
@@ -239,6 +311,18 @@ def resource_exchange_stacks(context, resource_id1, resource_id2):
     session.commit()
 
 
+def resource_metadata_set_all(context, metadata):
+    '''Set the metadata of several resources, given a dict keyed by ID.'''
+    query = model_query(context, models.Resource)
+    session = query.session
+    session.begin()
+
+    for res in query.filter(models.Resource.id.in_(metadata.keys())):
+        res.rsrc_metadata = metadata[res.id]
+
+    session.commit()
+
+
 def resource_data_delete(resource, key):
     result = resource_data_get_by_key(resource.context, resource.id, key)
     result.delete()
@@ -251,6 +335,27 @@ def resource_create(context, values):
     return resource_ref
 
 
+def resource_create_all(context, values):
+    """
+    Create several resources in a single transaction, given a list of the
+    values of each, and return them in the same order.
+    """
+    now = timeutils.utcnow()
+    resources = []
+    for resource_values in values:
+        # Giving the primary keys and timestamps up front allows the rows
+        # to be inserted with a single statement
+        resource_ref = models.Resource(id=str(uuid.uuid4()), created_at=now)
+        resource_ref.update(resource_values)
+        resources.append(resource_ref)
+
+    session = _session(context)
+    session.begin()
+    session.add_all(resources)
+    session.commit()
+    return resources
+
+
 def resource_get_all_by_stack(context, stack_id):
     results = model_query(context, models.Resource).\
         filter_by(stack_id=stack_id).\
@@ -329,7 +434,7 @@ def _filter_sort_keys(sort_keys, whitelist):
 
 
 def _paginate_query(context, query, model, limit=None, sort_keys=None,
-                    marker=None, sort_dir=None):
+                    marker=None, sort_dir=None, marker_key='id'):
     default_sort_keys = ['created_at']
     if not sort_keys:
         sort_keys = default_sort_keys
@@ -340,9 +445,23 @@ def _paginate_query(context, query, model, limit=None, sort_keys=None,
     # even for sort_key values that are not unique in the database
     sort_keys = sort_keys + ['id']
 
+    key_columns = [getattr(model, key, None) for key in sort_keys]
+
     model_marker = None
-    if marker:
-        model_marker = model_query(context, model).get(marker)
+    if marker and all(c is not None for c in key_columns):
+        # Only the sort key values of the marker are needed to seek to it
+        model_marker = model_query(context, *key_columns).filter(
+            getattr(model, marker_key) == marker).first()
+    if model_marker is not None and model_marker[0] is not None:
+        # Every row after the marker is also bounded by the marker's value
+        # of the leading sort key. paginate_query() only filters on all of
+        # the keys together, which databases cannot use to seek in an index
+        # on the leading key, so without this each page would be found by
+        # scanning past all of the earlier ones.
+        if sort_dir == 'desc':
+            query = query.filter(key_columns[0] <= model_marker[0])
+        else:
+            query = query.filter(key_columns[0] >= model_marker[0])
     try:
         query = utils.paginate_query(query, model, limit, sort_keys,
                                      model_marker, sort_dir)
@@ -434,6 +553,14 @@ def stack_delete(context, stack_id):
     session.flush()
 
 
+def stack_lock_get_engine_id(stack_id):
+    session = get_session()
+    with session.begin():
+        lock = session.query(models.StackLock).get(stack_id)
+        if lock is not None:
+            return lock.engine_id
+
+
 def stack_lock_create(stack_id, engine_id):
     session = get_session()
     with session.begin():
@@ -464,6 +591,77 @@ def stack_lock_release(stack_id, engine_id):
         return True
 
 
+def _db_now(session):
+    '''
+    Return the current time according to the database server. Heartbeats
+    are recorded and checked against this clock, so that skew between the
+    clocks of the hosts running engines cannot make an engine appear dead.
+    '''
+    return session.execute(sqlalchemy.select([sqlalchemy.func.now()])).\
+        scalar()
+
+
+def stack_lock_release_dead_engines(timeout):
+    """
+    Release the stack locks held by engines that have not recorded a
+    heartbeat within timeout seconds, and forget those engines. Return the
+    number of locks released.
+    """
+    session = get_session()
+    with session.begin():
+        cutoff = _db_now(session) - timedelta(seconds=timeout)
+        dead = session.query(models.EngineHeartbeat).\
+            filter(models.EngineHeartbeat.updated_at < cutoff)
+        engine_ids = [hb.engine_id for hb in dead]
+        if not engine_ids:
+            return 0
+        released = session.query(models.StackLock).\
+            filter(models.StackLock.engine_id.in_(engine_ids)).\
+            delete(synchronize_session=False)
+        dead.delete(synchronize_session=False)
+    return released
+
+
+def engine_heartbeat_update(engine_id, hostname):
+    session = get_session()
+    with session.begin():
+        now = _db_now(session)
+        rows_affected = session.query(models.EngineHeartbeat).\
+            filter_by(engine_id=engine_id).\
+            update({'updated_at': now})
+        if not rows_affected:
+            session.add(models.EngineHeartbeat(engine_id=engine_id,
+                                               hostname=hostname,
+                                               updated_at=now))
+
+
+def engine_heartbeat_alive(engine_id, timeout):
+    """
+    Return whether the engine has recorded a heartbeat within timeout
+    seconds, or None if it has no heartbeat recorded.
+    """
+    session = get_session()
+    with session.begin():
+        heartbeat = session.query(models.EngineHeartbeat).get(engine_id)
+        if heartbeat is None:
+            return None
+        cutoff = _db_now(session) - timedelta(seconds=timeout)
+        return heartbeat.updated_at >= cutoff
+
+
+def engine_heartbeat_get_all_alive(timeout):
+    """
+    Return the heartbeats of the engines that have recorded one within
+    timeout seconds.
+    """
+    session = get_session()
+    with session.begin():
+        cutoff = _db_now(session) - timedelta(seconds=timeout)
+        return session.query(models.EngineHeartbeat).\
+            filter(models.EngineHeartbeat.updated_at >= cutoff).\
+            order_by(models.EngineHeartbeat.engine_id).all()
+
+
 def user_creds_create(context):
     values = context.to_dict()
     user_creds_ref = models.UserCreds()
@@ -525,8 +723,11 @@ def event_get_all(context):
 
 
 def event_get_all_by_tenant(context, limit=None, marker=None,
-                            sort_keys=None, sort_dir=None, filters=None):
+                            sort_keys=None, sort_dir=None, filters=None,
+                            detail=False):
     query = model_query(context, models.Event)
+    if detail:
+        query = query.options(orm.joinedload('rsrc_prop_data'))
     query = db_filters.exact_filter(query, models.Event, filters)
     query = query.join(models.Event.stack).\
         filter_by(tenant=context.tenant_id).filter_by(deleted_at=None)
@@ -543,37 +744,20 @@ def _query_all_by_stack(context, stack_id):
 
 
 def event_get_all_by_stack(context, stack_id, limit=None, marker=None,
-                           sort_keys=None, sort_dir=None, filters=None):
+                           sort_keys=None, sort_dir=None, filters=None,
+                           detail=False):
     query = _query_all_by_stack(context, stack_id)
+    if detail:
+        query = query.options(orm.joinedload('rsrc_prop_data'))
     return _events_filter_and_page_query(context, query, limit, marker,
                                          sort_keys, sort_dir, filters).all()
 
 
 def _events_paginate_query(context, query, model, limit=None, sort_keys=None,
                            marker=None, sort_dir=None):
-    default_sort_keys = ['created_at']
-    if not sort_keys:
-        sort_keys = default_sort_keys
-        if not sort_dir:
-            sort_dir = 'desc'
-
-    # This assures the order of the stacks will always be the same
-    # even for sort_key values that are not unique in the database
-    sort_keys = sort_keys + ['id']
-
-    model_marker = None
-    if marker:
-        # not to use model_query(context, model).get(marker), because
-        # user can only see the ID(column 'uuid') and the ID as the marker
-        model_marker = model_query(context, model).filter_by(uuid=marker).\
-            first()
-    try:
-        query = utils.paginate_query(query, model, limit, sort_keys,
-                                     model_marker, sort_dir)
-    except utils.InvalidSortKey as exc:
-        raise exception.Invalid(reason=exc.message)
-
-    return query
+    # The user can only see the ID(column 'uuid'), so that is the marker
+    return _paginate_query(context, query, model, limit, sort_keys, marker,
+                           sort_dir, marker_key='uuid')
 
 
 def _events_filter_and_page_query(context, query,
@@ -612,6 +796,39 @@ def _delete_event_rows(context, stack_id, limit):
     return q.delete(synchronize_session='fetch')
 
 
+def _resource_properties_data(context, properties):
+    '''
+    Return the stored copy of the given resource properties, creating it if
+    no other event has recorded the same properties before.
+    '''
+    data = jsonutils.dumps(properties, sort_keys=True)
+    data_hash = hashlib.sha256(data).hexdigest()
+    session = _session(context)
+
+    def get():
+        return session.query(models.ResourcePropertiesData).\
+            filter_by(hash=data_hash).first()
+
+    result = _reuse_shared(session, models.ResourcePropertiesData, get())
+    if result is not None:
+        return result
+
+    compressed = False
+    if cfg.CONF.compress_event_properties:
+        packed = zlib.compress(data)
+        if len(packed) < len(data):
+            data, compressed = packed, True
+
+    result = models.ResourcePropertiesData(hash=data_hash, data=data,
+                                           compressed=compressed)
+    try:
+        result.save(session)
+    except db_exception.DBDuplicateEntry:
+        # stored concurrently by another engine
+        result = get()
+    return result
+
+
 def event_create(context, values):
     if 'stack_id' in values and cfg.CONF.max_events_per_stack:
         if ((event_count_all_by_stack(context, values['stack_id']) >=
@@ -619,6 +836,11 @@ def event_create(context, values):
             # prune
             _delete_event_rows(
                 context, values['stack_id'], cfg.CONF.event_purge_batch_size)
+    values = dict(values)
+    properties = values.pop('resource_properties', None)
+    if properties is not None:
+        values['rsrc_prop_data'] = _resource_properties_data(context,
+                                                             properties)
     event_ref = models.Event()
     event_ref.update(values)
     event_ref.save(_session(context))
@@ -801,7 +1023,8 @@ def snapshot_delete(context, snapshot_id):
     session.flush()
 
 
-def purge_deleted(age, granularity='days'):
+def purge_deleted(age, granularity='days', batch_size=1000, dry_run=False,
+                  batch_pause=0, progress=None):
     try:
         age = int(age)
     except ValueError:
@@ -813,6 +1036,9 @@ def purge_deleted(age, granularity='days'):
         raise exception.Error(
             _("granularity should be days, hours, minutes, or seconds"))
 
+    if batch_size < 1:
+        raise exception.Error(_("batch_size should be a positive integer"))
+
     if granularity == 'days':
         age = age * 86400
     elif granularity == 'hours':
@@ -820,32 +1046,211 @@ def purge_deleted(age, granularity='days'):
     elif granularity == 'minutes':
         age = age * 60
 
-    time_line = datetime.now() - timedelta(seconds=age)
+    time_line = timeutils.utcnow() - timedelta(seconds=age)
     engine = get_engine()
-    meta = sqlalchemy.MetaData()
-    meta.bind = engine
-
-    stack = sqlalchemy.Table('stack', meta, autoload=True)
-    event = sqlalchemy.Table('event', meta, autoload=True)
-    raw_template = sqlalchemy.Table('raw_template', meta, autoload=True)
-    user_creds = sqlalchemy.Table('user_creds', meta, autoload=True)
-
-    stmt = sqlalchemy.select([stack.c.id,
-                              stack.c.raw_template_id,
-                              stack.c.user_creds_id]).\
-        where(stack.c.deleted_at < time_line)
-    deleted_stacks = engine.execute(stmt)
-
-    for s in deleted_stacks:
-        event_del = event.delete().where(event.c.stack_id == s[0])
-        engine.execute(event_del)
-        stack_del = stack.delete().where(stack.c.id == s[0])
-        engine.execute(stack_del)
-        raw_template_del = raw_template.delete().\
-            where(raw_template.c.id == s[1])
-        engine.execute(raw_template_del)
-        user_creds_del = user_creds.delete().where(user_creds.c.id == s[2])
-        engine.execute(user_creds_del)
+    stack = models.Stack.__table__
+    expired = stack.c.deleted_at < time_line
+
+    if dry_run:
+        stack_ids = sqlalchemy.select([stack.c.id]).where(expired)
+        template_ids = sqlalchemy.select([stack.c.raw_template_id]).\
+            where(expired)
+        creds_ids = sqlalchemy.select([stack.c.user_creds_id]).where(
+            sqlalchemy.and_(expired, stack.c.user_creds_id != None))  # noqa
+        config_ids = _purge_config_ids(stack_ids)
+        properties_data_ids = _purge_properties_data_ids(stack_ids)
+        files_ids = _purge_files_ids(template_ids)
+        counts = {}
+        plan = _purge_plan(stack_ids, template_ids, creds_ids, config_ids,
+                           properties_data_ids, files_ids, time_line)
+        for table, where in plan:
+            stmt = sqlalchemy.select([sqlalchemy.func.count()]).\
+                select_from(table).where(where)
+            counts[table.name] = engine.execute(stmt).scalar()
+        return counts
+
+    counts = {}
+    while True:
+        batch = sqlalchemy.select([stack.c.id,
+                                   stack.c.raw_template_id,
+                                   stack.c.user_creds_id]).\
+            where(expired).limit(batch_size)
+        rows = engine.execute(batch).fetchall()
+        if not rows:
+            break
+
+        stack_ids = [row[0] for row in rows]
+        template_ids = list(set(row[1] for row in rows))
+        creds_ids = list(set(row[2] for row in rows if row[2] is not None))
+        with engine.begin() as conn:
+            # the deployments, events and templates referring to these are
+            # purged first
+            config_ids = [row[0] for row in
+                          conn.execute(_purge_config_ids(stack_ids))]
+            properties_data_ids = [
+                row[0] for row in
+                conn.execute(_purge_properties_data_ids(stack_ids))]
+            files_ids = [row[0] for row in
+                         conn.execute(_purge_files_ids(template_ids))]
+            plan = _purge_plan(stack_ids, template_ids, creds_ids,
+                               config_ids, properties_data_ids, files_ids,
+                               time_line)
+            for table, where in plan:
+                deleted = conn.execute(table.delete().where(where)).rowcount
+                counts[table.name] = counts.get(table.name, 0) + deleted
+
+        if progress is not None:
+            progress(counts)
+        if len(rows) < batch_size:
+            break
+        if batch_pause > 0:
+            time.sleep(batch_pause)
+
+    return counts
+
+
+def _purge_deployment_ids(stack_ids):
+    '''
+    Return a select statement for the IDs of the software deployments
+    created by resources of the given stacks, which record them as their
+    resource IDs.
+    '''
+    resource = models.Resource.__table__
+    return sqlalchemy.select([resource.c.nova_instance]).where(
+        sqlalchemy.and_(resource.c.stack_id.in_(stack_ids),
+                        resource.c.nova_instance != None))  # noqa
+
+
+def _purge_config_ids(stack_ids):
+    '''
+    Return a select statement for the IDs of the software configs derived
+    for the deployments created by resources of the given stacks.
+    '''
+    deployment = models.SoftwareDeployment.__table__
+    return sqlalchemy.select([deployment.c.config_id]).where(
+        deployment.c.id.in_(_purge_deployment_ids(stack_ids)))
+
+
+def _purge_properties_data_ids(stack_ids):
+    '''
+    Return a select statement for the IDs of the resource properties
+    recorded by the events of the given stacks.
+    '''
+    event = models.Event.__table__
+    return sqlalchemy.select([event.c.rsrc_prop_data_id]).distinct().where(
+        sqlalchemy.and_(event.c.stack_id.in_(stack_ids),
+                        event.c.rsrc_prop_data_id != None))  # noqa
+
+
+def _purge_files_ids(template_ids):
+    '''
+    Return a select statement for the IDs of the files of the given
+    templates.
+    '''
+    raw_template = models.RawTemplate.__table__
+    return sqlalchemy.select([raw_template.c.files_id]).distinct().where(
+        sqlalchemy.and_(raw_template.c.id.in_(template_ids),
+                        raw_template.c.files_id != None))  # noqa
+
+
+def _purge_plan(stack_ids, template_ids, creds_ids, config_ids,
+                properties_data_ids, files_ids, time_line):
+    '''
+    Return (table, where clause) pairs, in foreign key order, selecting the
+    rows to purge along with the given stacks and their templates, user
+    credentials, derived software configs, event properties and template
+    files. The IDs may be given as lists or as select statements.
+    Rows shared between stacks are only purged if they have not been used
+    since time_line.
+    '''
+    stack = models.Stack.__table__
+    raw_template = models.RawTemplate.__table__
+    user_creds = models.UserCreds.__table__
+    event = models.Event.__table__
+    properties_data = models.ResourcePropertiesData.__table__
+    template_files = models.RawTemplateFiles.__table__
+    resource = models.Resource.__table__
+    resource_data = models.ResourceData.__table__
+    deployment = models.SoftwareDeployment.__table__
+    software_config = models.SoftwareConfig.__table__
+    watch_rule = models.WatchRule.__table__
+    watch_data = models.WatchData.__table__
+    snapshot = models.Snapshot.__table__
+    stack_lock = models.StackLock.__table__
+
+    def unreferenced(column, ids, ref_column):
+        # only rows that none of the remaining stacks refer to
+        if isinstance(ids, list) and not ids:
+            return sqlalchemy.sql.expression.false()
+        refs = sqlalchemy.select([ref_column]).where(
+            sqlalchemy.and_(sqlalchemy.not_(stack.c.id.in_(stack_ids)),
+                            ref_column != None))  # noqa
+        return sqlalchemy.and_(column.in_(ids),
+                               sqlalchemy.not_(column.in_(refs)))
+
+    def unused(column, ids, ref_column, ref_where):
+        # only rows that nothing left refers to, and that have not been
+        # found for reuse since the candidates were chosen
+        if isinstance(ids, list) and not ids:
+            return sqlalchemy.sql.expression.false()
+        refs = sqlalchemy.select([ref_column]).where(
+            sqlalchemy.and_(ref_column.in_(ids), ref_where))
+        last_used = sqlalchemy.func.coalesce(column.table.c.updated_at,
+                                             column.table.c.created_at)
+        return sqlalchemy.and_(column.in_(ids),
+                               sqlalchemy.not_(column.in_(refs)),
+                               sqlalchemy.or_(last_used == None,  # noqa
+                                              last_used < time_line))
+
+    resource_ids = sqlalchemy.select([resource.c.id]).where(
+        resource.c.stack_id.in_(stack_ids))
+    deployment_ids = _purge_deployment_ids(stack_ids)
+    # configs still used by deployments of other stacks or of the API
+    deployment_config_ids = sqlalchemy.select([deployment.c.config_id]).where(
+        sqlalchemy.not_(deployment.c.id.in_(deployment_ids)))
+    if isinstance(config_ids, list) and not config_ids:
+        purged_configs = sqlalchemy.sql.expression.false()
+    else:
+        purged_configs = sqlalchemy.and_(
+            software_config.c.id.in_(config_ids),
+            sqlalchemy.not_(software_config.c.id.in_(deployment_config_ids)))
+    watch_rule_ids = sqlalchemy.select([watch_rule.c.id]).where(
+        watch_rule.c.stack_id.in_(stack_ids))
+    # templates, properties and files may be shared between stacks, so are
+    # only purged once nothing left uses them
+    purged_templates = unreferenced(raw_template.c.id, template_ids,
+                                    stack.c.raw_template_id)
+
+    return [
+        (resource_data, resource_data.c.resource_id.in_(resource_ids)),
+        (deployment, deployment.c.id.in_(deployment_ids)),
+        (software_config, purged_configs),
+        (resource, resource.c.stack_id.in_(stack_ids)),
+        (event, event.c.stack_id.in_(stack_ids)),
+        (properties_data, unused(
+            properties_data.c.id, properties_data_ids,
+            event.c.rsrc_prop_data_id,
+            sqlalchemy.not_(event.c.stack_id.in_(stack_ids)))),
+        (watch_data, watch_data.c.watch_rule_id.in_(watch_rule_ids)),
+        (watch_rule, watch_rule.c.stack_id.in_(stack_ids)),
+        (snapshot, snapshot.c.stack_id.in_(stack_ids)),
+        (stack_lock, stack_lock.c.stack_id.in_(stack_ids)),
+        (stack, stack.c.id.in_(stack_ids)),
+        (raw_template, purged_templates),
+        (template_files, unused(template_files.c.id, files_ids,
+                                raw_template.c.files_id,
+                                sqlalchemy.not_(purged_templates))),
+        (user_creds, unreferenced(user_creds.c.id, creds_ids,
+                                  stack.c.user_creds_id)),
+    ]
+
+
+def db_stats():
+    return profiling.stats()
+
+
+def track_statements(name):
+    return profiling.track(name)
 
 
 def db_sync(engine, version=None):
@@ -25,7 +25,15 @@ def upgrade(migrate_engine):
     Session = sessionmaker(bind=migrate_engine)
     session = Session()
 
-    raw_templates = session.query(models.RawTemplate).all()
+    # Only load the columns that existed when this migration was written
+    raw_templates = session.query(models.RawTemplate.id,
+                                  models.RawTemplate.template).all()
+
+    def _update_template(raw_template_id, template):
+        session.query(models.RawTemplate).filter_by(
+            id=raw_template_id).update({'template': template},
+                                       synchronize_session=False)
+        session.commit()
 
     for raw_template in raw_templates:
         if ('heat_template_version' in raw_template.template
@@ -37,8 +45,7 @@ def upgrade(migrate_engine):
 
                 def _commit_schema(parameter, schema):
                     template['parameters'][parameter] = schema
-                    raw_template.template = template
-                    session.commit()
+                    _update_template(raw_template.id, template)
 
                 if 'Type' in schema:
                     schema['type'] = schema['Type']
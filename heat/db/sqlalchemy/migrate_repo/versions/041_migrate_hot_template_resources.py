@@ -23,7 +23,15 @@ def upgrade(migrate_engine):
     Session = sessionmaker(bind=migrate_engine)
     session = Session()
 
-    raw_templates = session.query(models.RawTemplate).all()
+    # Only load the columns that existed when this migration was written
+    raw_templates = session.query(models.RawTemplate.id,
+                                  models.RawTemplate.template).all()
+
+    def _update_template(raw_template_id, template):
+        session.query(models.RawTemplate).filter_by(
+            id=raw_template_id).update({'template': template},
+                                       synchronize_session=False)
+        session.commit()
 
     CFN_TO_HOT_RESOURCE_ATTRS = {'Type': 'type',
                                  'Properties': 'properties',
@@ -62,8 +70,7 @@ def upgrade(migrate_engine):
                 changed = True
 
             if changed:
-                raw_template.template = template
-                session.commit()
+                _update_template(raw_template.id, template)
 
 
 def downgrade(migrate_engine):
@@ -24,7 +24,15 @@ def upgrade(migrate_engine):
     Session = sessionmaker(bind=migrate_engine)
     session = Session()
 
-    raw_templates = session.query(models.RawTemplate).all()
+    # Only load the columns that existed when this migration was written
+    raw_templates = session.query(models.RawTemplate.id,
+                                  models.RawTemplate.template).all()
+
+    def _update_template(raw_template_id, template):
+        session.query(models.RawTemplate).filter_by(
+            id=raw_template_id).update({'template': template},
+                                       synchronize_session=False)
+        session.commit()
 
     # NOTE (sdake) 2014-04-24 is the date of the Icehouse release.  It is
     # possible that folks could continue to make errors in their templates
@@ -50,8 +58,7 @@ def upgrade(migrate_engine):
 
                 if dt is None or dt < patch_date:
                     template[key] = date
-                    raw_template.template = template
-                    session.commit()
+                    _update_template(raw_template.id, template)
 
 
 def downgrade(migrate_engine):
@@ -0,0 +1,41 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    engine_heartbeat = sqlalchemy.Table(
+        'engine_heartbeat', meta,
+        sqlalchemy.Column('engine_id', sqlalchemy.String(36),
+                          primary_key=True,
+                          nullable=False),
+        sqlalchemy.Column('hostname', sqlalchemy.String(255)),
+        sqlalchemy.Column('created_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('updated_at', sqlalchemy.DateTime, index=True),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    engine_heartbeat.create()
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    engine_heartbeat = sqlalchemy.Table('engine_heartbeat', meta,
+                                        autoload=True)
+    engine_heartbeat.drop()
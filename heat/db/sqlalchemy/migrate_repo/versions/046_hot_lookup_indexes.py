@@ -0,0 +1,71 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sqlalchemy
+
+
+INDEXES = (
+    # watcher ticks and nested stack lookups
+    ('ix_stack_owner_id', 'stack', ('owner_id',)),
+    # stack_get_by_name() and new stack name validation
+    ('ix_stack_name', 'stack', ('name',)),
+    # stack lists for a tenant, which exclude deleted stacks
+    ('ix_stack_tenant', 'stack', ('tenant', 'deleted_at')),
+    # resource_get_by_physical_resource_id()
+    ('ix_resource_nova_instance', 'resource', ('nova_instance',)),
+    ('ix_resource_stack_id', 'resource', ('stack_id',)),
+    # event lists for a stack, ordered by creation time
+    ('ix_event_stack_id_created_at', 'event', ('stack_id', 'created_at')),
+    ('ix_watch_data_watch_rule_id', 'watch_data', ('watch_rule_id',)),
+)
+
+
+def _foreign_key_column(table, column):
+    return any(fk.parent.name == column for fk in table.foreign_keys)
+
+
+def _indexes(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+    mysql = migrate_engine.name == 'mysql'
+
+    tables = {}
+    for name, table_name, columns in INDEXES:
+        if table_name not in tables:
+            tables[table_name] = sqlalchemy.Table(table_name, meta,
+                                                  autoload=True)
+        table = tables[table_name]
+        fk_leading = mysql and _foreign_key_column(table, columns[0])
+        if fk_leading and len(columns) == 1:
+            # InnoDB already indexes foreign key columns
+            continue
+        yield (sqlalchemy.Index(name, *[table.c[c] for c in columns]),
+               fk_leading)
+
+
+def upgrade(migrate_engine):
+    for index, fk_leading in _indexes(migrate_engine):
+        index.create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    for index, fk_leading in _indexes(migrate_engine):
+        if fk_leading:
+            # InnoDB drops its own foreign key index once another index can
+            # be used instead, and will not drop the last one left.
+            column = list(index.columns)[0]
+            fk_index = sqlalchemy.Index('ix_%s_%s' % (column.table.name,
+                                                      column.name),
+                                        column)
+            fk_index.create(migrate_engine)
+        index.drop(migrate_engine)
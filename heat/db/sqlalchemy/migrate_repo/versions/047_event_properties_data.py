@@ -0,0 +1,99 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import zlib
+
+import migrate.changeset.constraint as constraint
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    properties_data = sqlalchemy.Table(
+        'resource_properties_data', meta,
+        sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True,
+                          nullable=False),
+        sqlalchemy.Column('hash', sqlalchemy.String(64), nullable=False,
+                          unique=True),
+        sqlalchemy.Column('data', sqlalchemy.LargeBinary),
+        sqlalchemy.Column('compressed', sqlalchemy.Boolean),
+        sqlalchemy.Column('created_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('updated_at', sqlalchemy.DateTime),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    properties_data.create()
+
+    event = sqlalchemy.Table('event', meta, autoload=True)
+    if migrate_engine.name == 'sqlite':
+        # Adding a foreign key means rebuilding the table in SQLite, which
+        # would lose the unique constraint on the event uuid
+        data_id = sqlalchemy.Column('rsrc_prop_data_id', sqlalchemy.Integer)
+    else:
+        data_id = sqlalchemy.Column(
+            'rsrc_prop_data_id', sqlalchemy.Integer,
+            sqlalchemy.ForeignKey(properties_data.c.id))
+    data_id.create(event)
+
+    if migrate_engine.name != 'mysql':
+        # InnoDB already indexes foreign key columns. Purging deleted stacks
+        # looks up the events that still refer to each set of properties.
+        sqlalchemy.Index('ix_event_rsrc_prop_data_id',
+                         event.c.rsrc_prop_data_id).create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    event = sqlalchemy.Table('event', meta,
+                             sqlalchemy.Column('resource_properties',
+                                               sqlalchemy.PickleType),
+                             autoload=True)
+    properties_data = sqlalchemy.Table('resource_properties_data', meta,
+                                       autoload=True)
+
+    # Copy the shared properties back into each event that refers to them
+    for row in properties_data.select().execute():
+        data = zlib.decompress(row.data) if row.compressed else row.data
+        update = event.update().where(
+            event.c.rsrc_prop_data_id == row.id).values(
+                resource_properties=json.loads(data))
+        migrate_engine.execute(update)
+
+    if migrate_engine.name != 'sqlite':
+        for fk in event.foreign_keys:
+            if fk.column.table is properties_data:
+                constraint.ForeignKeyConstraint(
+                    columns=[fk.parent], refcolumns=[fk.column],
+                    name=fk.constraint.name).drop()
+
+    for index in event.indexes:
+        if index.name == 'ix_event_rsrc_prop_data_id':
+            index.drop(migrate_engine)
+            event.indexes.remove(index)
+            break
+
+    event.c.rsrc_prop_data_id.drop()
+    properties_data.drop()
+
+    if migrate_engine.name == 'sqlite':
+        # Dropping a column rebuilds the table in SQLite, without the unique
+        # constraint on the event uuid
+        event = sqlalchemy.Table('event',
+                                 sqlalchemy.MetaData(bind=migrate_engine),
+                                 autoload=True)
+        constraint.UniqueConstraint('uuid', table=event).create()
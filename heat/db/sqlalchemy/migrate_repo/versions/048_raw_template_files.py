@@ -0,0 +1,110 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import hashlib
+import json
+
+import migrate.changeset.constraint as constraint
+import sqlalchemy
+from sqlalchemy.dialects import mysql
+
+PAGE_SIZE = 100
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    template_files = sqlalchemy.Table(
+        'raw_template_files', meta,
+        sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True,
+                          nullable=False),
+        sqlalchemy.Column('hash', sqlalchemy.String(64), nullable=False,
+                          unique=True),
+        sqlalchemy.Column('files', sqlalchemy.Text().with_variant(
+            mysql.LONGTEXT(), 'mysql')),
+        sqlalchemy.Column('created_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('updated_at', sqlalchemy.DateTime),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    template_files.create()
+
+    raw_template = sqlalchemy.Table('raw_template', meta, autoload=True)
+    files_id = sqlalchemy.Column('files_id', sqlalchemy.Integer,
+                                 sqlalchemy.ForeignKey(template_files.c.id))
+    files_id.create(raw_template)
+
+    if migrate_engine.name != 'mysql':
+        # InnoDB already indexes foreign key columns. Purging deleted stacks
+        # looks up the templates that still refer to each set of files.
+        sqlalchemy.Index('ix_raw_template_files_id',
+                         raw_template.c.files_id).create(migrate_engine)
+
+    # Move the files of each existing template out of line, storing each
+    # distinct set of files only once. Templates are read a page at a time
+    # so that the files of all of them are never held in memory at once.
+    ids = {}
+    now = datetime.datetime.utcnow()
+    has_files = raw_template.c.files != None  # noqa
+    last_id = 0
+    while True:
+        query = sqlalchemy.select([raw_template.c.id, raw_template.c.files]).\
+            where(sqlalchemy.and_(raw_template.c.id > last_id, has_files)).\
+            order_by(raw_template.c.id).limit(PAGE_SIZE)
+        rows = migrate_engine.execute(query).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            data = json.dumps(json.loads(row.files), sort_keys=True)
+            data_hash = hashlib.sha256(data).hexdigest()
+            if data_hash not in ids:
+                result = template_files.insert().execute(hash=data_hash,
+                                                         files=data,
+                                                         created_at=now)
+                ids[data_hash] = result.inserted_primary_key[0]
+            raw_template.update().where(raw_template.c.id == row.id).values(
+                files_id=ids[data_hash], files=None).execute()
+        last_id = rows[-1].id
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    raw_template = sqlalchemy.Table('raw_template', meta, autoload=True)
+    template_files = sqlalchemy.Table('raw_template_files', meta,
+                                      autoload=True)
+
+    # Copy the shared files back into each template that refers to them
+    for row in template_files.select().execute():
+        raw_template.update().where(
+            raw_template.c.files_id == row.id).values(
+                files=row.files).execute()
+
+    if migrate_engine.name != 'sqlite':
+        for fk in raw_template.foreign_keys:
+            if fk.column.table is template_files:
+                constraint.ForeignKeyConstraint(
+                    columns=[fk.parent], refcolumns=[fk.column],
+                    name=fk.constraint.name).drop()
+
+    for index in raw_template.indexes:
+        if index.name == 'ix_raw_template_files_id':
+            index.drop(migrate_engine)
+            raw_template.indexes.remove(index)
+            break
+
+    raw_template.c.files_id.drop()
+    template_files.drop()
@@ -14,12 +14,15 @@
 SQLAlchemy models for heat data.
 """
 
+import json
 import uuid
+import zlib
 
 from oslo.db.sqlalchemy import models
 import sqlalchemy
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import backref
+from sqlalchemy.orm import deferred
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.session import Session
 
@@ -98,13 +101,34 @@ class StateAware(object):
         self._status_reason = reason and reason[:255] or ''
 
 
+class RawTemplateFiles(BASE, HeatBase):
+    """The files of a template, stored once per distinct set of files."""
+
+    __tablename__ = 'raw_template_files'
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    hash = sqlalchemy.Column(sqlalchemy.String(64), nullable=False,
+                             unique=True)
+    files = sqlalchemy.Column(Json)
+
+
 class RawTemplate(BASE, HeatBase):
     """Represents an unparsed template which should be in JSON format."""
 
     __tablename__ = 'raw_template'
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
     template = sqlalchemy.Column(Json)
-    files = sqlalchemy.Column(Json)
+    _files = deferred(sqlalchemy.Column('files', Json))
+    files_id = sqlalchemy.Column(
+        sqlalchemy.Integer, sqlalchemy.ForeignKey(RawTemplateFiles.id))
+    files_data = relationship(RawTemplateFiles)
+
+    @property
+    def files(self):
+        if self.files_id is not None:
+            # shared with other templates, so never modified in place
+            return dict(self.files_data.files)
+        return self._files
 
 
 class Stack(BASE, HeatBase, SoftDelete, StateAware):
@@ -150,6 +174,15 @@ class StackLock(BASE, HeatBase):
     engine_id = sqlalchemy.Column(sqlalchemy.String(36))
 
 
+class EngineHeartbeat(BASE, HeatBase):
+    """Record the time at which each engine was last known to be alive."""
+
+    __tablename__ = 'engine_heartbeat'
+
+    engine_id = sqlalchemy.Column(sqlalchemy.String(36), primary_key=True)
+    hostname = sqlalchemy.Column(sqlalchemy.String(255))
+
+
 class UserCreds(BASE, HeatBase):
     """
     Represents user credentials and mirrors the 'context'
@@ -170,6 +203,23 @@ class UserCreds(BASE, HeatBase):
     stack = relationship(Stack, backref=backref('user_creds'))
 
 
+class ResourcePropertiesData(BASE, HeatBase):
+    """Resource properties recorded in events, stored once per value."""
+
+    __tablename__ = 'resource_properties_data'
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    hash = sqlalchemy.Column(sqlalchemy.String(64), nullable=False,
+                             unique=True)
+    data = sqlalchemy.Column(sqlalchemy.LargeBinary)
+    compressed = sqlalchemy.Column(sqlalchemy.Boolean, default=False)
+
+    @property
+    def properties(self):
+        data = zlib.decompress(self.data) if self.compressed else self.data
+        return json.loads(data)
+
+
 class Event(BASE, HeatBase):
     """Represents an event generated by the heat engine."""
 
@@ -191,7 +241,18 @@ class Event(BASE, HeatBase):
     _resource_status_reason = sqlalchemy.Column(
         'resource_status_reason', sqlalchemy.String(255))
     resource_type = sqlalchemy.Column(sqlalchemy.String(255))
-    resource_properties = sqlalchemy.Column(sqlalchemy.PickleType)
+    # Only events created before resource_properties_data was added
+    _resource_properties = deferred(
+        sqlalchemy.Column('resource_properties', sqlalchemy.PickleType))
+    rsrc_prop_data_id = sqlalchemy.Column(
+        sqlalchemy.Integer, sqlalchemy.ForeignKey(ResourcePropertiesData.id))
+    rsrc_prop_data = relationship(ResourcePropertiesData)
+
+    @property
+    def resource_properties(self):
+        if self.rsrc_prop_data_id is not None:
+            return self.rsrc_prop_data.properties
+        return self._resource_properties
 
     @property
     def resource_status_reason(self):
@@ -0,0 +1,167 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+'''
+Counts of the statements executed against the database, and the time spent
+on them, for each RPC method and stack action an engine handles, along with
+the use of the connection pool.
+
+Statements are attributed to the innermost block of code being tracked in
+the thread that executes them. Statements taking at least slow_query_time
+milliseconds are logged, and so are statements executed more than
+repeated_query_limit times in a single tracked block, which usually means
+that rows are being loaded one at a time in a loop.
+'''
+
+import collections
+import contextlib
+from time import time as wallclock
+
+from eventlet import corolocal
+from oslo.config import cfg
+from sqlalchemy import event
+from sqlalchemy import pool
+
+from heat.openstack.common.gettextutils import _
+from heat.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_opt('slow_query_time', 'heat.common.config')
+CONF.import_opt('repeated_query_limit', 'heat.common.config')
+
+_local = corolocal.local()
+_stats = collections.defaultdict(lambda: {'calls': 0,
+                                          'statements': 0,
+                                          'time': 0.0,
+                                          'max_statements': 0})
+_pool_stats = {'connections': 0,
+               'checkouts': 0,
+               'checked_out': 0,
+               'max_checked_out': 0}
+_pools = []
+
+
+class _Block(object):
+    def __init__(self, name):
+        self.name = name
+        self.statements = 0
+        self.time = 0.0
+        self.repeats = collections.Counter()
+
+
+@contextlib.contextmanager
+def track(name):
+    '''
+    Context manager to attribute the statements executed by the current
+    green thread for the duration of the block to the given name.
+    '''
+    outer = getattr(_local, 'block', None)
+    block = _local.block = _Block(name)
+    try:
+        yield
+    finally:
+        _local.block = outer
+        stats = _stats[name]
+        stats['calls'] += 1
+        stats['statements'] += block.statements
+        stats['time'] += block.time
+        stats['max_statements'] = max(stats['max_statements'],
+                                      block.statements)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    # A connection executes one statement at a time, and the start time of
+    # one that fails, for which after_cursor_execute is not called, is
+    # replaced by that of the next.
+    conn.info['query_start_time'] = wallclock()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    elapsed = wallclock() - conn.info.pop('query_start_time')
+
+    slow_query_time = CONF.slow_query_time
+    if slow_query_time > 0 and elapsed * 1000 >= slow_query_time:
+        LOG.warning(_('Slow query took %(time).3fs: %(statement)s') %
+                    {'time': elapsed, 'statement': statement})
+
+    block = getattr(_local, 'block', None)
+    if block is None:
+        return
+    block.statements += 1
+    block.time += elapsed
+
+    limit = CONF.repeated_query_limit
+    if limit > 0:
+        block.repeats[statement] += 1
+        if block.repeats[statement] == limit + 1:
+            LOG.warning(_('Query repeated more than %(limit)d times in '
+                          '%(name)s: %(statement)s') %
+                        {'limit': limit, 'name': block.name,
+                         'statement': statement})
+
+
+def _connect(dbapi_conn, conn_record):
+    _pool_stats['connections'] += 1
+
+
+def _checkout(dbapi_conn, conn_record, conn_proxy):
+    _pool_stats['checkouts'] += 1
+    _pool_stats['checked_out'] += 1
+    _pool_stats['max_checked_out'] = max(_pool_stats['max_checked_out'],
+                                         _pool_stats['checked_out'])
+
+
+def _checkin(dbapi_conn, conn_record):
+    _pool_stats['checked_out'] -= 1
+
+
+def attach(engine):
+    '''Collect statistics on the use of the given engine.'''
+    listeners = [('before_cursor_execute', _before_cursor_execute),
+                 ('after_cursor_execute', _after_cursor_execute),
+                 ('connect', _connect),
+                 ('checkout', _checkout),
+                 ('checkin', _checkin)]
+    for event_name, listener in listeners:
+        event.listen(engine, event_name, listener)
+    _pools.append(engine.pool)
+
+
+def stats():
+    '''
+    Return, for each tracked name, the number of times it was tracked and
+    the total and largest numbers of statements executed and the total time
+    spent executing them, along with the number of connections opened and
+    checked out and the numbers currently and at most checked out at once.
+    Where the pool has a fixed size, its size and the number of connections
+    opened beyond it are also included.
+    '''
+    pool_stats = dict(_pool_stats)
+    for engine_pool in _pools:
+        if isinstance(engine_pool, pool.QueuePool):
+            pool_stats['size'] = engine_pool.size()
+            pool_stats['overflow'] = max(engine_pool.overflow(), 0)
+    return {'statements': dict((name, dict(name_stats))
+                               for name, name_stats in _stats.items()),
+            'pool': pool_stats}
+
+
+def clear():
+    _stats.clear()
+    # connections that are still checked out will be checked in later
+    _pool_stats.update(connections=0, checkouts=0,
+                       max_checked_out=_pool_stats['checked_out'])
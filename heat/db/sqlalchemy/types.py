@@ -11,8 +11,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from json import dumps
-from json import loads
+try:
+    # simplejson decodes large documents much faster than the standard
+    # library, but it is not required
+    from simplejson import dumps
+    from simplejson import loads
+except ImportError:
+    from json import dumps
+    from json import loads
 
 from sqlalchemy.dialects import mysql
 from sqlalchemy import types
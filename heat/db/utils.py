@@ -43,5 +43,8 @@ IMPL = LazyPluggable('backend',
                      sqlalchemy='heat.db.sqlalchemy.api')
 
 
-def purge_deleted(age, granularity='days'):
-    IMPL.purge_deleted(age, granularity)
+def purge_deleted(age, granularity='days', batch_size=1000, dry_run=False,
+                  batch_pause=0, progress=None):
+    return IMPL.purge_deleted(age, granularity, batch_size=batch_size,
+                              dry_run=dry_run, batch_pause=batch_pause,
+                              progress=progress)
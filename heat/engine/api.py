@@ -172,7 +172,7 @@ def format_stack_preview(stack):
     return fmt_stack
 
 
-def format_event(event):
+def format_event(event, detail=True):
     stack_identifier = event.stack.identifier()
 
     result = {
@@ -186,9 +186,11 @@ def format_event(event):
         api.EVENT_RES_STATUS: event.status,
         api.EVENT_RES_STATUS_DATA: event.reason,
         api.EVENT_RES_TYPE: event.resource_type,
-        api.EVENT_RES_PROPERTIES: event.resource_properties,
     }
 
+    if detail:
+        result[api.EVENT_RES_PROPERTIES] = event.resource_properties
+
     return result
 
 
@@ -67,7 +67,15 @@ class CfnTemplate(template.Template):
                                      user_params=user_params)
 
     def resource_definitions(self, stack):
+        # Definitions already parsed from each snippet, so that resources
+        # sharing a snippet (such as the members of a group) share their
+        # parsed definition.
+        parsed = {}
+
         def rsrc_defn_item(name, snippet):
+            if id(snippet) in parsed:
+                return name, parsed[id(snippet)].renamed(name)
+
             data = self.parse(stack, snippet)
 
             def get_check_type(key, valid_types, typename, default=None):
@@ -125,6 +133,7 @@ class CfnTemplate(template.Template):
                                                 deletion_policy,
                                                 update_policy,
                                                 description=description)
+            parsed[id(snippet)] = defn
             return name, defn
 
         resources = self.t.get(self.RESOURCES) or {}
@@ -148,6 +157,4 @@ class CfnTemplate(template.Template):
         if len(cfn_tmpl.get(RES_DEPENDS_ON, [])) == 1:
             cfn_tmpl[RES_DEPENDS_ON] = cfn_tmpl[RES_DEPENDS_ON][0]
 
-        if self.t.get(self.RESOURCES) is None:
-            self.t[self.RESOURCES] = {}
-        self.t[self.RESOURCES][name] = cfn_tmpl
+        self._resources_for_update()[name] = cfn_tmpl
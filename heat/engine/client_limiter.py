@@ -0,0 +1,106 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+'''
+Per-engine limits on the number of resource handle_* and check_*_complete
+calls that are made at once against each backend service.
+
+Calls are keyed by the name of the client plugin that the resource uses,
+and limited by the max_concurrent_calls option in the clients_<name> config
+group. A slot is only held for the duration of a single call, so a resource
+waiting for its action to complete does not hold a slot between polls.
+'''
+
+import collections
+import contextlib
+from time import time as wallclock
+
+from eventlet import semaphore
+from oslo.config import cfg
+
+
+_semaphores = {}
+_stats = collections.defaultdict(lambda: {'active': 0,
+                                          'waiting': 0,
+                                          'calls': 0,
+                                          'waits': 0,
+                                          'wait_time': 0.0})
+
+
+def _max_calls(client_name):
+    try:
+        group = getattr(cfg.CONF, 'clients_' + client_name)
+        return group.max_concurrent_calls
+    except (cfg.NoSuchOptError, AttributeError):
+        return 0
+
+
+def _semaphore(client_name):
+    max_calls = _max_calls(client_name)
+    if max_calls <= 0:
+        return None
+
+    limit, sem = _semaphores.get(client_name, (None, None))
+    if limit != max_calls:
+        # Calls already holding a slot in a semaphore created with an old
+        # limit will release it there, so it is safe to replace.
+        sem = semaphore.Semaphore(max_calls)
+        _semaphores[client_name] = (max_calls, sem)
+    return sem
+
+
+@contextlib.contextmanager
+def limit(client_name):
+    '''
+    Context manager to hold one of the slots for calls to the named client
+    for the duration of the block, waiting for a slot if none are free.
+    '''
+    sem = _semaphore(client_name) if client_name is not None else None
+    if sem is None:
+        yield
+        return
+
+    stats = _stats[client_name]
+    if not sem.acquire(blocking=False):
+        stats['waits'] += 1
+        stats['waiting'] += 1
+        start = wallclock()
+        try:
+            sem.acquire()
+        finally:
+            stats['waiting'] -= 1
+            stats['wait_time'] += wallclock() - start
+
+    stats['active'] += 1
+    try:
+        yield
+    finally:
+        stats['active'] -= 1
+        stats['calls'] += 1
+        sem.release()
+
+
+def stats():
+    '''
+    Return, for each limited client, the current limit, the numbers of calls
+    in progress and waiting for a slot, the total number of calls made, the
+    number of those that had to wait and the total time spent waiting.
+    '''
+    return dict((client_name, dict(client_stats,
+                                   limit=_max_calls(client_name)))
+                for client_name, client_stats in _stats.items())
+
+
+def clear():
+    _semaphores.clear()
+    _stats.clear()
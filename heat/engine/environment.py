@@ -99,6 +99,23 @@ class ClassResourceInfo(ResourceInfo):
         return self.value
 
 
+class LazyClassResourceInfo(ClassResourceInfo):
+    """Store the name of the module providing a python class implementation.
+
+    The module is only imported when the class is first needed.
+    """
+
+    def __init__(self, registry, path, value, load_class):
+        super(LazyClassResourceInfo, self).__init__(registry, path, value)
+        self._load_class = load_class
+        self._class = None
+
+    def get_class(self):
+        if self._class is None:
+            self._class = self._load_class()
+        return self._class
+
+
 class TemplateResourceInfo(ResourceInfo):
     """Store the info needed to start a TemplateResource.
     """
@@ -152,6 +169,10 @@ class ResourceRegistry(object):
     def __init__(self, global_registry):
         self._registry = {'resources': {}}
         self.global_registry = global_registry
+        self._version = 0
+        self._cache = {}
+        self._cache_versions = None
+        self._globs = None
 
     def load(self, json_snippet):
         self._load_registry([], json_snippet)
@@ -160,6 +181,11 @@ class ResourceRegistry(object):
         ri = ResourceInfo(self, [resource_type], resource_class)
         self._register_info([resource_type], ri)
 
+    def register_lazy_class(self, resource_type, module_name, load_class):
+        ri = LazyClassResourceInfo(self, [resource_type], module_name,
+                                   load_class=load_class)
+        self._register_info([resource_type], ri)
+
     def _load_registry(self, path, registry):
         for k, v in iter(registry.items()):
             if v is None:
@@ -176,6 +202,7 @@ class ResourceRegistry(object):
         """
         descriptive_path = '/'.join(path)
         name = path[-1]
+        self._invalidate()
         # create the structure if needed
         registry = self._registry
         for key in path[:-1]:
@@ -240,12 +267,64 @@ class ResourceRegistry(object):
             yield impl
 
         # handle: "OS::*" -> "Dreamhost::*"
-        def is_a_glob(resource_type):
-            return resource_type.endswith('*')
-        globs = itertools.ifilter(is_a_glob, self._registry.keys())
-        for pattern in globs:
-            if self._registry[pattern].matches(resource_type):
-                yield self._registry[pattern]
+        globs = self._glob_prefixes()
+        for end in range(len(resource_type) + 1):
+            info = globs.get(resource_type[:end])
+            if info is not None:
+                yield info
+
+    def _invalidate(self):
+        self._version += 1
+        self._globs = None
+
+    def _glob_prefixes(self):
+        """Return the wildcard mappings, keyed by the prefix they match."""
+        if self._globs is None:
+            self._globs = dict((info.name[:-1], info)
+                               for info in self._registry.values()
+                               if isinstance(info, GlobResourceInfo))
+        return self._globs
+
+    def _lookup_cache(self):
+        """
+        Return the cache of lookups, emptied if this registry or the global
+        registry has changed since the lookups were made.
+        """
+        versions = (self._version, self.global_registry and
+                    self.global_registry._version)
+        if versions != self._cache_versions:
+            self._cache = {}
+            self._cache_versions = versions
+        return self._cache
+
+    def _is_mapped_name(self, resource_name):
+        registries = [self, self.global_registry]
+        return any(r is not None and resource_name in r._registry['resources']
+                   for r in registries)
+
+    def _sorted_matches(self, resource_type, resource_name):
+        """
+        Return the possible matches to the resource type and name from both
+        the user and global registries, best first.
+        """
+        # the name only matters when it has a specific mapping, so that all
+        # the other resources of a type share a single cache entry
+        if resource_name and not self._is_mapped_name(resource_name):
+            resource_name = None
+        key = (resource_type, resource_name)
+        matches = self._lookup_cache().get(key)
+        if matches is None:
+            if self.global_registry is not None:
+                giter = self.global_registry.iterable_by(resource_type,
+                                                         resource_name)
+            else:
+                giter = []
+
+            matches = sorted(itertools.chain(self.iterable_by(resource_type,
+                                                              resource_name),
+                                             giter))
+            self._lookup_cache()[key] = matches
+        return matches
 
     def get_resource_info(self, resource_type, resource_name=None,
                           registry_type=None, accept_fn=None):
@@ -266,17 +345,7 @@ class ResourceRegistry(object):
         #    - filter_by(is_user=False)
         # 4) as_dict() to write to the db
         #    - filter_by(is_user=True)
-        if self.global_registry is not None:
-            giter = self.global_registry.iterable_by(resource_type,
-                                                     resource_name)
-        else:
-            giter = []
-
-        matches = itertools.chain(self.iterable_by(resource_type,
-                                                   resource_name),
-                                  giter)
-
-        for info in sorted(matches):
+        for info in self._sorted_matches(resource_type, resource_name):
             match = info.get_resource_info(resource_type,
                                            resource_name)
             if ((registry_type is None or isinstance(match, registry_type)) and
@@ -363,6 +432,7 @@ class Environment(object):
             self.params = dict((k, v) for (k, v) in env.iteritems()
                                if k != RESOURCE_REGISTRY)
         self.constraints = {}
+        self._constraint_loaders = {}
 
     def load(self, env_snippet):
         self.registry.load(env_snippet.get(RESOURCE_REGISTRY, {}))
@@ -376,9 +446,18 @@ class Environment(object):
     def register_class(self, resource_type, resource_class):
         self.registry.register_class(resource_type, resource_class)
 
+    def register_lazy_class(self, resource_type, module_name, load_class):
+        self.registry.register_lazy_class(resource_type, module_name,
+                                          load_class)
+
     def register_constraint(self, constraint_name, constraint):
+        self._constraint_loaders.pop(constraint_name, None)
         self.constraints[constraint_name] = constraint
 
+    def register_lazy_constraint(self, constraint_name, load_constraint):
+        self.constraints.pop(constraint_name, None)
+        self._constraint_loaders[constraint_name] = load_constraint
+
     def get_class(self, resource_type, resource_name=None):
         return self.registry.get_class(resource_type, resource_name)
 
@@ -391,6 +470,12 @@ class Environment(object):
                                                registry_type)
 
     def get_constraint(self, name):
+        load_constraint = self._constraint_loaders.get(name)
+        if load_constraint is not None:
+            # only forget the loader once it has succeeded, so that a
+            # failure is reported again on each lookup
+            self.constraints[name] = load_constraint()
+            del self._constraint_loaders[name]
         return self.constraints.get(name)
 
 
@@ -31,7 +31,8 @@ class Event(object):
         '''
         Initialise from a context, stack, and event information. The timestamp
         and database ID may also be initialised if the event is already in the
-        database.
+        database, in which case resource_properties may be a function that
+        loads the properties only when they are first needed.
         '''
         self.context = context
         self.stack = stack
@@ -41,14 +42,29 @@ class Event(object):
         self.physical_resource_id = physical_resource_id
         self.resource_name = resource_name
         self.resource_type = resource_type
-        try:
-            self.resource_properties = dict(resource_properties)
-        except ValueError as ex:
-            self.resource_properties = {'Error': six.text_type(ex)}
+        if callable(resource_properties):
+            self._load_properties = resource_properties
+        else:
+            self._load_properties = None
+            self.resource_properties = resource_properties
         self.uuid = uuid
         self.timestamp = timestamp
         self.id = id
 
+    @property
+    def resource_properties(self):
+        if self._load_properties is not None:
+            self.resource_properties = self._load_properties()
+        return self._resource_properties
+
+    @resource_properties.setter
+    def resource_properties(self, resource_properties):
+        self._load_properties = None
+        try:
+            self._resource_properties = dict(resource_properties)
+        except ValueError as ex:
+            self._resource_properties = {'Error': six.text_type(ex)}
+
     @classmethod
     def load(cls, context, event_id, event=None, stack=None):
         '''Retrieve an Event from the database.'''
@@ -65,7 +81,7 @@ class Event(object):
 
         return cls(context, st, ev.resource_action, ev.resource_status,
                    ev.resource_status_reason, ev.physical_resource_id,
-                   ev.resource_properties, ev.resource_name,
+                   lambda: ev.resource_properties, ev.resource_name,
                    ev.resource_type, ev.uuid, ev.created_at, ev.id)
 
     def store(self):
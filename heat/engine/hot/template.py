@@ -155,7 +155,15 @@ class HOTemplate(template.Template):
     def resource_definitions(self, stack):
         allowed_keys = set(_RESOURCE_KEYS)
 
+        # Definitions already parsed from each snippet, so that resources
+        # sharing a snippet (such as the members of a group) share their
+        # parsed definition.
+        parsed = {}
+
         def rsrc_defn_item(name, snippet):
+            if id(snippet) in parsed:
+                return name, parsed[id(snippet)].renamed(name)
+
             data = self.parse(stack, snippet)
 
             def get_check_type(key, valid_types, typename, default=None):
@@ -212,6 +220,7 @@ class HOTemplate(template.Template):
                                                 depends,
                                                 deletion_policy,
                                                 update_policy)
+            parsed[id(snippet)] = defn
             return name, defn
 
         resources = self.t.get(self.RESOURCES) or {}
@@ -222,6 +231,4 @@ class HOTemplate(template.Template):
         if name is None:
             name = definition.name
 
-        if self.t.get(self.RESOURCES) is None:
-            self.t[self.RESOURCES] = {}
-        self.t[self.RESOURCES][name] = definition.render_hot()
+        self._resources_for_update()[name] = definition.render_hot()
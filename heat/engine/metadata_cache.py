@@ -0,0 +1,107 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+'''
+Per-engine cache of stored resource metadata, for serving the metadata
+polled by servers without loading their stack.
+
+Entries are invalidated when the metadata is written by this engine. Writes
+made by other engines become visible once the entry expires, after
+metadata_cache_ttl seconds.
+'''
+
+import collections
+import hashlib
+import json
+from time import time as wallclock
+
+from oslo.config import cfg
+
+cfg.CONF.import_opt('metadata_cache_ttl', 'heat.common.config')
+cfg.CONF.import_opt('metadata_cache_size', 'heat.common.config')
+
+
+class _TTLCache(object):
+    '''A bounded mapping whose entries expire after metadata_cache_ttl.'''
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        try:
+            expiry, value = self._entries[key]
+        except KeyError:
+            return None
+        if expiry <= wallclock():
+            del self._entries[key]
+            return None
+        return value
+
+    def put(self, key, value):
+        ttl = cfg.CONF.metadata_cache_ttl
+        size = cfg.CONF.metadata_cache_size
+        if ttl <= 0 or size <= 0:
+            return
+        self._entries.pop(key, None)
+        while len(self._entries) >= size:
+            self._entries.popitem(last=False)
+        self._entries[key] = (wallclock() + ttl, value)
+
+    def discard(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+_metadata = _TTLCache()
+_access = _TTLCache()
+
+
+def etag(metadata):
+    '''Return an ETag identifying the content of the metadata.'''
+    return hashlib.sha1(json.dumps(metadata, sort_keys=True)).hexdigest()
+
+
+def get_metadata(stack_id, resource_name):
+    '''Return a cached (metadata, etag) tuple, or None.'''
+    return _metadata.get((stack_id, resource_name))
+
+
+def set_metadata(stack_id, resource_name, metadata):
+    '''Cache the metadata, and return a (metadata, etag) tuple for it.'''
+    entry = (metadata, etag(metadata))
+    _metadata.put((stack_id, resource_name), entry)
+    return entry
+
+
+def invalidate(stack_id, resource_name):
+    '''Drop the cached metadata for a resource whose metadata was written.'''
+    _metadata.discard((stack_id, resource_name))
+
+
+def get_access_allowed(stack_id, credentials, resource_name):
+    '''
+    Return the cached result of authorising a stack user's credentials to
+    read a resource, or None if it is not cached.
+    '''
+    return _access.get((stack_id, credentials, resource_name))
+
+
+def set_access_allowed(stack_id, credentials, resource_name, allowed):
+    _access.put((stack_id, credentials, resource_name), allowed)
+
+
+def clear():
+    _metadata.clear()
+    _access.clear()
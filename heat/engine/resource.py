@@ -22,9 +22,11 @@ from heat.common import identifier
 from heat.common import short_id
 from heat.db import api as db_api
 from heat.engine import attributes
+from heat.engine import client_limiter
 from heat.engine import environment
 from heat.engine import event
 from heat.engine import function
+from heat.engine import metadata_cache
 from heat.engine.properties import Properties
 from heat.engine import resources
 from heat.engine import rsrc_defn
@@ -100,7 +102,8 @@ class Resource(object):
 
     support_status = support.SupportStatus()
 
-    # Default name to use for calls to self.client()
+    # Default name to use for calls to self.client(), and to limit the
+    # concurrent handle_* and check_*_complete calls against
     default_client_name = None
 
     def __new__(cls, name, definition, stack):
@@ -242,9 +245,11 @@ class Resource(object):
     def metadata_set(self, metadata):
         if self.id is None:
             raise exception.ResourceNotAvailable(resource_name=self.name)
-        rs = db_api.resource_get(self.stack.context, self.id)
-        rs.update_and_save({'rsrc_metadata': metadata})
+        if not self.stack.defer_metadata_write(self, metadata):
+            db_api.resource_update(self.stack.context, self.id,
+                                   {'rsrc_metadata': metadata})
         self._rsrc_metadata = metadata
+        metadata_cache.invalidate(self.stack.id, self.name)
 
     def type(self):
         return self.t.resource_type
@@ -442,13 +447,23 @@ class Resource(object):
 
             handle_data = None
             if callable(handle):
-                handle_data = (handle(resource_data) if resource_data else
-                               handle())
+                handle_data = (self._call_limited(handle, resource_data)
+                               if resource_data else
+                               self._call_limited(handle))
                 yield
                 if callable(check):
-                    while not check(handle_data):
+                    while not self._call_limited(check, handle_data):
                         yield
 
+    def _call_limited(self, func, *args):
+        '''
+        Call a handle_* or check_*_complete function, waiting if the engine
+        is already making the maximum number of concurrent calls to the
+        resource's default client.
+        '''
+        with client_limiter.limit(self.default_client_name):
+            return func(*args)
+
     def preview(self):
         '''
         Default implementation of Resource.preview.
@@ -569,10 +584,12 @@ class Resource(object):
             prop_diff = self.update_template_diff_properties(after_properties,
                                                              before_properties)
             if callable(getattr(self, 'handle_update', None)):
-                handle_data = self.handle_update(after, tmpl_diff, prop_diff)
+                handle_data = self._call_limited(self.handle_update, after,
+                                                 tmpl_diff, prop_diff)
                 yield
                 if callable(getattr(self, 'check_update_complete', None)):
-                    while not self.check_update_complete(handle_data):
+                    while not self._call_limited(self.check_update_complete,
+                                                 handle_data):
                         yield
 
         self.t = after
@@ -726,28 +743,35 @@ class Resource(object):
         self.resource_id = inst
         if self.id is not None:
             try:
-                rs = db_api.resource_get(self.context, self.id)
-                rs.update_and_save({'nova_instance': self.resource_id})
+                db_api.resource_update(self.context, self.id,
+                                       {'nova_instance': self.resource_id})
             except Exception as ex:
                 LOG.warn(_('db error %s') % ex)
 
+    def _db_values(self):
+        '''Return the values to create the resource in the database with.'''
+        return {'action': self.action,
+                'status': self.status,
+                'status_reason': self.status_reason,
+                'stack_id': self.stack.id,
+                'nova_instance': self.resource_id,
+                'name': self.name,
+                'rsrc_metadata': self.metadata_get(),
+                'stack_name': self.stack.name}
+
+    def _stored(self, rs):
+        '''Record that the resource was created in the database.'''
+        self.id = rs.id
+        self.created_time = rs.created_at
+        self._rsrc_metadata = rs.rsrc_metadata
+        metadata_cache.invalidate(self.stack.id, self.name)
+
     def _store(self):
         '''Create the resource in the database.'''
-        metadata = self.metadata_get()
+        rs = self._db_values()
         try:
-            rs = {'action': self.action,
-                  'status': self.status,
-                  'status_reason': self.status_reason,
-                  'stack_id': self.stack.id,
-                  'nova_instance': self.resource_id,
-                  'name': self.name,
-                  'rsrc_metadata': metadata,
-                  'stack_name': self.stack.name}
-
             new_rs = db_api.resource_create(self.context, rs)
-            self.id = new_rs.id
-            self.created_time = new_rs.created_at
-            self._rsrc_metadata = metadata
+            self._stored(new_rs)
         except Exception as ex:
             LOG.error(_('DB error %s') % ex)
 
@@ -766,19 +790,19 @@ class Resource(object):
 
         if self.id is not None:
             try:
-                rs = db_api.resource_get(self.context, self.id)
-                rs.update_and_save({'action': self.action,
-                                    'status': self.status,
-                                    'status_reason': reason,
-                                    'stack_id': self.stack.id,
-                                    'updated_at': self.updated_time,
-                                    'nova_instance': self.resource_id})
+                db_api.resource_update(self.context, self.id,
+                                       {'action': self.action,
+                                        'status': self.status,
+                                        'status_reason': reason,
+                                        'stack_id': self.stack.id,
+                                        'updated_at': self.updated_time,
+                                        'nova_instance': self.resource_id})
             except Exception as ex:
                 LOG.error(_('DB error %s') % ex)
 
         # store resource in DB on transition to CREATE_IN_PROGRESS
         # all other transitions (other than to DELETE_COMPLETE)
-        # should be handled by the update_and_save above..
+        # should be handled by the resource_update above..
         elif (action, status) in [(self.CREATE, self.IN_PROGRESS),
                                   (self.ADOPT, self.IN_PROGRESS)]:
             self._store()
@@ -11,11 +11,30 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import importlib
+import json
+
+from oslo.config import cfg
 from stevedore import extension
 
+from heat.common import exception
+from heat.common import plugin_loader
 from heat.engine import clients
 from heat.engine import environment
 from heat.engine import plugin_manager
+from heat.openstack.common.gettextutils import _
+from heat.openstack.common import log
+
+LOG = log.getLogger(__name__)
+
+cfg.CONF.import_opt('plugin_dirs', 'heat.common.config')
+cfg.CONF.import_opt('plugin_manifest', 'heat.common.config')
+
+# Sometimes resources should not be available for registration in Heat due
+# to unsatisfied dependencies. We look first for the function
+# 'available_resource_mapping', which should return the filtered resources.
+# If it is not found, we look for the legacy 'resource_mapping'.
+_RESOURCE_MAPPINGS = ['available_resource', 'resource']
 
 
 def _register_resources(env, type_pairs):
@@ -63,17 +82,96 @@ def _load_global_environment(env):
 
 
 def _load_global_resources(env):
+    manifest = _read_manifest()
+    if manifest is not None:
+        _load_manifest(env, manifest)
+        return
+
     _register_constraints(env, _get_mapping('heat.constraints'))
 
     manager = plugin_manager.PluginManager(__name__)
-    # Sometimes resources should not be available for registration in Heat due
-    # to unsatisfied dependencies. We look first for the function
-    # 'available_resource_mapping', which should return the filtered resources.
-    # If it is not found, we look for the legacy 'resource_mapping'.
-    resource_mapping = plugin_manager.PluginMapping(['available_resource',
-                                                     'resource'])
+    resource_mapping = plugin_manager.PluginMapping(_RESOURCE_MAPPINGS)
     constraint_mapping = plugin_manager.PluginMapping('constraint')
 
     _register_resources(env, resource_mapping.load_all(manager))
 
     _register_constraints(env, constraint_mapping.load_all(manager))
+
+
+def generate_manifest():
+    '''
+    Return a manifest of where each resource type and constraint is defined.
+
+    Resource types and constraints provided by a plugin module map to the
+    name of the module. Constraints provided by entry points map to the
+    entry point's "module:attribute" reference.
+    '''
+    mgr = extension.ExtensionManager(
+        namespace='heat.constraints',
+        invoke_on_load=False,
+        verify_requirements=True)
+    constraints = dict((name, '%s:%s' % (ext.entry_point.module_name,
+                                         '.'.join(ext.entry_point.attrs)))
+                       for name, ext in ((n, mgr[n]) for n in mgr.names()))
+    resources = {}
+
+    manager = plugin_manager.PluginManager(__name__)
+    resource_mapping = plugin_manager.PluginMapping(_RESOURCE_MAPPINGS)
+    constraint_mapping = plugin_manager.PluginMapping('constraint')
+    for module in manager.modules:
+        for res_type in resource_mapping.load_from_module(module):
+            resources[res_type] = module.__name__
+        for constraint_name in constraint_mapping.load_from_module(module):
+            constraints[constraint_name] = module.__name__
+
+    return {'resources': resources, 'constraints': constraints}
+
+
+def _read_manifest():
+    if not cfg.CONF.plugin_manifest:
+        return None
+
+    try:
+        with open(cfg.CONF.plugin_manifest) as manifest_fd:
+            return json.load(manifest_fd)
+    except (IOError, ValueError) as ex:
+        LOG.error(_('Failed to read plugin manifest %(path)s, loading all '
+                    'plugins: %(error)s') % {
+                        'path': cfg.CONF.plugin_manifest,
+                        'error': ex})
+        return None
+
+
+def _load_manifest(env, manifest):
+    # plugin modules are imported into this package on demand
+    plugin_loader.create_subpackage(cfg.CONF.plugin_dirs, 'heat.engine')
+
+    resource_mapping = plugin_manager.PluginMapping(_RESOURCE_MAPPINGS)
+    constraint_mapping = plugin_manager.PluginMapping('constraint')
+
+    def loader(mapping, name, ref):
+        return lambda: _load_plugin(mapping, name, ref)
+
+    for res_type, ref in manifest.get('resources', {}).items():
+        env.register_lazy_class(res_type, ref,
+                                loader(resource_mapping, res_type, ref))
+    for constraint_name, ref in manifest.get('constraints', {}).items():
+        env.register_lazy_constraint(
+            constraint_name, loader(constraint_mapping, constraint_name, ref))
+
+
+def _load_plugin(mapping, name, ref):
+    '''Import the resource class or constraint named in the manifest.'''
+    module_name, sep, attr = ref.partition(':')
+    LOG.debug('Loading %s from %s' % (name, ref))
+    module = importlib.import_module(module_name)
+    if sep:
+        return reduce(getattr, attr.split('.'), module)
+
+    plugin = mapping.load_from_module(module).get(name)
+    if plugin is None:
+        msg = _('%(name)s is no longer provided by %(module)s, the plugin '
+                'manifest is out of date') % {'name': name,
+                                              'module': module_name}
+        raise exception.StackValidationFailed(message=msg)
+    return plugin
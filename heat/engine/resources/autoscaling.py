@@ -14,6 +14,7 @@
 import copy
 import math
 
+from oslo.config import cfg
 import six
 
 from heat.common import exception
@@ -36,6 +37,9 @@ from heat.scaling import template
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('group_scale_batch_size', 'heat.common.config')
+cfg.CONF.import_opt('group_scale_batch_pause', 'heat.common.config')
+
 
 (SCALED_RESOURCE_TYPE,) = ('OS::Heat::ScaledResource',)
 
@@ -44,6 +48,14 @@ LOG = logging.getLogger(__name__)
     'ExactCapacity', 'ChangeInCapacity', 'PercentChangeInCapacity')
 
 
+def _pause_between_batch():
+    while True:
+        try:
+            yield
+        except scheduler.Timeout:
+            return
+
+
 class CooldownMixin(object):
     '''
     Utility class to encapsulate Cooldown related logic which is shared
@@ -330,13 +342,6 @@ class InstanceGroup(stack_resource.StackResource):
             affected = set(k for k, v in current ^ updated)
             return set(i.FnGetRefId() for i in instances if i.name in affected)
 
-        def pause_between_batch():
-            while True:
-                try:
-                    yield
-                except scheduler.Timeout:
-                    return
-
         capacity = len(self.nested()) if self.nested() else 0
         efft_bat_sz = min(batch_size, capacity)
         efft_min_sz = min(min_in_service, capacity)
@@ -364,7 +369,7 @@ class InstanceGroup(stack_resource.StackResource):
                 remainder -= efft_bat_sz
                 if remainder > 0 and pause_sec > 0:
                     self._lb_reload()
-                    waiter = scheduler.TaskRunner(pause_between_batch)
+                    waiter = scheduler.TaskRunner(_pause_between_batch)
                     waiter(timeout=pause_sec)
         finally:
             self._lb_reload()
@@ -373,14 +378,31 @@ class InstanceGroup(stack_resource.StackResource):
         """
         Resize the instance group to the new capacity.
 
-        When shrinking, the oldest instances will be removed.
+        When shrinking, the oldest instances will be removed. Changes larger
+        than group_scale_batch_size are made in batches.
         """
-        new_template = self._create_template(new_capacity)
+        capacity = len(self.get_instances())
+        capacities = template.batch_capacities(
+            capacity, new_capacity, cfg.CONF.group_scale_batch_size)
+        pause_sec = cfg.CONF.group_scale_batch_pause
         try:
-            updater = self.update_with_template(new_template,
-                                                self._environment())
-            updater.run_to_completion()
-            self.check_update_complete(updater)
+            for batch, batch_capacity in enumerate(capacities, 1):
+                new_template = self._create_template(batch_capacity)
+                updater = self.update_with_template(new_template,
+                                                    self._environment())
+                updater.run_to_completion()
+                self.check_update_complete(updater)
+
+                if batch < len(capacities):
+                    self._add_event(self.action, self.status,
+                                    _('Resized to %(capacity)d of '
+                                      '%(target)d instances') %
+                                    {'capacity': batch_capacity,
+                                     'target': new_capacity})
+                    if pause_sec > 0:
+                        self._lb_reload()
+                        waiter = scheduler.TaskRunner(_pause_between_batch)
+                        waiter(timeout=pause_sec)
         finally:
             # Reload the LB in any case, so it's only pointing at healthy
             # nodes.
@@ -393,6 +415,10 @@ class InstanceGroup(stack_resource.StackResource):
 
         This must be done after activation (instance in ACTIVE state),
         otherwise the instances' IP addresses may not be available.
+
+        A load balancer whose members are already up to date is left alone,
+        so repeated reloads during one operation only pass on the changes
+        made since the last one.
         '''
         exclude = exclude or []
         if self.properties[self.LOAD_BALANCER_NAMES]:
@@ -401,16 +427,21 @@ class InstanceGroup(stack_resource.StackResource):
             for lb in self.properties[self.LOAD_BALANCER_NAMES]:
                 lb_resource = self.stack[lb]
 
-                props = copy.copy(lb_resource.properties.data)
                 if 'Instances' in lb_resource.properties_schema:
-                    props['Instances'] = id_list
+                    members_key = 'Instances'
                 elif 'members' in lb_resource.properties_schema:
-                    props['members'] = id_list
+                    members_key = 'members'
                 else:
                     raise exception.Error(
                         _("Unsupported resource '%s' in LoadBalancerNames") %
                         (lb,))
 
+                if lb_resource.properties.data.get(members_key) == id_list:
+                    continue
+
+                props = copy.copy(lb_resource.properties.data)
+                props[members_key] = id_list
+
                 lb_defn = rsrc_defn.ResourceDefinition(
                     lb_resource.name,
                     lb_resource.type(),
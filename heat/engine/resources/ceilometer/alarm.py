@@ -94,6 +94,8 @@ def actions_to_urls(stack, properties):
 
 class CeilometerAlarm(resource.Resource):
 
+    default_client_name = 'ceilometer'
+
     PROPERTIES = (
         COMPARISON_OPERATOR, EVALUATION_PERIODS, METER_NAME, PERIOD,
         STATISTIC, THRESHOLD, MATCHING_METADATA,
@@ -202,6 +204,8 @@ class CeilometerAlarm(resource.Resource):
 
 class CombinationAlarm(resource.Resource):
 
+    default_client_name = 'ceilometer'
+
     PROPERTIES = (
         ALARM_IDS, OPERATOR,
     ) = (
@@ -114,6 +114,8 @@ class Restarter(signal_responder.SignalResponder):
 
 class Instance(resource.Resource):
 
+    default_client_name = 'nova'
+
     PROPERTIES = (
         IMAGE_ID, INSTANCE_TYPE, KEY_NAME, AVAILABILITY_ZONE,
         DISABLE_API_TERMINATION, KERNEL_ID, MONITORING,
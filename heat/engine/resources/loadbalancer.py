@@ -422,9 +422,7 @@ class LoadBalancer(stack_resource.StackResource):
 
         servers = []
         n = 1
-        client = self.nova()
-        for i in instances:
-            ip = nova_utils.server_to_ipaddress(client, i) or '0.0.0.0'
+        for ip in self._member_addresses(instances):
             LOG.debug('haproxy server:%s' % ip)
             servers.append('%sserver server%d %s:%s %s' % (spaces, n,
                                                            ip, inst_port,
@@ -433,6 +431,24 @@ class LoadBalancer(stack_resource.StackResource):
 
         return '%s%s%s%s\n' % (gl, frontend, backend, '\n'.join(servers))
 
+    def _member_addresses(self, instances):
+        '''
+        Return the IP address of each instance. Addresses already recorded in
+        the resource data are reused, so only new members are looked up.
+        '''
+        known = self.data()
+        client = None
+        addresses = []
+        for i in instances:
+            ip = known.get(i)
+            if ip is None:
+                client = client or self.nova()
+                ip = nova_utils.server_to_ipaddress(client, i)
+                if ip is not None:
+                    self.data_set(i, ip)
+            addresses.append(ip or '0.0.0.0')
+        return addresses
+
     def get_parsed_template(self):
         if cfg.CONF.loadbalancer_template:
             with open(cfg.CONF.loadbalancer_template) as templ_fd:
@@ -483,14 +499,32 @@ class LoadBalancer(stack_resource.StackResource):
         rely on the cfn-hup to reconfigure HAProxy
         '''
         if self.INSTANCES in prop_diff:
-            templ = self.get_parsed_template()
-            cfg = self._haproxy_config(templ, prop_diff[self.INSTANCES])
+            old_members = self.properties[self.INSTANCES] or []
+            members = prop_diff[self.INSTANCES] or []
+            self.update_members(
+                [i for i in members if i not in old_members],
+                [i for i in old_members if i not in members])
 
-            md = self.nested()['LB_instance'].metadata_get()
-            files = md['AWS::CloudFormation::Init']['config']['files']
-            files['/etc/haproxy/haproxy.cfg']['content'] = cfg
+    def update_members(self, added, removed):
+        '''
+        Add and remove instances behind the load balancer. Only the added
+        instances have their addresses looked up before the haproxy config
+        is regenerated.
+        '''
+        members = [i for i in self.properties[self.INSTANCES] or []
+                   if i not in removed]
+        members.extend(i for i in added if i not in members)
+        for i in removed:
+            self.data_delete(i)
+
+        templ = self.get_parsed_template()
+        cfg = self._haproxy_config(templ, members)
+
+        md = self.nested()['LB_instance'].metadata_get()
+        files = md['AWS::CloudFormation::Init']['config']['files']
+        files['/etc/haproxy/haproxy.cfg']['content'] = cfg
 
-            self.nested()['LB_instance'].metadata_set(md)
+        self.nested()['LB_instance'].metadata_set(md)
 
     def handle_delete(self):
         return self.delete_nested()
@@ -662,28 +662,39 @@ class LoadBalancer(resource.Resource):
     def handle_update(self, json_snippet, tmpl_diff, prop_diff):
         if self.MEMBERS in prop_diff:
             members = set(prop_diff[self.MEMBERS])
-            rd_members = self.data()
-            old_members = set(rd_members.keys())
-            client = self.neutron()
-            for member in old_members - members:
-                member_id = rd_members[member]
-                try:
-                    client.delete_member(member_id)
-                except NeutronClientException as ex:
-                    if ex.status_code != 404:
-                        raise ex
-                self.data_delete(member)
-            pool = self.properties[self.POOL_ID]
-            nova_client = self.nova()
-            protocol_port = self.properties[self.PROTOCOL_PORT]
-            for member in members - old_members:
-                address = nova_utils.server_to_ipaddress(nova_client, member)
-                lb_member = client.create_member({
-                    'member': {
-                        'pool_id': pool,
-                        'address': address,
-                        'protocol_port': protocol_port}})['member']
-                self.data_set(member, lb_member['id'])
+            old_members = set(self.data().keys())
+            self.update_members(members - old_members, old_members - members)
+
+    def update_members(self, added, removed):
+        '''
+        Create pool members for the added servers and delete those of the
+        removed servers, leaving the other members untouched.
+        '''
+        rd_members = self.data()
+        client = self.neutron()
+        for member in removed:
+            member_id = rd_members.get(member)
+            if member_id is None:
+                continue
+            try:
+                client.delete_member(member_id)
+            except NeutronClientException as ex:
+                if ex.status_code != 404:
+                    raise ex
+            self.data_delete(member)
+        pool = self.properties[self.POOL_ID]
+        nova_client = self.nova()
+        protocol_port = self.properties[self.PROTOCOL_PORT]
+        for member in added:
+            if member in rd_members:
+                continue
+            address = nova_utils.server_to_ipaddress(nova_client, member)
+            lb_member = client.create_member({
+                'member': {
+                    'pool_id': pool,
+                    'address': address,
+                    'protocol_port': protocol_port}})['member']
+            self.data_set(member, lb_member['id'])
 
     def handle_delete(self):
         client = self.neutron()
@@ -24,6 +24,8 @@ LOG = logging.getLogger(__name__)
 
 class NeutronResource(resource.Resource):
 
+    default_client_name = 'neutron'
+
     def validate(self):
         '''
         Validate any of the provided params
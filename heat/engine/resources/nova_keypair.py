@@ -36,6 +36,8 @@ class KeyPair(resource.Resource):
     save.
     """
 
+    default_client_name = 'nova'
+
     PROPERTIES = (
         NAME, SAVE_PRIVATE_KEY, PUBLIC_KEY,
     ) = (
@@ -30,6 +30,8 @@ class OSDBInstance(resource.Resource):
     OpenStack cloud database instance resource.
     '''
 
+    default_client_name = 'trove'
+
     TROVE_STATUS = (
         ERROR, FAILED, ACTIVE,
     ) = (
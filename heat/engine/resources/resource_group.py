@@ -11,15 +11,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
+from oslo.config import cfg
 
 from heat.common import exception
 from heat.engine import attributes
 from heat.engine import constraints
 from heat.engine import parser
 from heat.engine import properties
+from heat.engine import scheduler
 from heat.engine import stack_resource
 from heat.openstack.common.gettextutils import _
+from heat.scaling import template
+
+cfg.CONF.import_opt('group_scale_batch_size', 'heat.common.config')
+cfg.CONF.import_opt('group_scale_batch_pause', 'heat.common.config')
 
 
 template_template = {
@@ -118,9 +123,40 @@ class ResourceGroup(stack_resource.StackResource):
     def handle_update(self, new_snippet, tmpl_diff, prop_diff):
         count = prop_diff.get(self.COUNT)
         if count:
-            return self.update_with_template(self._assemble_nested(count),
-                                             {},
-                                             self.stack.timeout_mins)
+            nested = self.nested()
+            current = len(nested) if nested is not None else 0
+            counts = template.batch_capacities(
+                current, count, cfg.CONF.group_scale_batch_size)
+            if len(counts) == 1:
+                return self.update_with_template(self._assemble_nested(count),
+                                                 {},
+                                                 self.stack.timeout_mins)
+
+            updater = scheduler.TaskRunner(self._update_in_batches, counts)
+            updater.start()
+            return updater
+
+    def _update_in_batches(self, counts):
+        '''
+        Update the nested stack through each of the given member counts in
+        turn, pausing for group_scale_batch_pause seconds between them.
+        '''
+        pause_sec = cfg.CONF.group_scale_batch_pause
+        for batch, count in enumerate(counts, 1):
+            updater = self.update_with_template(self._assemble_nested(count),
+                                                {},
+                                                self.stack.timeout_mins)
+            while not self.check_update_complete(updater):
+                yield
+
+            if batch < len(counts):
+                self._add_event(self.action, self.status,
+                                _('Resized to %(count)d of %(target)d '
+                                  'resources') % {'count': count,
+                                                  'target': counts[-1]})
+                pause_end = scheduler.wallclock() + pause_sec
+                while scheduler.wallclock() < pause_end:
+                    yield
 
     def handle_delete(self):
         return self.delete_nested()
@@ -149,7 +185,7 @@ class ResourceGroup(stack_resource.StackResource):
             return attributes.select_from_attribute(attribute, path)
 
     def _assemble_nested(self, count, include_all=False):
-        child_template = copy.deepcopy(template_template)
+        child_template = dict(template_template)
         resource_def = self.properties[self.RESOURCE_DEF]
         if resource_def[self.RESOURCE_DEF_PROPERTIES] is None:
             resource_def[self.RESOURCE_DEF_PROPERTIES] = {}
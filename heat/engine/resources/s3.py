@@ -25,6 +25,8 @@ LOG = logging.getLogger(__name__)
 
 class S3Bucket(resource.Resource):
 
+    default_client_name = 'swift'
+
     PROPERTIES = (
         ACCESS_CONTROL, WEBSITE_CONFIGURATION, TAGS,
     ) = (
@@ -39,6 +39,8 @@ LOG = logging.getLogger(__name__)
 
 class Server(stack_user.StackUser):
 
+    default_client_name = 'nova'
+
     PROPERTIES = (
         NAME, IMAGE, BLOCK_DEVICE_MAPPING, FLAVOR,
         FLAVOR_UPDATE_POLICY, IMAGE_UPDATE_POLICY, KEY_NAME,
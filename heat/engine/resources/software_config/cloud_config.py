@@ -50,8 +50,7 @@ class CloudConfig(software_config.SoftwareConfig):
         cloud_config = yaml.dump(self.properties.get(
             self.CLOUD_CONFIG), Dumper=yaml_dumper)
         props[self.CONFIG] = '#cloud-config\n%s' % cloud_config
-        sc = self.heat().software_configs.create(**props)
-        self.resource_id_set(sc.id)
+        self.resource_id_set(self._create_config(props))
 
 
 def resource_mapping():
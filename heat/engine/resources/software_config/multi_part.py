@@ -93,8 +93,7 @@ class MultipartMime(software_config.SoftwareConfig):
     def handle_create(self):
         props = {self.NAME: self.physical_resource_name()}
         props[self.CONFIG] = self.get_message()
-        sc = self.heat().software_configs.create(**props)
-        self.resource_id_set(sc.id)
+        self.resource_id_set(self._create_config(props))
 
     def get_message(self):
         if self.message:
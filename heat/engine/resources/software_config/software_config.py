@@ -12,14 +12,19 @@
 #    under the License.
 
 import heatclient.exc as heat_exp
+from oslo.config import cfg
 
 from heat.common import exception
 from heat.engine import attributes
 from heat.engine import constraints
 from heat.engine import properties
 from heat.engine import resource
+from heat.engine import service_software_config
 from heat.openstack.common.gettextutils import _
 from heat.openstack.common import log as logging
+from heat.rpc import api as rpc_api
+
+cfg.CONF.import_opt('software_config_direct_db', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -152,12 +157,31 @@ class SoftwareConfig(resource.Resource):
         ),
     }
 
+    # Stateless accessor for configs in the engine database, used instead of
+    # heatclient when software_config_direct_db is enabled
+    config_service = service_software_config.SoftwareConfigService()
+
     def handle_create(self):
         props = dict(self.properties)
         props[self.NAME] = self.physical_resource_name()
 
-        sc = self.heat().software_configs.create(**props)
-        self.resource_id_set(sc.id)
+        self.resource_id_set(self._create_config(props))
+
+    def _create_config(self, props):
+        '''Store a new software config and return its ID.'''
+        if not cfg.CONF.software_config_direct_db:
+            sc = self.heat().software_configs.create(**props)
+            return sc.id
+
+        sc = self.config_service.create_software_config(
+            self.context,
+            group=props.get(self.GROUP),
+            name=props.get(self.NAME),
+            config=props.get(self.CONFIG),
+            inputs=props.get(self.INPUTS),
+            outputs=props.get(self.OUTPUTS),
+            options=props.get(self.OPTIONS))
+        return sc[rpc_api.SOFTWARE_CONFIG_ID]
 
     def handle_delete(self):
 
@@ -165,8 +189,12 @@ class SoftwareConfig(resource.Resource):
             return
 
         try:
-            self.heat().software_configs.delete(self.resource_id)
-        except heat_exp.HTTPNotFound:
+            if cfg.CONF.software_config_direct_db:
+                self.config_service.delete_software_config(self.context,
+                                                           self.resource_id)
+            else:
+                self.heat().software_configs.delete(self.resource_id)
+        except (heat_exp.HTTPNotFound, exception.NotFound):
             LOG.debug(
                 'Software config %s is not found.' % self.resource_id)
 
@@ -176,6 +204,13 @@ class SoftwareConfig(resource.Resource):
          software config does not exist, returns an empty string.
         '''
         if name == self.CONFIG_ATTR and self.resource_id:
+            if cfg.CONF.software_config_direct_db:
+                try:
+                    sc = self.config_service.show_software_config(
+                        self.context, self.resource_id)
+                except exception.NotFound:
+                    return ''
+                return sc[rpc_api.SOFTWARE_CONFIG_CONFIG]
             try:
                 return self.get_software_config(self.heat(), self.resource_id)
             except exception.SoftwareConfigMissing:
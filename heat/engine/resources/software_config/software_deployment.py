@@ -17,6 +17,7 @@ import copy
 import uuid
 
 import heatclient.exc as heat_exp
+from oslo.config import cfg
 
 from heat.common import exception
 from heat.engine import attributes
@@ -24,8 +25,13 @@ from heat.engine import constraints
 from heat.engine import properties
 from heat.engine import resource
 from heat.engine.resources.software_config import software_config as sc
+from heat.engine import service_software_config
 from heat.engine import signal_responder
+from heat.engine import signal_waiter
 from heat.openstack.common import log as logging
+from heat.rpc import api as rpc_api
+
+cfg.CONF.import_opt('software_config_direct_db', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -160,6 +166,17 @@ class SoftwareDeployment(signal_responder.SignalResponder):
         ),
     }
 
+    # Stateless accessor for configs and deployments in the engine database,
+    # used instead of heatclient when software_config_direct_db is enabled
+    config_service = service_software_config.SoftwareConfigService()
+
+    # Wakes _check_complete when the deployment status is updated
+    _waiter = None
+
+    @staticmethod
+    def _direct_db():
+        return cfg.CONF.software_config_direct_db
+
     def _signal_transport_cfn(self):
         return self.properties.get(
             self.SIGNAL_TRANSPORT) == self.CFN_SIGNAL
@@ -190,16 +207,31 @@ class SoftwareDeployment(signal_responder.SignalResponder):
 
     def _delete_derived_config(self, derived_config_id):
         try:
-            self.heat().software_configs.delete(derived_config_id)
-        except heat_exp.HTTPNotFound:
+            if self._direct_db():
+                self.config_service.delete_software_config(self.context,
+                                                           derived_config_id)
+            else:
+                self.heat().software_configs.delete(derived_config_id)
+        except (heat_exp.HTTPNotFound, exception.NotFound):
             pass
 
+    def _get_software_config(self, config_id):
+        '''Return the software config :config_id: as a dict.'''
+        if self._direct_db():
+            return self.config_service.show_software_config(self.context,
+                                                            config_id)
+        return self.heat().software_configs.get(config_id).to_dict()
+
     def _get_derived_config(self, action):
 
         source_config_id = self.properties.get(self.CONFIG)
-        source_config = self.heat().software_configs.get(source_config_id)
+        source_config = self._get_software_config(source_config_id)
         derived_params = self._build_derived_config_params(
-            action, source_config.to_dict())
+            action, source_config)
+        if self._direct_db():
+            derived_config = self.config_service.create_software_config(
+                self.context, **derived_params)
+            return derived_config[rpc_api.SOFTWARE_CONFIG_ID]
         derived_config = self.heat().software_configs.create(**derived_params)
         return derived_config.id
 
@@ -212,7 +244,9 @@ class SoftwareDeployment(signal_responder.SignalResponder):
             self._get_derived_config(action),
             action)
 
-        if action == self.CREATE:
+        if self._direct_db():
+            sd = self._handle_action_direct(action, props)
+        elif action == self.CREATE:
             sd = self.heat().software_deployments.create(**props)
             self.resource_id_set(sd.id)
         else:
@@ -222,23 +256,72 @@ class SoftwareDeployment(signal_responder.SignalResponder):
             if previous_derived_config:
                 self._delete_derived_config(previous_derived_config)
         if not self._signal_transport_none():
+            self._start_waiting(self.resource_id)
             return sd
 
-    @staticmethod
-    def _check_complete(sd):
+    def _start_waiting(self, deployment_id):
+        self._stop_waiting()
+        self._waiter = signal_waiter.register(deployment_id)
+
+    def _stop_waiting(self):
+        if self._waiter is not None:
+            signal_waiter.unregister(self._waiter)
+            self._waiter = None
+
+    def _handle_action_direct(self, action, props):
+        '''
+        Write the deployment for :action: to the engine database, returning
+        the deployment ID to poll for completion.
+        '''
+        if action == self.CREATE:
+            sd = self.config_service.create_software_deployment(
+                self.context, input_values=None, **props)
+            self.resource_id_set(sd[rpc_api.SOFTWARE_DEPLOYMENT_ID])
+            return self.resource_id
+
+        sd = self.config_service.show_software_deployment(self.context,
+                                                          self.resource_id)
+        previous_derived_config = sd[rpc_api.SOFTWARE_DEPLOYMENT_CONFIG_ID]
+        self.config_service.update_software_deployment(
+            self.context,
+            deployment_id=self.resource_id,
+            config_id=props['config_id'],
+            input_values=None,
+            output_values=None,
+            action=props['action'],
+            status=props['status'],
+            status_reason=props['status_reason'])
+        if previous_derived_config:
+            self._delete_derived_config(previous_derived_config)
+        return self.resource_id
+
+    def _check_complete(self, sd):
         if not sd:
             return True
-        # NOTE(dprince): when lazy loading the sd attributes
-        # we need to support multiple versions of heatclient
-        if hasattr(sd, 'get'):
-            sd.get()
+        if self._waiter is not None and not self._waiter.ready():
+            # the status has not been updated since the last check
+            return False
+        if self._direct_db():
+            sd = self.config_service.show_software_deployment(self.context,
+                                                              sd)
+            status = sd[rpc_api.SOFTWARE_DEPLOYMENT_STATUS]
+            status_reason = sd[rpc_api.SOFTWARE_DEPLOYMENT_STATUS_REASON]
         else:
-            sd._get()
-        if sd.status == SoftwareDeployment.COMPLETE:
+            # NOTE(dprince): when lazy loading the sd attributes
+            # we need to support multiple versions of heatclient
+            if hasattr(sd, 'get'):
+                sd.get()
+            else:
+                sd._get()
+            status = sd.status
+            status_reason = sd.status_reason
+        if status == SoftwareDeployment.COMPLETE:
+            self._stop_waiting()
             return True
-        elif sd.status == SoftwareDeployment.FAILED:
+        elif status == SoftwareDeployment.FAILED:
+            self._stop_waiting()
             message = _("Deployment to server "
-                        "failed: %s") % sd.status_reason
+                        "failed: %s") % status_reason
             LOG.error(message)
             exc = exception.Error(message)
             raise exc
@@ -401,10 +484,19 @@ class SoftwareDeployment(signal_responder.SignalResponder):
         derived_config_id = None
         if self.resource_id is not None:
             try:
-                sd = self.heat().software_deployments.get(self.resource_id)
-                derived_config_id = sd.config_id
-                sd.delete()
-            except heat_exp.HTTPNotFound:
+                if self._direct_db():
+                    sd = self.config_service.show_software_deployment(
+                        self.context, self.resource_id)
+                    derived_config_id = sd[
+                        rpc_api.SOFTWARE_DEPLOYMENT_CONFIG_ID]
+                    self.config_service.delete_software_deployment(
+                        self.context, self.resource_id)
+                else:
+                    sd = self.heat().software_deployments.get(
+                        self.resource_id)
+                    derived_config_id = sd.config_id
+                    sd.delete()
+            except (heat_exp.HTTPNotFound, exception.NotFound):
                 pass
 
         if derived_config_id:
@@ -423,15 +515,27 @@ class SoftwareDeployment(signal_responder.SignalResponder):
         return self._check_complete(sd)
 
     def handle_signal(self, details):
-        sd = self.heat().software_deployments.get(self.resource_id)
-        sc = self.heat().software_configs.get(self.properties[self.CONFIG])
-        if not sd.status == self.IN_PROGRESS:
+        if self._direct_db():
+            sd = self.config_service.show_software_deployment(
+                self.context, self.resource_id)
+            sd_status = sd[rpc_api.SOFTWARE_DEPLOYMENT_STATUS]
+            sd_output_values = sd[rpc_api.SOFTWARE_DEPLOYMENT_OUTPUT_VALUES]
+            sc = self._get_software_config(self.properties[self.CONFIG])
+            sc_outputs = sc[rpc_api.SOFTWARE_CONFIG_OUTPUTS]
+        else:
+            sd = self.heat().software_deployments.get(self.resource_id)
+            sd_status = sd.status
+            sd_output_values = sd.output_values
+            sc = self.heat().software_configs.get(
+                self.properties[self.CONFIG])
+            sc_outputs = sc.outputs
+        if not sd_status == self.IN_PROGRESS:
             # output values are only expected when in an IN_PROGRESS state
             return
 
         details = details or {}
 
-        ov = sd.output_values or {}
+        ov = sd_output_values or {}
         status = None
         status_reasons = {}
         status_code = details.get(self.STATUS_CODE)
@@ -441,7 +545,7 @@ class SoftwareDeployment(signal_responder.SignalResponder):
                 'Deployment exited with non-zero status code: %s'
             ) % details.get(self.STATUS_CODE)
 
-        for output in sc.outputs or []:
+        for output in sc_outputs or []:
             out_key = output['name']
             if out_key in details:
                 ov[out_key] = details[out_key]
@@ -460,21 +564,46 @@ class SoftwareDeployment(signal_responder.SignalResponder):
         else:
             status = self.COMPLETE
             status_reason = _('Outputs received')
-        sd.update(output_values=ov, status=status, status_reason=status_reason)
+        if self._direct_db():
+            self.config_service.update_software_deployment(
+                self.context,
+                deployment_id=self.resource_id,
+                config_id=None,
+                input_values=None,
+                output_values=ov,
+                action=None,
+                status=status,
+                status_reason=status_reason)
+        else:
+            sd.update(output_values=ov, status=status,
+                      status_reason=status_reason)
 
     def FnGetAtt(self, key, *path):
         '''
         Resource attributes map to deployment outputs values
         '''
-        sd = self.heat().software_deployments.get(self.resource_id)
-        if key in sd.output_values:
-            attribute = sd.output_values.get(key)
+        if self._direct_db():
+            sd = self.config_service.show_software_deployment(
+                self.context, self.resource_id)
+            output_values = (
+                sd[rpc_api.SOFTWARE_DEPLOYMENT_OUTPUT_VALUES] or {})
+        else:
+            sd = self.heat().software_deployments.get(self.resource_id)
+            output_values = sd.output_values
+        if key in output_values:
+            attribute = output_values.get(key)
             return attributes.select_from_attribute(attribute, path)
 
         # Since there is no value for this key yet, check the output schemas
         # to find out if the key is valid
-        sc = self.heat().software_configs.get(self.properties[self.CONFIG])
-        output_keys = [output['name'] for output in sc.outputs]
+        if self._direct_db():
+            sc = self._get_software_config(self.properties[self.CONFIG])
+            outputs = sc[rpc_api.SOFTWARE_CONFIG_OUTPUTS] or []
+        else:
+            sc = self.heat().software_configs.get(
+                self.properties[self.CONFIG])
+            outputs = sc.outputs
+        output_keys = [output['name'] for output in outputs]
         if key not in output_keys and key not in self.ATTRIBUTES:
             raise exception.InvalidTemplateAttribute(resource=self.name,
                                                      key=key)
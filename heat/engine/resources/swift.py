@@ -23,6 +23,8 @@ LOG = logging.getLogger(__name__)
 
 
 class SwiftContainer(resource.Resource):
+    default_client_name = 'swift'
+
     PROPERTIES = (
         NAME, X_CONTAINER_READ, X_CONTAINER_WRITE, X_CONTAINER_META,
         X_ACCOUNT_META
@@ -30,6 +30,8 @@ LOG = logging.getLogger(__name__)
 
 class Volume(resource.Resource):
 
+    default_client_name = 'cinder'
+
     PROPERTIES = (
         AVAILABILITY_ZONE, SIZE, BACKUP_ID, TAGS,
     ) = (
@@ -365,6 +367,8 @@ class VolumeDetachTask(object):
 
 
 class VolumeAttachment(resource.Resource):
+    default_client_name = 'nova'
+
     PROPERTIES = (
         INSTANCE_ID, VOLUME_ID, DEVICE,
     ) = (
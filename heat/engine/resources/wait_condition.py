@@ -22,6 +22,7 @@ from heat.engine import properties
 from heat.engine import resource
 from heat.engine import scheduler
 from heat.engine import signal_responder
+from heat.engine import signal_waiter
 from heat.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
@@ -69,6 +70,7 @@ class BaseWaitConditionHandle(signal_responder.SignalResponder):
                 safe_metadata[k] = metadata[k]
             rsrc_metadata.update({metadata[self.UNIQUE_ID]: safe_metadata})
             self.metadata_set(rsrc_metadata)
+            signal_waiter.notify(self.context, self.stack.id, self.id)
         else:
             LOG.error(_("Metadata failed validation for %s") % self.name)
             raise ValueError(_("Metadata format invalid"))
@@ -348,26 +350,34 @@ class HeatWaitCondition(resource.Resource):
         return self.stack.resource_by_refid(self.properties[self.HANDLE])
 
     def _wait(self, handle):
-        while True:
-            try:
-                yield
-            except scheduler.Timeout:
-                timeout = WaitConditionTimeout(self, handle)
-                LOG.info(_('%(name)s Timed out (%(timeout)s)')
-                         % {'name': str(self), 'timeout': str(timeout)})
-                raise timeout
-
-            handle_status = handle.get_status()
-
-            if any(s != handle.STATUS_SUCCESS for s in handle_status):
-                failure = WaitConditionFailure(self, handle)
-                LOG.info(_('%(name)s Failed (%(failure)s)')
-                         % {'name': str(self), 'failure': str(failure)})
-                raise failure
-
-            if len(handle_status) >= self.properties[self.COUNT]:
-                LOG.info(_("%s Succeeded") % str(self))
-                return
+        waiter = signal_waiter.register(handle.id)
+        try:
+            while True:
+                try:
+                    yield
+                except scheduler.Timeout:
+                    timeout = WaitConditionTimeout(self, handle)
+                    LOG.info(_('%(name)s Timed out (%(timeout)s)')
+                             % {'name': str(self), 'timeout': str(timeout)})
+                    raise timeout
+
+                if not waiter.ready():
+                    # no signal has been received since the last check
+                    continue
+
+                handle_status = handle.get_status()
+
+                if any(s != handle.STATUS_SUCCESS for s in handle_status):
+                    failure = WaitConditionFailure(self, handle)
+                    LOG.info(_('%(name)s Failed (%(failure)s)')
+                             % {'name': str(self), 'failure': str(failure)})
+                    raise failure
+
+                if len(handle_status) >= self.properties[self.COUNT]:
+                    LOG.info(_("%s Succeeded") % str(self))
+                    return
+        finally:
+            signal_waiter.unregister(waiter)
 
     def handle_create(self):
         handle = self._get_handle_resource()
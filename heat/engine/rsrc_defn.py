@@ -109,6 +109,17 @@ class ResourceDefinitionCore(object):
                           reparse_snippet(self._deletion_policy),
                           reparse_snippet(self._update_policy))
 
+    def renamed(self, name):
+        """
+        Return a copy of the resource definition with a different name.
+
+        The copy shares the parsed data of this definition, so it is much
+        cheaper than parsing the same template snippet again.
+        """
+        defn = copy.copy(self)
+        defn.name = name
+        return defn
+
     def dependencies(self, stack):
         """
         Return the Resource objects in the given stack on which this depends.
@@ -133,6 +144,13 @@ class ResourceDefinitionCore(object):
                                strict_func_deps(self._metadata,
                                                 path(METADATA)))
 
+    def metadata_dependencies(self):
+        """
+        Return the Resource objects referenced in the metadata.
+        """
+        return function.dependencies(self._metadata,
+                                     '.'.join([self.name, METADATA]))
+
     def properties(self, schema, context=None):
         """
         Return a Properties object representing the resource properties.
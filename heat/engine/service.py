@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import eventlet
 import functools
 import json
@@ -29,14 +30,18 @@ from heat.common import messaging as rpc_messaging
 from heat.db import api as db_api
 from heat.engine import api
 from heat.engine import attributes
+from heat.engine import client_limiter
 from heat.engine import clients
 from heat.engine import environment
+from heat.engine import metadata_cache
 from heat.engine.event import Event
 from heat.engine import parameter_groups
 from heat.engine import parser
 from heat.engine import properties
 from heat.engine import resource
 from heat.engine import resources
+from heat.engine import service_software_config
+from heat.engine import signal_waiter
 from heat.engine import stack_lock
 from heat.engine import watchrule
 from heat.openstack.common.gettextutils import _
@@ -50,6 +55,11 @@ from heat.rpc import api as rpc_api
 cfg.CONF.import_opt('engine_life_check_timeout', 'heat.common.config')
 cfg.CONF.import_opt('max_resources_per_stack', 'heat.common.config')
 cfg.CONF.import_opt('max_stacks_per_tenant', 'heat.common.config')
+cfg.CONF.import_opt('max_concurrent_stack_actions', 'heat.common.config')
+cfg.CONF.import_opt('max_queued_stack_actions', 'heat.common.config')
+cfg.CONF.import_opt('engine_heartbeat_interval', 'heat.common.config')
+cfg.CONF.import_opt('engine_heartbeat_timeout', 'heat.common.config')
+cfg.CONF.import_opt('async_stack_validation', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -60,7 +70,8 @@ def request_context(func):
         if ctx is not None and not isinstance(ctx, context.RequestContext):
             ctx = context.RequestContext.from_dict(ctx.to_dict())
         try:
-            return func(self, ctx, *args, **kwargs)
+            with db_api.track_statements(func.__name__):
+                return func(self, ctx, *args, **kwargs)
         except exception.HeatException:
             raise messaging.rpc.dispatcher.ExpectedException()
     return wrapped
@@ -72,6 +83,13 @@ class ThreadGroupManager(object):
         super(ThreadGroupManager, self).__init__()
         self.groups = {}
 
+        # Numbers of running stack actions, keyed by tenant, and the actions
+        # waiting for a free slot when max_concurrent_stack_actions are
+        # running, in a queue for each tenant
+        self._running = collections.defaultdict(int)
+        self._queued = collections.OrderedDict()
+        self._stopping = False
+
         # Create dummy service task, because when there is nothing queued
         # on self.tg the process exits
         self.add_timer(cfg.CONF.periodic_interval, self._service_task)
@@ -118,6 +136,12 @@ class ThreadGroupManager(object):
         Run the given method in a sub-thread and release the provided lock
         when the thread finishes.
 
+        If max_concurrent_stack_actions are already running, the method is
+        queued (still holding the lock) until one of them finishes. If
+        max_queued_stack_actions are already queued, EngineOverloaded is
+        raised instead. Actions on nested stacks are never queued, since
+        the action on their parent stack would be waiting for them.
+
         :param stack: Stack to be operated on
         :type stack: heat.engine.parser.Stack
         :param lock: The acquired stack lock
@@ -128,15 +152,127 @@ class ThreadGroupManager(object):
         :param kwargs: Keyword-args to be passed to func
 
         """
+        if stack.owner_id is not None:
+            self._start_action(stack, lock, func, args, kwargs,
+                               counted=False)
+            return
+
+        action = (stack, lock, func, args, kwargs)
+        if self._has_capacity():
+            self._start_action(*action)
+            return
+
+        self.check_capacity(stack.name)
+        queue = self._queued.setdefault(stack.tenant_id,
+                                        collections.deque())
+        queue.append(action)
+        LOG.info(_('Queued action on stack %(stack)s, with %(depth)d '
+                   'actions queued') % {'stack': stack.name,
+                                        'depth': self.queue_depth()})
+        self._stack_event(stack, _('Stack action queued'))
+
+    def check_capacity(self, stack_name):
+        """
+        Raise EngineOverloaded if an action on the named top-level stack
+        would be rejected were it started now.
+        """
+        if (not self._has_capacity() and
+                self.queue_depth() >= cfg.CONF.max_queued_stack_actions):
+            LOG.warning(_('Rejecting action on stack %(stack)s, with '
+                          '%(depth)d actions queued') %
+                        {'stack': stack_name, 'depth': self.queue_depth()})
+            raise exception.EngineOverloaded()
+
+    def _has_capacity(self):
+        limit = cfg.CONF.max_concurrent_stack_actions
+        return limit <= 0 or sum(self._running.values()) < limit
+
+    def _start_action(self, stack, lock, func, args, kwargs, counted=True):
+        tenant_id = stack.tenant_id
+        if counted:
+            self._running[tenant_id] += 1
+
         def release(gt, *args):
             """
             Callback function that will be passed to GreenThread.link().
             """
-            lock.release(*args)
-
-        th = self.start(stack.id, func, *args, **kwargs)
+            try:
+                lock.release(*args)
+            finally:
+                if counted:
+                    self._running[tenant_id] -= 1
+                    if not self._running[tenant_id]:
+                        del self._running[tenant_id]
+                    self._start_queued()
+
+        def run_action(*args, **kwargs):
+            name = 'stack action %s' % getattr(func, '__name__', func)
+            with db_api.track_statements(name):
+                return func(*args, **kwargs)
+
+        th = self.start(stack.id, run_action, *args, **kwargs)
         th.link(release, stack.id)
 
+    def _start_queued(self):
+        """
+        Start queued actions while there are free slots, giving each to the
+        tenant with the fewest running actions. Tenants with equal numbers
+        take turns. Nothing is started once the engine is stopping.
+        """
+        while self._queued and self._has_capacity() and not self._stopping:
+            tenant_id = min(self._queued,
+                            key=lambda t: self._running.get(t, 0))
+            queue = self._queued.pop(tenant_id)
+            action = queue.popleft()
+            if queue:
+                self._queued[tenant_id] = queue
+            self._stack_event(action[0], _('Queued stack action started'))
+            self._start_action(*action)
+
+    def stop_queued(self):
+        """
+        Stop starting queued actions, and release the stack locks of those
+        that have not started. Stacks left in progress by the request that
+        queued the action, such as new stacks, are marked as failed.
+        """
+        self._stopping = True
+        reason = _('Engine stopped before the stack action started')
+        while self._queued:
+            tenant_id, queue = self._queued.popitem(last=False)
+            for stack, lock, func, args, kwargs in queue:
+                try:
+                    if stack.action is None:
+                        stack.state_set(stack.ADOPT if stack.adopt_stack_data
+                                        else stack.CREATE,
+                                        stack.FAILED, reason)
+                    elif stack.status == stack.IN_PROGRESS:
+                        stack.state_set(stack.action, stack.FAILED, reason)
+                    self._stack_event(stack, reason)
+                except Exception:
+                    LOG.exception(_('Failed to fail queued action on stack '
+                                    '%s') % stack.name)
+                finally:
+                    lock.release(stack.id)
+
+    def _stack_event(self, stack, reason):
+        try:
+            Event(stack.context, stack, stack.action, stack.status, reason,
+                  stack.id, {}, stack.name, 'OS::Heat::Stack').store()
+        except Exception:
+            LOG.exception(_('Failed to record event for stack %s')
+                          % stack.name)
+
+    def queue_depth(self):
+        """Return the number of stack actions waiting to start."""
+        return sum(len(q) for q in self._queued.values())
+
+    def stats(self):
+        """Return the numbers of running and queued stack actions."""
+        return {'running': sum(self._running.values()),
+                'queued': self.queue_depth(),
+                'queued_by_tenant': dict((t, len(q))
+                                         for t, q in self._queued.items())}
+
     def add_timer(self, stack_id, func, *args, **kwargs):
         """
         Define a periodic task, to be run in a separate thread, in the stack
@@ -153,6 +289,13 @@ class ThreadGroupManager(object):
 
     def stop(self, stack_id, graceful=False):
         '''Stop any active threads on a stack.'''
+        for tenant_id, queue in self._queued.items():
+            for action in [a for a in queue if a[0].id == stack_id]:
+                queue.remove(action)
+                action[1].release(stack_id)
+            if not queue:
+                del self._queued[tenant_id]
+
         if stack_id in self.groups:
             threadgroup = self.groups.pop(stack_id)
             threads = threadgroup.threads[:]
@@ -234,8 +377,10 @@ class StackWatch(object):
         def run_alarm_action(stack, actions, details):
             for action in actions:
                 action(details=details)
-            for res in stack.itervalues():
-                res.metadata_update()
+            signalled = [getattr(action, '__self__', None)
+                         for action in actions]
+            stack.refresh_dependent_metadata([res for res in signalled
+                                              if res is not None])
 
         for wr in wrs:
             rule = watchrule.WatchRule.load(stack.context, watch=wr)
@@ -282,6 +427,22 @@ class EngineListener(service.Service):
         stack_id = stack_identity['stack_id']
         self.thread_group_mgr.stop(stack_id)
 
+    def notify_signal_waiters(self, ctxt, key):
+        '''Wake any tasks in this engine waiting on a signal to key.'''
+        signal_waiter.notify_local(key)
+
+    def queue_stats(self, ctxt):
+        '''Return the numbers of stack actions running and queued.'''
+        return self.thread_group_mgr.stats()
+
+    def client_call_stats(self, ctxt):
+        '''Return the numbers of limited calls made to each client.'''
+        return client_limiter.stats()
+
+    def db_stats(self, ctxt):
+        '''Return the numbers of database statements made by each call.'''
+        return db_api.db_stats()
+
 
 class EngineService(service.Service):
     """
@@ -309,6 +470,7 @@ class EngineService(service.Service):
         self.engine_id = None
         self.thread_group_mgr = None
         self.target = None
+        self.software_config = service_software_config.SoftwareConfigService()
 
         if cfg.CONF.instance_user:
             warnings.warn('The "instance_user" option in heat.conf is '
@@ -345,8 +507,30 @@ class EngineService(service.Service):
         self._client = rpc_messaging.get_rpc_client(
             version=self.RPC_API_VERSION)
 
+        heartbeat_interval = cfg.CONF.engine_heartbeat_interval
+        if heartbeat_interval > 0:
+            self._engine_heartbeat()
+            self.tg.add_timer(heartbeat_interval, self._engine_heartbeat,
+                              initial_delay=heartbeat_interval)
+
         super(EngineService, self).start()
 
+    def _engine_heartbeat(self):
+        '''
+        Record that this engine is alive, and release any stack locks held
+        by engines whose heartbeats have stopped.
+        '''
+        try:
+            db_api.engine_heartbeat_update(self.engine_id, self.host)
+            released = db_api.stack_lock_release_dead_engines(
+                cfg.CONF.engine_heartbeat_timeout)
+        except Exception:
+            LOG.exception(_('Failed to record engine heartbeat'))
+            return
+        if released:
+            LOG.info(_('Released %d stack locks held by dead engines')
+                     % released)
+
     def stop(self):
         # Stop rpc connection at first for preventing new requests
         LOG.info(_("Attempting to stop engine service..."))
@@ -355,6 +539,10 @@ class EngineService(service.Service):
         except Exception:
             pass
 
+        # Release the stacks whose actions have not started, so that they
+        # are not started while running actions finish
+        self.thread_group_mgr.stop_queued()
+
         # Wait for all active threads to be finished
         for stack_id in self.thread_group_mgr.groups.keys():
             # Ingore dummy service task
@@ -500,7 +688,8 @@ class EngineService(service.Service):
             raise exception.RequestLimitExceeded(message=message)
 
     def _parse_template_and_validate_stack(self, cnxt, stack_name, template,
-                                           params, files, args):
+                                           params, files, args,
+                                           validate=True):
         tmpl = parser.Template(template, files=files)
         self._validate_new_stack(cnxt, stack_name, tmpl)
 
@@ -509,7 +698,8 @@ class EngineService(service.Service):
         stack = parser.Stack(cnxt, stack_name, tmpl, env, **common_params)
 
         self._validate_deferred_auth_context(cnxt, stack)
-        stack.validate()
+        if validate:
+            stack.validate()
         return stack
 
     @request_context
@@ -570,17 +760,47 @@ class EngineService(service.Service):
             else:
                 LOG.warning(_("Stack create failed, status %s") % stack.status)
 
-        stack = self._parse_template_and_validate_stack(cnxt,
-                                                        stack_name,
-                                                        template,
-                                                        params,
-                                                        files,
-                                                        args)
+        def _stack_validate_and_create(stack):
+            try:
+                stack.validate()
+            except Exception as ex:
+                reason = _('Stack validation failed: %s') % six.text_type(ex)
+                stack.state_set(stack.action, stack.FAILED, reason)
+                Event(cnxt, stack, stack.action, stack.FAILED, reason,
+                      stack.id, {}, stack.name, 'OS::Heat::Stack').store()
+                LOG.warning(_("Stack create failed, status %s") % stack.status)
+                return
+
+            _stack_create(stack)
+
+        async_validation = cfg.CONF.async_stack_validation
+        stack = self._parse_template_and_validate_stack(
+            cnxt, stack_name, template, params, files, args,
+            validate=not async_validation)
+
+        if async_validation:
+            # Report the stack as in progress while it is validated, so that
+            # the identifier can be returned before validation completes.
+            stack.action = (stack.ADOPT if stack.adopt_stack_data
+                            else stack.CREATE)
+            stack.status = stack.IN_PROGRESS
+            stack.status_reason = _('Stack validation in progress')
+            create_func = _stack_validate_and_create
+        else:
+            create_func = _stack_create
 
+        # Reject the stack before it is stored if the engine is too busy to
+        # create it, so that it can be retried with the same name
+        self.thread_group_mgr.check_capacity(stack.name)
         stack.store()
 
-        self.thread_group_mgr.start_with_lock(cnxt, stack, self.engine_id,
-                                              _stack_create, stack)
+        try:
+            self.thread_group_mgr.start_with_lock(cnxt, stack, self.engine_id,
+                                                  create_func, stack)
+        except exception.EngineOverloaded:
+            # Other actions were queued while the stack was being stored
+            db_api.stack_delete(cnxt, stack.id)
+            raise
 
         return dict(stack.identifier())
 
@@ -719,15 +939,24 @@ class EngineService(service.Service):
             return s.raw_template.template
         return None
 
-    @request_context
-    def delete_stack(self, cnxt, stack_identity):
+    def _stop_stack_action(self, cnxt, stack, lock_engine_id):
         """
-        The delete_stack method deletes a given stack.
+        Stop the action in progress on a stack in the engine holding its
+        lock, so that the stack can be deleted.
 
         :param cnxt: RPC context.
-        :param stack_identity: Name of the stack you want to delete.
+        :param stack: Stack to stop the action on.
+        :param lock_engine_id: The UUID of the engine holding the lock.
         """
-        def remote_stop(lock_engine_id):
+        # Current engine has the lock
+        if lock_engine_id == self.engine_id:
+            # give threads which are almost complete an opportunity to
+            # finish naturally before force stopping them
+            eventlet.sleep(0.2)
+            self.thread_group_mgr.stop(stack.id)
+
+        # Another active engine has the lock
+        elif stack_lock.StackLock.engine_alive(cnxt, lock_engine_id):
             timeout = cfg.CONF.engine_life_check_timeout
             self.cctxt = self._client.prepare(
                 version='1.0',
@@ -736,10 +965,21 @@ class EngineService(service.Service):
             try:
                 self.cctxt.call(cnxt,
                                 'stop_stack',
-                                stack_identity=stack_identity)
+                                stack_identity=dict(stack.identifier()))
             except messaging.MessagingTimeout:
-                return False
+                raise exception.StopActionFailed(stack_name=stack.name,
+                                                 engine_id=lock_engine_id)
+            LOG.debug("Successfully stopped remote task on engine %s"
+                      % lock_engine_id)
 
+    @request_context
+    def delete_stack(self, cnxt, stack_identity):
+        """
+        The delete_stack method deletes a given stack.
+
+        :param cnxt: RPC context.
+        :param stack_identity: Name of the stack you want to delete.
+        """
         st = self._get_stack(cnxt, stack_identity)
         LOG.info(_('Deleting stack %s') % st.name)
         stack = parser.Stack.load(cnxt, stack=st)
@@ -754,22 +994,7 @@ class EngineService(service.Service):
                                                                stack.delete)
                 return
 
-        # Current engine has the lock
-        if acquire_result == self.engine_id:
-            # give threads which are almost complete an opportunity to
-            # finish naturally before force stopping them
-            eventlet.sleep(0.2)
-            self.thread_group_mgr.stop(stack.id)
-
-        # Another active engine has the lock
-        elif stack_lock.StackLock.engine_alive(cnxt, acquire_result):
-            stop_result = remote_stop(acquire_result)
-            if stop_result is None:
-                LOG.debug("Successfully stopped remote task on engine %s"
-                          % acquire_result)
-            else:
-                raise exception.StopActionFailed(stack_name=stack.name,
-                                                 engine_id=acquire_result)
+        self._stop_stack_action(cnxt, stack, acquire_result)
 
         # There may be additional resources that we don't know about
         # if an update was in-progress when the stack was stopped, so
@@ -852,7 +1077,7 @@ class EngineService(service.Service):
 
     @request_context
     def list_events(self, cnxt, stack_identity, filters=None, limit=None,
-                    marker=None, sort_keys=None, sort_dir=None):
+                    marker=None, sort_keys=None, sort_dir=None, detail=True):
         """
         The list_events method lists all events associated with a given stack.
         It supports pagination (``limit`` and ``marker``),
@@ -866,6 +1091,7 @@ class EngineService(service.Service):
         :param marker: the ID of the last event in the previous page
         :param sort_keys: an array of fields used to sort the list
         :param sort_dir: the direction of the sort ('asc' or 'desc').
+        :param detail: if false, omit the resource properties of each event
         """
 
         if stack_identity is not None:
@@ -875,13 +1101,15 @@ class EngineService(service.Service):
                                                    marker=marker,
                                                    sort_keys=sort_keys,
                                                    sort_dir=sort_dir,
-                                                   filters=filters)
+                                                   filters=filters,
+                                                   detail=detail)
         else:
             events = db_api.event_get_all_by_tenant(cnxt, limit=limit,
                                                     marker=marker,
                                                     sort_keys=sort_keys,
                                                     sort_dir=sort_dir,
-                                                    filters=filters)
+                                                    filters=filters,
+                                                    detail=detail)
 
         stacks = {}
 
@@ -892,7 +1120,8 @@ class EngineService(service.Service):
 
         return [api.format_event(Event.load(cnxt,
                                             e.id, e,
-                                            get_stack(e.stack_id)))
+                                            get_stack(e.stack_id)),
+                                 detail=detail)
                 for e in events]
 
     def _authorize_stack_user(self, cnxt, stack, resource_name):
@@ -906,26 +1135,52 @@ class EngineService(service.Service):
             return True
 
         # fall back to looking for EC2 credentials in the context
+        access_key = self._ec2_access_key(cnxt)
+        if not access_key:
+            return False
+
+        return stack.access_allowed(access_key, resource_name)
+
+    @staticmethod
+    def _ec2_access_key(cnxt):
         try:
             ec2_creds = json.loads(cnxt.aws_creds).get('ec2Credentials')
         except (TypeError, AttributeError):
             ec2_creds = None
 
         if not ec2_creds:
-            return False
+            return None
 
-        access_key = ec2_creds.get('access')
-        return stack.access_allowed(access_key, resource_name)
+        return ec2_creds.get('access')
+
+    def _check_stack_user_access(self, cnxt, s, resource_name, stack=None):
+        '''
+        Raise Forbidden if the request is from a stack user who may not
+        access the resource. The result is cached, so the stack is loaded
+        only if it is not given and the result is not already known.
+        '''
+        if cfg.CONF.heat_stack_user_role not in cnxt.roles:
+            return
+
+        credentials = (cnxt.user_id, self._ec2_access_key(cnxt))
+        allowed = metadata_cache.get_access_allowed(s.id, credentials,
+                                                    resource_name)
+        if allowed is None:
+            if stack is None:
+                stack = parser.Stack.load(cnxt, stack=s)
+            allowed = self._authorize_stack_user(cnxt, stack, resource_name)
+            metadata_cache.set_access_allowed(s.id, credentials,
+                                              resource_name, allowed)
+        if not allowed:
+            LOG.warning(_("Access denied to resource %s") % resource_name)
+            raise exception.Forbidden()
 
     @request_context
     def describe_stack_resource(self, cnxt, stack_identity, resource_name):
         s = self._get_stack(cnxt, stack_identity)
         stack = parser.Stack.load(cnxt, stack=s)
 
-        if cfg.CONF.heat_stack_user_role in cnxt.roles:
-            if not self._authorize_stack_user(cnxt, stack, resource_name):
-                LOG.warning(_("Access denied to resource %s") % resource_name)
-                raise exception.Forbidden()
+        self._check_stack_user_access(cnxt, s, resource_name, stack)
 
         if resource_name not in stack:
             raise exception.ResourceNotFound(resource_name=resource_name,
@@ -935,7 +1190,54 @@ class EngineService(service.Service):
         if resource.id is None:
             raise exception.ResourceNotAvailable(resource_name=resource_name)
 
-        return api.format_stack_resource(stack[resource_name])
+        # Report the same metadata as describe_stack_resource_metadata
+        cached = metadata_cache.get_metadata(s.id, resource_name)
+        if cached is None:
+            cached = metadata_cache.set_metadata(s.id, resource_name,
+                                                 resource.metadata_get())
+        result = api.format_stack_resource(resource)
+        result[rpc_api.RES_METADATA] = cached[0]
+        return result
+
+    @request_context
+    def describe_stack_resource_metadata(self, cnxt, stack_identity,
+                                         resource_name, etag=None):
+        """
+        Return the stored metadata of a resource, along with an ETag for it.
+
+        Unlike describe_stack_resource, this reads the metadata straight
+        from the resource in the database (or the engine's metadata cache)
+        without loading the stack, so that servers can poll it cheaply.
+
+        :param cnxt: RPC context.
+        :param stack_identity: Name of the stack.
+        :param resource_name: Name of the resource.
+        :param etag: ETag of the metadata the caller already has. If it
+                     matches, the metadata is omitted from the result.
+        """
+        s = self._get_stack(cnxt, stack_identity)
+
+        self._check_stack_user_access(cnxt, s, resource_name)
+
+        cached = metadata_cache.get_metadata(s.id, resource_name)
+        if cached is None:
+            rs = db_api.resource_get_by_name_and_stack(cnxt, resource_name,
+                                                       s.id)
+            if rs is None:
+                stack = parser.Stack.load(cnxt, stack=s)
+                if resource_name not in stack:
+                    raise exception.ResourceNotFound(
+                        resource_name=resource_name, stack_name=stack.name)
+                raise exception.ResourceNotAvailable(
+                    resource_name=resource_name)
+            cached = metadata_cache.set_metadata(s.id, resource_name,
+                                                 rs.rsrc_metadata)
+
+        metadata, current_etag = cached
+        result = {rpc_api.RES_METADATA_ETAG: current_etag}
+        if etag != current_etag:
+            result[rpc_api.RES_METADATA] = metadata
+        return result
 
     @request_context
     def resource_signal(self, cnxt, stack_identity, resource_name, details):
@@ -958,13 +1260,11 @@ class EngineService(service.Service):
         if callable(stack[resource_name].signal):
             stack[resource_name].signal(details)
 
-        # Refresh the metadata for all other resources, since signals can
+        # Refresh the metadata for other resources, since signals can
         # update metadata which is used by other resources, e.g
         # when signalling a WaitConditionHandle resource, and other
         # resources may refer to WaitCondition Fn::GetAtt Data
-        for res in stack.dependencies:
-            if res.name != resource_name and res.id is not None:
-                res.metadata_update()
+        stack.refresh_dependent_metadata([resource])
 
     @request_context
     def find_physical_resource(self, cnxt, physical_resource_id):
@@ -1035,6 +1335,88 @@ class EngineService(service.Service):
         self.thread_group_mgr.start_with_lock(cnxt, stack, self.engine_id,
                                               _stack_resume, stack)
 
+    @request_context
+    def nested_stack_action(self, cnxt, stack_identity, action,
+                            parent_resource_name, template=None, params=None,
+                            files=None, timeout_mins=None):
+        '''
+        Run an action on a nested stack dispatched by the engine processing
+        its parent stack, and notify the parent resource waiting for it when
+        the action finishes.
+        '''
+        s = self._get_stack(cnxt, stack_identity)
+
+        # The parent resource waits on the ID of the nested stack, which the
+        # stack itself forgets once it is deleted
+        stack_id = s.id
+        parent_id = s.owner_id
+
+        try:
+            self._start_nested_stack_action(cnxt, stack_identity, s, action,
+                                            parent_resource_name, template,
+                                            params, files, timeout_mins)
+        except Exception as ex:
+            # The parent resource would otherwise wait for the action until
+            # it times out
+            LOG.exception(_('Failed to start %(action)s of nested stack '
+                            '%(name)s') % {'action': action, 'name': s.name})
+            try:
+                db_api.stack_update(cnxt, stack_id,
+                                    {'action': action,
+                                     'status': parser.Stack.FAILED,
+                                     'status_reason': six.text_type(ex)})
+            finally:
+                signal_waiter.notify(cnxt, parent_id, stack_id)
+
+    def _start_nested_stack_action(self, cnxt, stack_identity, s, action,
+                                   parent_resource_name, template, params,
+                                   files, timeout_mins):
+        if action == parser.Stack.DELETE:
+            # The parent stack may have been deleted while an action it
+            # dispatched earlier is still running, perhaps in another engine,
+            # so stop that action first, as delete_stack() does
+            lock_engine_id = db_api.stack_lock_get_engine_id(s.id)
+            if lock_engine_id is not None:
+                stack = parser.Stack.load(cnxt, stack=s)
+                self._stop_stack_action(cnxt, stack, lock_engine_id)
+                s = self._get_stack(cnxt, stack_identity)
+
+        parent_stack = parser.Stack.load(cnxt, stack_id=s.owner_id)
+        parent = parent_stack[parent_resource_name]
+        stack = parser.Stack.load(cnxt, stack=s, parent_resource=parent)
+
+        if action == stack.UPDATE:
+            tmpl = parser.Template(template, files=files)
+            updated_stack = parser.Stack(cnxt, stack.name, tmpl,
+                                         environment.Environment(params),
+                                         timeout_mins=timeout_mins,
+                                         disable_rollback=True,
+                                         parent_resource=parent,
+                                         owner_id=stack.owner_id,
+                                         user_creds_id=stack.user_creds_id)
+            updated_stack.parameters.set_stack_id(stack.identifier())
+            # The parent resource checked that the stack was COMPLETE before
+            # marking the update IN_PROGRESS when it dispatched it
+            stack.status = stack.COMPLETE
+            stack_action = functools.partial(stack.update, updated_stack)
+        else:
+            stack_action = {stack.CREATE: stack.create,
+                            stack.DELETE: stack.delete,
+                            stack.SUSPEND: stack.suspend,
+                            stack.RESUME: stack.resume}[action]
+
+        stack_id = stack.id
+
+        def _nested_stack_action():
+            LOG.debug("%s of nested stack %s" % (action, stack.name))
+            try:
+                stack_action()
+            finally:
+                signal_waiter.notify(cnxt, parent_stack.id, stack_id)
+
+        self.thread_group_mgr.start_with_lock(cnxt, stack, self.engine_id,
+                                              _nested_stack_action)
+
     @request_context
     def metadata_update(self, cnxt, stack_identity,
                         resource_name, metadata):
@@ -1058,13 +1440,12 @@ class EngineService(service.Service):
         refresh_stack = parser.Stack.load(cnxt, stack=s,
                                           use_stored_context=True)
 
-        # Refresh the metadata for all other resources, since we expect
+        # Refresh the metadata for other resources, since we expect
         # resource_name to be a WaitCondition resource, and other
         # resources may refer to WaitCondition Fn::GetAtt Data, which
         # is updated here.
-        for res in refresh_stack.dependencies:
-            if res.name != resource_name and res.id is not None:
-                res.metadata_update()
+        refresh_stack.refresh_dependent_metadata(
+            [refresh_stack[resource_name]])
 
         return resource.metadata_get()
 
@@ -1168,103 +1549,54 @@ class EngineService(service.Service):
 
     @request_context
     def show_software_config(self, cnxt, config_id):
-        sc = db_api.software_config_get(cnxt, config_id)
-        return api.format_software_config(sc)
+        return self.software_config.show_software_config(cnxt, config_id)
 
     @request_context
     def create_software_config(self, cnxt, group, name, config,
                                inputs, outputs, options):
-
-        sc = db_api.software_config_create(cnxt, {
-            'group': group,
-            'name': name,
-            'config': {
-                'inputs': inputs,
-                'outputs': outputs,
-                'options': options,
-                'config': config
-            },
-            'tenant': cnxt.tenant_id})
-        return api.format_software_config(sc)
+        return self.software_config.create_software_config(
+            cnxt, group=group, name=name, config=config, inputs=inputs,
+            outputs=outputs, options=options)
 
     @request_context
     def delete_software_config(self, cnxt, config_id):
-        db_api.software_config_delete(cnxt, config_id)
+        return self.software_config.delete_software_config(cnxt, config_id)
 
     @request_context
     def list_software_deployments(self, cnxt, server_id):
-        all_sd = db_api.software_deployment_get_all(cnxt, server_id)
-        result = [api.format_software_deployment(sd) for sd in all_sd]
-        return result
+        return self.software_config.list_software_deployments(
+            cnxt, server_id)
 
     @request_context
     def metadata_software_deployments(self, cnxt, server_id):
-        if not server_id:
-            raise ValueError(_('server_id must be specified'))
-        all_sd = db_api.software_deployment_get_all(cnxt, server_id)
-        # sort the configs by config name, to give the list of metadata a
-        # deterministic and controllable order.
-        all_sd_s = sorted(all_sd, key=lambda sd: sd.config.name)
-        result = [api.format_software_config(sd.config) for sd in all_sd_s]
-        return result
-
-    def _push_metadata_software_deployments(self, cnxt, server_id):
-        rs = db_api.resource_get_by_physical_resource_id(cnxt, server_id)
-        if rs:
-            deployments = self.metadata_software_deployments(cnxt, server_id)
-            md = rs.rsrc_metadata or {}
-            md['deployments'] = deployments
-            rs.update_and_save({'rsrc_metadata': md})
+        return self.software_config.metadata_software_deployments(
+            cnxt, server_id)
 
     @request_context
     def show_software_deployment(self, cnxt, deployment_id):
-        sd = db_api.software_deployment_get(cnxt, deployment_id)
-        return api.format_software_deployment(sd)
+        return self.software_config.show_software_deployment(cnxt,
+                                                             deployment_id)
 
     @request_context
     def create_software_deployment(self, cnxt, server_id, config_id,
                                    input_values, action, status,
                                    status_reason, stack_user_project_id):
-
-        sd = db_api.software_deployment_create(cnxt, {
-            'config_id': config_id,
-            'server_id': server_id,
-            'input_values': input_values,
-            'tenant': cnxt.tenant_id,
-            'stack_user_project_id': stack_user_project_id,
-            'action': action,
-            'status': status,
-            'status_reason': status_reason})
-        self._push_metadata_software_deployments(cnxt, server_id)
-        return api.format_software_deployment(sd)
+        return self.software_config.create_software_deployment(
+            cnxt, server_id=server_id, config_id=config_id,
+            input_values=input_values, action=action, status=status,
+            status_reason=status_reason,
+            stack_user_project_id=stack_user_project_id)
 
     @request_context
     def update_software_deployment(self, cnxt, deployment_id, config_id,
                                    input_values, output_values, action,
                                    status, status_reason):
-        update_data = {}
-        if config_id:
-            update_data['config_id'] = config_id
-        if input_values:
-            update_data['input_values'] = input_values
-        if output_values:
-            update_data['output_values'] = output_values
-        if action:
-            update_data['action'] = action
-        if status:
-            update_data['status'] = status
-        if status_reason:
-            update_data['status_reason'] = status_reason
-        sd = db_api.software_deployment_update(cnxt,
-                                               deployment_id, update_data)
-
-        # only push metadata if this update resulted in the config_id
-        # changing, since metadata is just a list of configs
-        if config_id:
-            self._push_metadata_software_deployments(cnxt, sd.server_id)
-
-        return api.format_software_deployment(sd)
+        return self.software_config.update_software_deployment(
+            cnxt, deployment_id=deployment_id, config_id=config_id,
+            input_values=input_values, output_values=output_values,
+            action=action, status=status, status_reason=status_reason)
 
     @request_context
     def delete_software_deployment(self, cnxt, deployment_id):
-        db_api.software_deployment_delete(cnxt, deployment_id)
+        return self.software_config.delete_software_deployment(
+            cnxt, deployment_id)
@@ -0,0 +1,132 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from heat.db import api as db_api
+from heat.engine import api
+from heat.engine import metadata_cache
+from heat.engine import signal_waiter
+from heat.openstack.common.gettextutils import _
+
+
+class SoftwareConfigService(object):
+    '''
+    Manages software configs and deployments in the engine database.
+
+    The methods here back the software config RPC API of EngineService, and
+    may also be called directly by resources running inside the engine so
+    that they do not need to go through the Orchestration REST API (and back
+    over RPC) to read or write their own configs and deployments.
+    '''
+
+    def show_software_config(self, cnxt, config_id):
+        sc = db_api.software_config_get(cnxt, config_id)
+        return api.format_software_config(sc)
+
+    def create_software_config(self, cnxt, group, name, config,
+                               inputs, outputs, options):
+
+        sc = db_api.software_config_create(cnxt, {
+            'group': group,
+            'name': name,
+            'config': {
+                'inputs': inputs,
+                'outputs': outputs,
+                'options': options,
+                'config': config
+            },
+            'tenant': cnxt.tenant_id})
+        return api.format_software_config(sc)
+
+    def delete_software_config(self, cnxt, config_id):
+        db_api.software_config_delete(cnxt, config_id)
+
+    def list_software_deployments(self, cnxt, server_id):
+        all_sd = db_api.software_deployment_get_all(cnxt, server_id)
+        result = [api.format_software_deployment(sd) for sd in all_sd]
+        return result
+
+    def metadata_software_deployments(self, cnxt, server_id):
+        if not server_id:
+            raise ValueError(_('server_id must be specified'))
+        all_sd = db_api.software_deployment_get_all(cnxt, server_id)
+        # sort the configs by config name, to give the list of metadata a
+        # deterministic and controllable order.
+        all_sd_s = sorted(all_sd, key=lambda sd: sd.config.name)
+        result = [api.format_software_config(sd.config) for sd in all_sd_s]
+        return result
+
+    def _push_metadata_software_deployments(self, cnxt, server_id):
+        rs = db_api.resource_get_by_physical_resource_id(cnxt, server_id)
+        if rs:
+            deployments = self.metadata_software_deployments(cnxt, server_id)
+            md = rs.rsrc_metadata or {}
+            md['deployments'] = deployments
+            rs.update_and_save({'rsrc_metadata': md})
+            metadata_cache.invalidate(rs.stack_id, rs.name)
+
+    def show_software_deployment(self, cnxt, deployment_id):
+        sd = db_api.software_deployment_get(cnxt, deployment_id)
+        return api.format_software_deployment(sd)
+
+    def create_software_deployment(self, cnxt, server_id, config_id,
+                                   input_values, action, status,
+                                   status_reason, stack_user_project_id):
+
+        sd = db_api.software_deployment_create(cnxt, {
+            'config_id': config_id,
+            'server_id': server_id,
+            'input_values': input_values,
+            'tenant': cnxt.tenant_id,
+            'stack_user_project_id': stack_user_project_id,
+            'action': action,
+            'status': status,
+            'status_reason': status_reason})
+        self._push_metadata_software_deployments(cnxt, server_id)
+        return api.format_software_deployment(sd)
+
+    def update_software_deployment(self, cnxt, deployment_id, config_id,
+                                   input_values, output_values, action,
+                                   status, status_reason):
+        update_data = {}
+        if config_id:
+            update_data['config_id'] = config_id
+        if input_values:
+            update_data['input_values'] = input_values
+        if output_values:
+            update_data['output_values'] = output_values
+        if action:
+            update_data['action'] = action
+        if status:
+            update_data['status'] = status
+        if status_reason:
+            update_data['status_reason'] = status_reason
+        sd = db_api.software_deployment_update(cnxt,
+                                               deployment_id, update_data)
+
+        # only push metadata if this update resulted in the config_id
+        # changing, since metadata is just a list of configs
+        if config_id:
+            self._push_metadata_software_deployments(cnxt, sd.server_id)
+
+        # wake the deployment resource waiting for this status, which may be
+        # in another engine
+        if status and not signal_waiter.notify_local(deployment_id):
+            rs = db_api.resource_get_by_physical_resource_id(cnxt,
+                                                             deployment_id)
+            if rs:
+                signal_waiter.notify(cnxt, rs.stack_id, deployment_id)
+
+        return api.format_software_deployment(sd)
+
+    def delete_software_deployment(self, cnxt, deployment_id):
+        db_api.software_deployment_delete(cnxt, deployment_id)
@@ -0,0 +1,120 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+from time import time as wallclock
+import weakref
+
+from oslo.config import cfg
+
+from heat.common import messaging as rpc_messaging
+from heat.db import api as db_api
+from heat.openstack.common import log as logging
+
+cfg.CONF.import_opt('signal_wait_recheck_interval', 'heat.common.config')
+
+LOG = logging.getLogger(__name__)
+
+
+# Waiters registered in this engine, keyed by the ID of the object (e.g. a
+# wait condition handle resource or a software deployment) they wait on.
+_waiters = collections.defaultdict(weakref.WeakSet)
+
+
+class SignalWaiter(object):
+    '''
+    Tracks whether a task waiting on a signal needs to check its state.
+
+    Rather than reading the database on every scheduler step, a waiting
+    task asks ready() whether anything has happened since it last looked.
+    That is the case after the object it waits on has been signalled in
+    this engine (or in another engine which forwarded the notification
+    over RPC), and also, as a fallback for lost notifications, once every
+    signal_wait_recheck_interval seconds.
+    '''
+
+    def __init__(self, key):
+        self.key = key
+        self._signalled = True
+        self._next_check = None
+
+    def notify(self):
+        self._signalled = True
+
+    def ready(self):
+        '''Return True if the waiting task should check its state now.'''
+        interval = cfg.CONF.signal_wait_recheck_interval
+        now = wallclock()
+        if (interval <= 0 or self._signalled or
+                self._next_check is None or now >= self._next_check):
+            self._signalled = False
+            self._next_check = now + interval
+            return True
+        return False
+
+
+def register(key):
+    '''Return a new SignalWaiter woken by notifications for key.'''
+    waiter = SignalWaiter(key)
+    _waiters[key].add(waiter)
+    return waiter
+
+
+def unregister(waiter):
+    waiters = _waiters.get(waiter.key)
+    if waiters is not None:
+        waiters.discard(waiter)
+        if not waiters:
+            del _waiters[waiter.key]
+
+
+def notify_local(key):
+    '''
+    Wake any tasks in this engine waiting on key.
+
+    :returns: True if there was at least one waiter to wake.
+    '''
+    waiters = list(_waiters.get(key, ()))
+    for waiter in waiters:
+        waiter.notify()
+    return bool(waiters)
+
+
+def notify(context, stack_id, key):
+    '''
+    Wake the tasks waiting on key.
+
+    If nothing is waiting on key in this engine, the notification is
+    forwarded to the engine currently holding the lock on stack_id, since
+    that is the engine running the action which is waiting. Nested stacks
+    are usually not locked themselves, in which case the notification goes
+    to the engine holding the lock on the nearest stack above them.
+    '''
+    if notify_local(key):
+        return
+
+    engine_id = None
+    while stack_id is not None:
+        engine_id = db_api.stack_lock_get_engine_id(stack_id)
+        if engine_id is not None:
+            break
+        stack = db_api.stack_get(context, stack_id, show_deleted=True,
+                                 tenant_safe=False)
+        stack_id = stack.owner_id if stack is not None else None
+    if engine_id is None:
+        return
+
+    LOG.debug('Forwarding signal notification for %(key)s to engine '
+              '%(engine)s' % {'key': key, 'engine': engine_id})
+    client = rpc_messaging.get_rpc_client(version='1.0', topic=engine_id)
+    client.cast(context, 'notify_signal_waiters', key=key)
@@ -12,8 +12,8 @@
 #    under the License.
 
 import collections
-import copy
 from datetime import datetime
+import itertools
 import re
 import warnings
 
@@ -28,6 +28,7 @@ from heat.db import api as db_api
 from heat.engine import dependencies
 from heat.engine import environment
 from heat.engine import function
+from heat.engine import metadata_cache
 from heat.engine.notification import stack as notification
 from heat.engine.parameter_groups import ParameterGroups
 from heat.engine import resource
@@ -88,6 +89,7 @@ class Stack(collections.Mapping):
         self._resources = None
         self._dependencies = None
         self._access_allowed_handlers = {}
+        self._metadata_writes = None
         self._db_resources = None
         self.adopt_stack_data = adopt_stack_data
         self.stack_user_project_id = stack_user_project_id
@@ -184,6 +186,58 @@ class Stack(collections.Mapping):
     def reset_dependencies(self):
         self._dependencies = None
 
+    def refresh_dependent_metadata(self, changed):
+        '''
+        Refresh the metadata of resources affected by changes to the state of
+        the given resources, e.g. after they have been signalled.
+
+        Only resources whose metadata refers to one of the changed resources,
+        or to a resource that depends on one of them (as a WaitCondition
+        depends on its handle), are refreshed. Since a signal may also change
+        the resources that the signalled resource acts on, such as the group
+        adjusted by a scaling policy, the resources that the changed ones
+        depend on are treated as changed as well. The resulting metadata is
+        written to the database in a single transaction.
+        '''
+        changed_names = set(res.name for res in changed)
+        acted_on = [r for r in self.dependencies
+                    if any(res in self.dependencies.required_by(r)
+                           for res in changed)]
+        affected = set()
+        for res in itertools.chain(changed, acted_on):
+            affected.update(r.name for r in self.dependencies[res])
+
+        self._metadata_writes = {}
+        try:
+            for res in self.dependencies:
+                if res.name in changed_names or res.id is None:
+                    continue
+                refs = set(r.name for r in res.t.metadata_dependencies())
+                if refs & affected:
+                    res.metadata_update()
+            writes = self._metadata_writes
+        finally:
+            self._metadata_writes = None
+
+        if writes:
+            db_api.resource_metadata_set_all(
+                self.context, dict((rid, md)
+                                   for rid, (name, md) in writes.items()))
+            for name, md in writes.values():
+                metadata_cache.invalidate(self.id, name)
+
+    def defer_metadata_write(self, resource, metadata):
+        '''
+        Queue a write of a resource's metadata, if writes are being batched.
+
+        :returns: True if the write was queued, or False if the caller should
+                  write the metadata itself.
+        '''
+        if self._metadata_writes is None:
+            return False
+        self._metadata_writes[resource.id] = (resource.name, metadata)
+        return True
+
     @property
     def root_stack(self):
         '''
@@ -307,10 +361,22 @@ class Stack(collections.Mapping):
             self.id = new_s.id
             self.created_time = new_s.created_at
 
+            if cfg.CONF.bulk_create_resources and not backup:
+                self._store_resources()
+
         self._set_param_stackid()
 
         return self.id
 
+    def _store_resources(self):
+        '''Create all of the resources in the database at once.'''
+        new_resources = [res for res in self.resources.values()
+                         if res.id is None]
+        stored = db_api.resource_create_all(
+            self.context, [res._db_values() for res in new_resources])
+        for res, rs in zip(new_resources, stored):
+            res._stored(rs)
+
     def _backup_name(self):
         return '%s*' % self.name
 
@@ -431,7 +497,14 @@ class Stack(collections.Mapping):
             raise StackValidationFailed(message=_("Duplicate names %s") %
                                         dup_names)
 
+        # Resources of the same class with equal definitions (such as the
+        # members of a group) validate identically, so validate only one.
+        validated = set()
         for res in self.dependencies:
+            key = (type(res), res.t)
+            if key in validated:
+                continue
+            validated.add(key)
             try:
                 result = res.validate()
             except exception.HeatException as ex:
@@ -583,7 +656,7 @@ class Stack(collections.Mapping):
             LOG.debug('Loaded existing backup stack')
             return self.load(self.context, stack=s)
         elif create_if_missing:
-            prev = type(self)(self.context, self.name, copy.deepcopy(self.t),
+            prev = type(self)(self.context, self.name, self.t.snapshot(),
                               self.env, owner_id=self.id,
                               user_creds_id=self.user_creds_id)
             prev.store(backup=True)
@@ -647,7 +720,7 @@ class Stack(collections.Mapping):
         if action == self.UPDATE:
             # Oldstack is useless when the action is not UPDATE , so we don't
             # need to build it, this can avoid some unexpected errors.
-            oldstack = Stack(self.context, self.name, copy.deepcopy(self.t),
+            oldstack = Stack(self.context, self.name, self.t.snapshot(),
                              self.env)
         backup_stack = self._backup_stack()
         try:
@@ -25,6 +25,8 @@ from heat.openstack.common.gettextutils import _
 from heat.openstack.common import log as logging
 
 cfg.CONF.import_opt('engine_life_check_timeout', 'heat.common.config')
+cfg.CONF.import_opt('engine_heartbeat_interval', 'heat.common.config')
+cfg.CONF.import_opt('engine_heartbeat_timeout', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -38,6 +40,13 @@ class StackLock(object):
 
     @staticmethod
     def engine_alive(context, engine_id):
+        if cfg.CONF.engine_heartbeat_interval > 0:
+            alive = db_api.engine_heartbeat_alive(
+                engine_id, cfg.CONF.engine_heartbeat_timeout)
+            if alive is not None:
+                return alive
+
+        # Engines that do not record heartbeats are asked over RPC
         client = rpc_messaging.get_rpc_client(version='1.0', topic=engine_id)
         client_context = client.prepare(
             timeout=cfg.CONF.engine_life_check_timeout)
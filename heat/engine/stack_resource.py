@@ -14,17 +14,69 @@
 from oslo.config import cfg
 
 from heat.common import exception
+from heat.db import api as db_api
 from heat.engine import attributes
 from heat.engine import environment
 from heat.engine import parser
 from heat.engine import resource
 from heat.engine import scheduler
+from heat.engine import signal_waiter
 from heat.openstack.common.gettextutils import _
 from heat.openstack.common import log as logging
+from heat.rpc import client as rpc_client
+
+cfg.CONF.import_opt('nested_stack_rpc_dispatch', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
 
+class NestedStackDispatch(object):
+    '''
+    Tracks an action on a nested stack dispatched to another engine.
+
+    This stands in for the TaskRunner running the action locally: step()
+    returns True once the action has completed, and raises an exception if
+    it has failed. The engine running the action wakes the waiting task
+    when it finishes.
+    '''
+
+    def __init__(self, stack_resource, nested, action):
+        self.stack_resource = stack_resource
+        self.stack_id = nested.id
+        self.action = action
+        self._done = False
+        self._waiter = signal_waiter.register(self.stack_id)
+
+    def step(self):
+        if self._done:
+            return True
+        if not self._waiter.ready():
+            return False
+
+        stack = db_api.stack_get(self.stack_resource.context, self.stack_id,
+                                 show_deleted=True)
+        if stack is None:
+            raise exception.NotFound(_("Nested stack not found in DB"))
+        if (stack.action != self.action or
+                stack.status == parser.Stack.IN_PROGRESS):
+            return False
+
+        self._done = True
+        signal_waiter.unregister(self._waiter)
+        # Reload the nested stack, which has changed in the other engine
+        self.stack_resource._nested = None
+        if stack.status != parser.Stack.COMPLETE:
+            raise exception.Error(stack.status_reason)
+        return True
+
+    def run_to_completion(self, wait_time=1):
+        def wait():
+            while not self.step():
+                yield
+
+        scheduler.TaskRunner(wait)(wait_time=wait_time)
+
+
 class StackResource(resource.Resource):
     '''
     An abstract Resource subclass that allows the management of an entire Stack
@@ -143,6 +195,19 @@ class StackResource(resource.Resource):
         nested_env.load(user_env)
         return nested_env
 
+    def _dispatch_nested(self, nested, action, **kwargs):
+        '''
+        Cast an action on the nested stack to any engine, and return a
+        NestedStackDispatch to wait for it to complete.
+        '''
+        nested.state_set(action, nested.IN_PROGRESS,
+                         'Stack %s dispatched' % action)
+        dispatch = NestedStackDispatch(self, nested, action)
+        rpc_client.EngineClient().nested_stack_action(
+            self.context, dict(nested.identifier()), action, self.name,
+            **kwargs)
+        return dispatch
+
     def create_with_template(self, child_template, user_params,
                              timeout_mins=None, adopt_data=None):
         '''
@@ -184,6 +249,8 @@ class StackResource(resource.Resource):
         action = self._nested.CREATE
         if adopt_data:
             action = self._nested.ADOPT
+        elif cfg.CONF.nested_stack_rpc_dispatch:
+            return self._dispatch_nested(self._nested, action)
 
         stack_creator = scheduler.TaskRunner(self._nested.stack_task,
                                              action=action)
@@ -191,6 +258,9 @@ class StackResource(resource.Resource):
         return stack_creator
 
     def check_create_complete(self, stack_creator):
+        if isinstance(stack_creator, NestedStackDispatch):
+            return stack_creator.step()
+
         done = stack_creator.step()
         if done:
             if self._nested.state != (self._nested.CREATE,
@@ -242,6 +312,16 @@ class StackResource(resource.Resource):
             self.attributes = None
             self._outputs_to_attribs(template)
 
+        if cfg.CONF.nested_stack_rpc_dispatch:
+            if nested_stack.status != nested_stack.COMPLETE:
+                raise exception.Error(_('Cannot update %s, stack not in a '
+                                        'COMPLETE state') % self.name)
+            return self._dispatch_nested(nested_stack, nested_stack.UPDATE,
+                                         template=template.t,
+                                         params=stack.env.user_env_as_dict(),
+                                         files=template.files,
+                                         timeout_mins=timeout_mins)
+
         updater = scheduler.TaskRunner(nested_stack.update_task, stack)
         updater.start()
         return updater
@@ -250,6 +330,9 @@ class StackResource(resource.Resource):
         if updater is None:
             return True
 
+        if isinstance(updater, NestedStackDispatch):
+            return updater.step()
+
         if not updater.step():
             return False
 
@@ -270,6 +353,8 @@ class StackResource(resource.Resource):
             LOG.info(_("Stack not found to delete"))
         else:
             if stack is not None:
+                if cfg.CONF.nested_stack_rpc_dispatch:
+                    return self._dispatch_nested(stack, stack.DELETE)
                 delete_task = scheduler.TaskRunner(stack.delete)
                 delete_task.start()
                 return delete_task
@@ -278,6 +363,9 @@ class StackResource(resource.Resource):
         if delete_task is None:
             return True
 
+        if isinstance(delete_task, NestedStackDispatch):
+            return delete_task.step()
+
         done = delete_task.step()
         if done:
             nested_stack = self.nested()
@@ -293,6 +381,9 @@ class StackResource(resource.Resource):
             raise exception.Error(_('Cannot suspend %s, stack not created')
                                   % self.name)
 
+        if cfg.CONF.nested_stack_rpc_dispatch:
+            return self._dispatch_nested(stack, stack.SUSPEND)
+
         suspend_task = scheduler.TaskRunner(self._nested.stack_task,
                                             action=self._nested.SUSPEND,
                                             reverse=True)
@@ -301,6 +392,9 @@ class StackResource(resource.Resource):
         return suspend_task
 
     def check_suspend_complete(self, suspend_task):
+        if isinstance(suspend_task, NestedStackDispatch):
+            return suspend_task.step()
+
         done = suspend_task.step()
         if done:
             if self._nested.state != (self._nested.SUSPEND,
@@ -315,6 +409,9 @@ class StackResource(resource.Resource):
             raise exception.Error(_('Cannot resume %s, stack not created')
                                   % self.name)
 
+        if cfg.CONF.nested_stack_rpc_dispatch:
+            return self._dispatch_nested(stack, stack.RESUME)
+
         resume_task = scheduler.TaskRunner(self._nested.stack_task,
                                            action=self._nested.RESUME,
                                            reverse=False)
@@ -323,6 +420,9 @@ class StackResource(resource.Resource):
         return resume_task
 
     def check_resume_complete(self, resume_task):
+        if isinstance(resume_task, NestedStackDispatch):
+            return resume_task.step()
+
         done = resume_task.step()
         if done:
             if self._nested.state != (self._nested.RESUME,
@@ -122,23 +122,67 @@ class Template(collections.Mapping):
 
     def __init__(self, template, template_id=None, files=None):
         '''
-        Initialise the template with a JSON object and a set of Parameters
+        Initialise the template with a JSON object and a set of Parameters.
+        The files may be a function that loads them only when they are first
+        needed.
         '''
         self.id = template_id
         self.t = template
-        self.files = files or {}
+        if callable(files):
+            self._load_files = files
+        else:
+            self._load_files = None
+            self.files = files
         self.maps = self[self.MAPPINGS]
         self.version = get_version(self.t, _template_classes.keys())
+        self._resources_shared = False
+
+    @property
+    def files(self):
+        if self._load_files is not None:
+            self.files = self._load_files()
+        return self._files
+
+    @files.setter
+    def files(self, files):
+        self._load_files = None
+        self._files = files or {}
 
     def __deepcopy__(self, memo):
         return Template(copy.deepcopy(self.t, memo), files=self.files)
 
+    def snapshot(self):
+        '''
+        Return a copy of the template that shares its contents with this one.
+
+        Only the top level of the template data is copied. The resources
+        section is copied by whichever of the two templates is the first to
+        add or remove a resource, and the resource snippets themselves are
+        never modified in place, so taking a snapshot stays cheap however
+        large the template is.
+        '''
+        self._resources_shared = True
+        snap = Template(dict(self.t), files=self.files)
+        snap._resources_shared = True
+        return snap
+
+    def _resources_for_update(self):
+        '''Return the resources section, ready to be modified in place.'''
+        resources = self.t.get(self.RESOURCES)
+        if resources is None:
+            resources = self.t[self.RESOURCES] = {}
+        elif self._resources_shared:
+            resources = self.t[self.RESOURCES] = dict(resources)
+        self._resources_shared = False
+        return resources
+
     @classmethod
     def load(cls, context, template_id, t=None):
         '''Retrieve a Template with the given ID from the database.'''
         if t is None:
             t = db_api.raw_template_get(context, template_id)
-        return cls(t.template, template_id=template_id, files=t.files)
+        return cls(t.template, template_id=template_id,
+                   files=lambda: t.files)
 
     def store(self, context=None):
         '''Store the Template in the database and return its ID.'''
@@ -188,7 +232,7 @@ class Template(collections.Mapping):
 
     def remove_resource(self, name):
         '''Remove a resource from the template.'''
-        self.t.get(self.RESOURCES, {}).pop(name)
+        self._resources_for_update().pop(name)
 
     def functions(self):
         '''Return a dict of template functions keyed by name.'''
@@ -55,14 +55,14 @@ RES_KEYS = (
     RES_ACTION, RES_STATUS, RES_STATUS_DATA,
     RES_TYPE, RES_ID, RES_STACK_ID, RES_STACK_NAME,
     RES_REQUIRED_BY, RES_NESTED_STACK_ID, RES_NESTED_RESOURCES,
-    RES_PARENT_RESOURCE,
+    RES_PARENT_RESOURCE, RES_METADATA_ETAG,
 ) = (
     'description', 'updated_time',
     'resource_name', 'physical_resource_id', 'metadata',
     'resource_action', 'resource_status', 'resource_status_reason',
     'resource_type', 'resource_identity', STACK_ID, STACK_NAME,
     'required_by', 'nested_stack_id', 'nested_resources',
-    'parent_resource',
+    'parent_resource', 'metadata_etag',
 )
 
 RES_SCHEMA_KEYS = (
@@ -266,7 +266,8 @@ class EngineClient(object):
                                              type_name=type_name))
 
     def list_events(self, ctxt, stack_identity, filters=None, limit=None,
-                    marker=None, sort_keys=None, sort_dir=None,):
+                    marker=None, sort_keys=None, sort_dir=None,
+                    detail=True):
         """
         The list_events method lists all events associated with a given stack.
         It supports pagination (``limit`` and ``marker``),
@@ -280,6 +281,7 @@ class EngineClient(object):
         :param marker: the ID of the last event in the previous page
         :param sort_keys: an array of fields used to sort the list
         :param sort_dir: the direction of the sort ('asc' or 'desc').
+        :param detail: if false, omit the resource properties of each event
         """
         return self.call(ctxt, self.make_msg('list_events',
                                              stack_identity=stack_identity,
@@ -287,7 +289,8 @@ class EngineClient(object):
                                              limit=limit,
                                              marker=marker,
                                              sort_keys=sort_keys,
-                                             sort_dir=sort_dir))
+                                             sort_dir=sort_dir,
+                                             detail=detail))
 
     def describe_stack_resource(self, ctxt, stack_identity, resource_name):
         """
@@ -300,6 +303,23 @@ class EngineClient(object):
                                              stack_identity=stack_identity,
                                              resource_name=resource_name))
 
+    def describe_stack_resource_metadata(self, ctxt, stack_identity,
+                                         resource_name, etag=None):
+        """
+        Get the stored metadata of a particular resource.
+        :param ctxt: RPC context.
+        :param stack_identity: Name of the stack.
+        :param resource_name: the Resource.
+        :param etag: the ETag of metadata the caller already has, in which
+                     case the metadata is omitted from the result if it
+                     has not changed.
+        """
+        return self.call(ctxt, self.make_msg(
+            'describe_stack_resource_metadata',
+            stack_identity=stack_identity,
+            resource_name=resource_name,
+            etag=etag))
+
     def find_physical_resource(self, ctxt, physical_resource_id):
         """
         Return an identifier for the resource with the specified physical
@@ -342,6 +362,32 @@ class EngineClient(object):
         return self.call(ctxt, self.make_msg('stack_resume',
                                              stack_identity=stack_identity))
 
+    def nested_stack_action(self, ctxt, stack_identity, action,
+                            parent_resource_name, template=None, params=None,
+                            files=None, timeout_mins=None):
+        """
+        Run an action on a nested stack in any engine, without waiting for
+        the action to complete.
+        :param ctxt: RPC context.
+        :param stack_identity: Name of the nested stack.
+        :param action: the stack action, e.g. CREATE or DELETE.
+        :param parent_resource_name: the Resource in the parent stack
+                                     which manages the nested stack.
+        :param template: the new template, for an UPDATE.
+        :param params: the new environment, for an UPDATE.
+        :param files: files referenced from the new template, for an UPDATE.
+        :param timeout_mins: the timeout for an UPDATE.
+        """
+        return self.cast(ctxt, self.make_msg(
+            'nested_stack_action',
+            stack_identity=stack_identity,
+            action=action,
+            parent_resource_name=parent_resource_name,
+            template=template,
+            params=params,
+            files=files,
+            timeout_mins=timeout_mins))
+
     def metadata_update(self, ctxt, stack_identity, resource_name, metadata):
         """
         Update the metadata for the given resource.
@@ -481,3 +527,31 @@ class EngineClient(object):
     def delete_software_deployment(self, cnxt, deployment_id):
         return self.call(cnxt, self.make_msg('delete_software_deployment',
                                              deployment_id=deployment_id))
+
+    def queue_stats(self, ctxt, engine_id, timeout=None):
+        """
+        Return the numbers of stack actions running and queued on an engine.
+
+        :param ctxt: RPC context.
+        :param engine_id: The UUID of the engine to ask.
+        :param timeout: Seconds to wait for the engine to reply.
+        """
+        return self._call_engine(ctxt, engine_id, 'queue_stats', timeout)
+
+    def db_stats(self, ctxt, engine_id, timeout=None):
+        """
+        Return the numbers of database statements made by each RPC method
+        and stack action on an engine, and the use of its connection pool.
+
+        :param ctxt: RPC context.
+        :param engine_id: The UUID of the engine to ask.
+        :param timeout: Seconds to wait for the engine to reply.
+        """
+        return self._call_engine(ctxt, engine_id, 'db_stats', timeout)
+
+    def _call_engine(self, ctxt, engine_id, method, timeout=None):
+        # Calls to a single engine go to the topic it listens on
+        kwargs = {'topic': engine_id}
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        return self._client.prepare(**kwargs).call(ctxt, method)
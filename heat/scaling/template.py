@@ -40,6 +40,19 @@ def resource_templates(old_resources, resource_definition,
             yield short_id.generate_id(), resource_definition
 
 
+def batch_capacities(current, target, batch_size):
+    """
+    Return the capacities a group should pass through when changing size
+    from current to target, creating or deleting at most batch_size members
+    at each step. A batch_size of zero or less means a single step.
+    """
+    if batch_size <= 0 or abs(target - current) <= batch_size:
+        return [target]
+
+    step = batch_size if target > current else -batch_size
+    return range(current + step, target, step) + [target]
+
+
 def make_template(resource_definitions,
                   version=('heat_template_version', '2013-05-23')):
     """
@@ -21,6 +21,7 @@ if possible.
 """
 
 import datetime
+import json
 import os
 import shutil
 import subprocess
@@ -242,6 +243,21 @@ class TestHeatMigrations(test_migrations.BaseMigrationTestCase,
     def _check_036(self, engine, data):
         self.assertColumnExists(engine, 'stack', 'stack_user_project_id')
 
+    def _pre_upgrade_037(self, engine):
+        raw_template = get_table(engine, 'raw_template')
+        template = {'heat_template_version': '2013-05-23',
+                    'parameters': {'foo': {'Type': 'String'}}}
+        templ = [dict(id=37, template=json.dumps(template))]
+        engine.execute(raw_template.insert(), templ)
+        return templ
+
+    def _check_037(self, engine, data):
+        raw_template = get_table(engine, 'raw_template')
+        row = engine.execute(raw_template.select().where(
+            raw_template.c.id == data[0]['id'])).first()
+        self.assertEqual({'foo': {'type': 'string'}},
+                         json.loads(row.template)['parameters'])
+
     def _check_038(self, engine, data):
         self.assertColumnNotExists(engine, 'software_config', 'io')
 
@@ -250,3 +266,58 @@ class TestHeatMigrations(test_migrations.BaseMigrationTestCase,
 
     def _check_040(self, engine, data):
         self.assertColumnNotExists(engine, 'software_deployment', 'signal_id')
+
+    def _check_045(self, engine, data):
+        self.assertColumnExists(engine, 'engine_heartbeat', 'engine_id')
+        self.assertColumnExists(engine, 'engine_heartbeat', 'updated_at')
+
+    def _check_046(self, engine, data):
+        self.assertIndexMembers(engine, 'stack', 'ix_stack_owner_id',
+                                ['owner_id'])
+        self.assertIndexMembers(engine, 'stack', 'ix_stack_name', ['name'])
+        self.assertIndexMembers(engine, 'stack', 'ix_stack_tenant',
+                                ['tenant', 'deleted_at'])
+        self.assertIndexMembers(engine, 'resource',
+                                'ix_resource_nova_instance',
+                                ['nova_instance'])
+        self.assertIndexMembers(engine, 'event',
+                                'ix_event_stack_id_created_at',
+                                ['stack_id', 'created_at'])
+
+    def _check_047(self, engine, data):
+        self.assertColumnExists(engine, 'resource_properties_data', 'hash')
+        self.assertColumnExists(engine, 'resource_properties_data', 'data')
+        self.assertColumnIsNullable(engine, 'event', 'rsrc_prop_data_id')
+        self.assertColumnIsNullable(engine, 'event', 'resource_properties')
+        if engine.name != 'mysql':
+            self.assertIndexMembers(engine, 'event',
+                                    'ix_event_rsrc_prop_data_id',
+                                    ['rsrc_prop_data_id'])
+
+    def _pre_upgrade_048(self, engine):
+        raw_template = get_table(engine, 'raw_template')
+        templ = [dict(id=48, template='{}', files='{"a": "1", "b": "2"}'),
+                 dict(id=49, template='{}', files='{"b": "2", "a": "1"}')]
+        engine.execute(raw_template.insert(), templ)
+        return templ
+
+    def _check_048(self, engine, data):
+        self.assertColumnExists(engine, 'raw_template_files', 'hash')
+        self.assertColumnExists(engine, 'raw_template_files', 'files')
+        self.assertColumnIsNullable(engine, 'raw_template', 'files_id')
+        if engine.name != 'mysql':
+            self.assertIndexMembers(engine, 'raw_template',
+                                    'ix_raw_template_files_id', ['files_id'])
+
+        raw_template = get_table(engine, 'raw_template')
+        rows = engine.execute(raw_template.select().where(
+            raw_template.c.id.in_([t['id'] for t in data]))).fetchall()
+        self.assertEqual(2, len(rows))
+        self.assertEqual(1, len(set(row.files_id for row in rows)))
+        self.assertEqual([None, None], [row.files for row in rows])
+
+        template_files = get_table(engine, 'raw_template_files')
+        files = engine.execute(template_files.select().where(
+            template_files.c.id == rows[0].files_id)).first()
+        self.assertEqual({'a': '1', 'b': '2'}, json.loads(files.files))
+        self.assertIsNotNone(files.created_at)
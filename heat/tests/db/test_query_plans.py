@@ -0,0 +1,112 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import re
+
+import sqlalchemy
+
+from heat.db.sqlalchemy import api as db_api
+from heat.tests.common import HeatTestCase
+from heat.tests import test_sqlalchemy_api as api_test
+from heat.tests import utils
+
+
+class QueryPlanTest(HeatTestCase):
+    '''
+    Check that the queries made most often search an index of the table
+    they look up, rather than scanning the whole table.
+    '''
+
+    def setUp(self):
+        super(QueryPlanTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        template = api_test.create_raw_template(self.ctx)
+        user_creds = api_test.create_user_creds(self.ctx)
+        self.stack = api_test.create_stack(self.ctx, template, user_creds)
+
+        self.statements = []
+        self.engine = db_api.get_engine()
+        sqlalchemy.event.listen(self.engine, 'before_cursor_execute',
+                                self._capture)
+        self.addCleanup(sqlalchemy.event.remove, self.engine,
+                        'before_cursor_execute', self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context,
+                 executemany):
+        self.statements.append((statement, parameters))
+
+    def _query_plans(self, table, func, *args):
+        del self.statements[:]
+        func(*args)
+        from_table = re.compile(r'\bFROM %s\b' % table)
+        queries = [(statement, parameters)
+                   for statement, parameters in self.statements
+                   if from_table.search(statement)]
+        self.assertNotEqual([], queries)
+
+        return [(statement,
+                 [row['detail'] for row in self.engine.execute(
+                     'EXPLAIN QUERY PLAN ' + statement, parameters)])
+                for statement, parameters in queries]
+
+    def assertSearched(self, table, func, *args):
+        scan = re.compile(r'SCAN (TABLE )?%s\b' % table)
+        for statement, plan in self._query_plans(table, func, *args):
+            self.assertFalse(any(scan.match(step) for step in plan),
+                             '%s\n%s' % (statement, '\n'.join(plan)))
+
+    def test_stack_get_all_by_owner_id(self):
+        self.assertSearched('stack', db_api.stack_get_all_by_owner_id,
+                            self.ctx, self.stack.id)
+
+    def test_stack_get_by_name(self):
+        self.assertSearched('stack', db_api.stack_get_by_name,
+                            self.ctx, self.stack.name)
+
+    def test_stack_get_all(self):
+        self.assertSearched('stack', db_api.stack_get_all, self.ctx)
+
+    def test_resource_get_by_physical_resource_id(self):
+        self.assertSearched('resource',
+                            db_api.resource_get_by_physical_resource_id,
+                            self.ctx, api_test.UUID1)
+
+    def test_resource_get_all_by_stack(self):
+        api_test.create_resource(self.ctx, self.stack)
+        self.assertSearched('resource', db_api.resource_get_all_by_stack,
+                            self.ctx, self.stack.id)
+
+    def test_event_get_all_by_stack(self):
+        self.assertSearched('event', db_api.event_get_all_by_stack,
+                            self.ctx, self.stack.id)
+
+    def test_event_page_seeks_to_marker(self):
+        events = [api_test.create_event(self.ctx, stack_id=self.stack.id)
+                  for i in range(3)]
+        self.assertSearched('event', db_api.event_get_all_by_stack,
+                            self.ctx, self.stack.id, 1, events[1].uuid)
+
+        # the page starts from the marker's position in the index
+        statement, plan = self._query_plans(
+            'event', db_api.event_get_all_by_stack,
+            self.ctx, self.stack.id, 1, events[1].uuid)[-1]
+        seek = re.compile(r'SEARCH .*\(stack_id=\? AND created_at<\?\)')
+        self.assertTrue(any(seek.match(step) for step in plan),
+                        '%s\n%s' % (statement, '\n'.join(plan)))
+
+    def test_watch_data_by_rule(self):
+        rule = api_test.create_watch_rule(self.ctx, self.stack)
+        api_test.create_watch_data(self.ctx, rule)
+        self.assertSearched(
+            'watch_data',
+            lambda: db_api.watch_rule_get(self.ctx, rule.id).watch_data)
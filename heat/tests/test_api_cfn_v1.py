@@ -1214,7 +1214,7 @@ class CfnStackControllerTest(HeatTestCase):
 
         kwargs = {'stack_identity': identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None, 'filters': None, 'detail': True}
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             dummy_req.context, ('identify_stack', {'stack_name': stack_name})
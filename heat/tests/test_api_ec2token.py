@@ -13,6 +13,7 @@
 
 
 import json
+import mock
 import six
 
 from oslo.config import cfg
@@ -32,7 +33,7 @@ class Ec2TokenTest(HeatTestCase):
 
     def setUp(self):
         super(Ec2TokenTest, self).setUp()
-        self.m.StubOutWithMock(requests, 'post')
+        self.m.StubOutWithMock(requests.Session, 'post')
 
     def _dummy_GET_request(self, params=None, environ=None):
         # Mangle the params dict into a query string
@@ -206,8 +207,9 @@ class Ec2TokenTest(HeatTestCase):
                                  "path": "/v1",
                                  "body_hash": body_hash}})
         req_headers = {'Content-Type': 'application/json'}
-        requests.post(req_url, data=req_creds,
-                      headers=req_headers).AndReturn(DummyHTTPResponse())
+        requests.Session.post(
+            req_url, data=req_creds,
+            headers=req_headers).AndReturn(DummyHTTPResponse())
 
     def test_call_ok(self):
         dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
@@ -519,3 +521,128 @@ class Ec2TokenTest(HeatTestCase):
         self.assertEqual('woot', ec2.__call__(dummy_req))
 
         self.m.VerifyAll()
+
+    def _cache_test_request(self):
+        params = {'AWSAccessKeyId': 'foo', 'Signature': 'xyz'}
+        req_env = {'SERVER_NAME': 'heat',
+                   'SERVER_PORT': '8000',
+                   'PATH_INFO': '/v1'}
+        return self._dummy_GET_request(params, req_env)
+
+    def _cache_test_response(self, token_id=123, expires=None):
+        token = {'id': token_id,
+                 'tenant': {'name': 'tenant', 'id': 'abcd1234'}}
+        if expires is not None:
+            token['expires'] = expires
+        ok_resp = json.dumps({'access': {
+            'metadata': {'roles': ['role1']}, 'token': token}})
+        self._stub_http_connection(response=ok_resp,
+                                   params={'AWSAccessKeyId': 'foo'})
+
+    def test_call_ok_cached(self):
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        self._cache_test_response()
+        self.m.ReplayAll()
+
+        self.assertEqual('woot', ec2.__call__(self._cache_test_request()))
+        # an identical request is authorised without calling keystone
+        dummy_req = self._cache_test_request()
+        self.assertEqual('woot', ec2.__call__(dummy_req))
+        self.assertEqual(123, dummy_req.headers['X-Auth-Token'])
+        self.assertEqual('tenant', dummy_req.headers['X-Tenant-Name'])
+        self.assertEqual('abcd1234', dummy_req.headers['X-Tenant-Id'])
+        self.assertEqual('role1', dummy_req.headers['X-Roles'])
+        self.assertEqual('http://123:5000/v2.0',
+                         dummy_req.headers['X-Auth-URL'])
+        self.m.VerifyAll()
+
+    def test_call_cache_expired(self):
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0', 'cache_ttl': '60'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        self._cache_test_response(token_id=123)
+        self._cache_test_response(token_id=456)
+        self.m.ReplayAll()
+
+        with mock.patch.object(ec2token, 'time') as mock_time:
+            mock_time.time.return_value = 1000.0
+            self.assertEqual('woot',
+                             ec2.__call__(self._cache_test_request()))
+            mock_time.time.return_value = 1061.0
+            dummy_req = self._cache_test_request()
+            self.assertEqual('woot', ec2.__call__(dummy_req))
+        self.assertEqual(456, dummy_req.headers['X-Auth-Token'])
+        self.m.VerifyAll()
+
+    def test_call_cache_token_expired(self):
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        # a token which has already expired is never cached
+        self._cache_test_response(expires='2014-01-01T00:00:00Z')
+        self._cache_test_response(expires='2014-01-01T00:00:00Z')
+        self.m.ReplayAll()
+
+        self.assertEqual('woot', ec2.__call__(self._cache_test_request()))
+        self.assertEqual('woot', ec2.__call__(self._cache_test_request()))
+        self.m.VerifyAll()
+
+    def test_call_cache_disabled(self):
+        cfg.CONF.set_override('cache_size', 0, group='ec2authtoken')
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        self._cache_test_response()
+        self._cache_test_response()
+        self.m.ReplayAll()
+
+        self.assertEqual('woot', ec2.__call__(self._cache_test_request()))
+        self.assertEqual('woot', ec2.__call__(self._cache_test_request()))
+        self.m.VerifyAll()
+
+    def test_call_err_not_cached(self):
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        err_resp = json.dumps({'error': {'message': 'bad'}})
+        self._stub_http_connection(response=err_resp,
+                                   params={'AWSAccessKeyId': 'foo'})
+        self._cache_test_response()
+        self.m.ReplayAll()
+
+        self.assertRaises(exception.HeatAccessDeniedError,
+                          ec2.__call__, self._cache_test_request())
+        self.assertEqual('woot', ec2.__call__(self._cache_test_request()))
+        self.m.VerifyAll()
+
+    def test_auth_cache_bounded(self):
+        cfg.CONF.set_override('cache_size', 2, group='ec2authtoken')
+        ec2 = ec2token.EC2Token(app='woot', conf={})
+        for key in ('a', 'b', 'c'):
+            ec2._auth_cache_put(key, {'X-Auth-Token': key}, {})
+        self.assertIsNone(ec2._auth_cache_get('a'))
+        self.assertEqual({'X-Auth-Token': 'b'}, ec2._auth_cache_get('b'))
+        self.assertEqual({'X-Auth-Token': 'c'}, ec2._auth_cache_get('c'))
+
+    def test_auth_cache_lru(self):
+        cfg.CONF.set_override('cache_size', 2, group='ec2authtoken')
+        ec2 = ec2token.EC2Token(app='woot', conf={})
+        ec2._auth_cache_put('a', {'X-Auth-Token': 'a'}, {})
+        ec2._auth_cache_put('b', {'X-Auth-Token': 'b'}, {})
+        self.assertEqual({'X-Auth-Token': 'a'}, ec2._auth_cache_get('a'))
+        ec2._auth_cache_put('c', {'X-Auth-Token': 'c'}, {})
+        self.assertIsNone(ec2._auth_cache_get('b'))
+        self.assertEqual({'X-Auth-Token': 'a'}, ec2._auth_cache_get('a'))
+        self.assertEqual({'X-Auth-Token': 'c'}, ec2._auth_cache_get('c'))
+
+    def test_auth_cache_key(self):
+        key = ec2token.EC2Token._auth_cache_key
+        req = self._cache_test_request()
+        other_req = self._cache_test_request()
+        other_req.environ['PATH_INFO'] = '/v2'
+        params = {'AWSAccessKeyId': 'foo'}
+        self.assertEqual(key('uri', 'foo', 'xyz', req, params, 'h'),
+                         key('uri', 'foo', 'xyz', req, dict(params), 'h'))
+        self.assertNotEqual(key('uri', 'foo', 'xyz', req, params, 'h'),
+                            key('uri', 'foo', 'xyz', other_req, params, 'h'))
+        self.assertNotEqual(key('uri', 'foo', 'xyz', req, params, 'h'),
+                            key('uri', 'foo', 'xyz', req, {'a': 'b'}, 'h'))
+        self.assertNotEqual(key('uri', 'foo', 'xyz', req, params, 'h'),
+                            key('uri', 'foo', 'abc', req, params, 'h'))
@@ -1678,6 +1678,29 @@ class StackSerializerTest(HeatTestCase):
         self.assertEqual('application/json', response.headers['Content-Type'])
 
 
+class ResourceSerializerTest(HeatTestCase):
+
+    def setUp(self):
+        super(ResourceSerializerTest, self).setUp()
+        self.serializer = resources.ResourceSerializer()
+
+    def test_serialize_metadata(self):
+        result = {'metadata': {'foo': 'bar'}, 'metadata_etag': 'abc123'}
+        response = webob.Response()
+        response = self.serializer.metadata(response, result)
+        self.assertEqual(200, response.status_int)
+        self.assertEqual('"abc123"', response.headers['ETag'])
+        self.assertEqual({'metadata': {'foo': 'bar'}}, response.json)
+
+    def test_serialize_metadata_not_modified(self):
+        result = {'metadata_etag': 'abc123'}
+        response = webob.Response()
+        response = self.serializer.metadata(response, result)
+        self.assertEqual(304, response.status_int)
+        self.assertEqual('"abc123"', response.headers['ETag'])
+        self.assertEqual('', response.body)
+
+
 @mock.patch.object(policy.Enforcer, 'enforce')
 class ResourceControllerTest(ControllerTest, HeatTestCase):
     '''
@@ -2039,31 +2062,19 @@ class ResourceControllerTest(ControllerTest, HeatTestCase):
         res_name = 'WikiDatabase'
         stack_identity = identifier.HeatIdentifier(self.tenant,
                                                    'wordpress', '6')
-        res_identity = identifier.ResourceIdentifier(resource_name=res_name,
-                                                     **stack_identity)
 
         req = self._get(stack_identity._tenant_path())
 
         engine_resp = {
-            u'description': u'',
-            u'resource_identity': dict(res_identity),
-            u'stack_name': stack_identity.stack_name,
-            u'resource_name': res_name,
-            u'resource_status_reason': None,
-            u'updated_time': u'2012-07-23T13:06:00Z',
-            u'stack_identity': dict(stack_identity),
-            u'resource_action': u'CREATE',
-            u'resource_status': u'COMPLETE',
-            u'physical_resource_id':
-            u'a3455d8c-9f88-404d-a85b-5315293e67de',
-            u'resource_type': u'AWS::EC2::Instance',
+            u'metadata_etag': u'abc123',
             u'metadata': {u'ensureRunning': u'true'}
         }
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('describe_stack_resource',
-             {'stack_identity': stack_identity, 'resource_name': res_name})
+            ('describe_stack_resource_metadata',
+             {'stack_identity': stack_identity, 'resource_name': res_name,
+              'etag': None})
         ).AndReturn(engine_resp)
         self.m.ReplayAll()
 
@@ -2072,11 +2083,41 @@ class ResourceControllerTest(ControllerTest, HeatTestCase):
                                           stack_id=stack_identity.stack_id,
                                           resource_name=res_name)
 
-        expected = {'metadata': {u'ensureRunning': u'true'}}
+        expected = {'metadata': {u'ensureRunning': u'true'},
+                    'metadata_etag': u'abc123'}
 
         self.assertEqual(expected, result)
         self.m.VerifyAll()
 
+    def test_metadata_show_if_none_match(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'metadata', True)
+        res_name = 'WikiDatabase'
+        stack_identity = identifier.HeatIdentifier(self.tenant,
+                                                   'wordpress', '6')
+        res_identity = identifier.ResourceIdentifier(resource_name=res_name,
+                                                     **stack_identity)
+
+        req = self._get(res_identity._tenant_path() + '/metadata')
+        req.headers['If-None-Match'] = '"abc123"'
+
+        engine_resp = {u'metadata_etag': u'abc123'}
+        self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
+        rpc_client.EngineClient.call(
+            req.context,
+            ('describe_stack_resource_metadata',
+             {'stack_identity': stack_identity, 'resource_name': res_name,
+              'etag': u'abc123'})
+        ).AndReturn(engine_resp)
+        self.m.ReplayAll()
+
+        result = self.controller.metadata(req, tenant_id=self.tenant,
+                                          stack_name=stack_identity.stack_name,
+                                          stack_id=stack_identity.stack_id,
+                                          resource_name=res_name)
+
+        self.assertEqual(engine_resp, result)
+        self.m.VerifyAll()
+
     def test_metadata_show_nonexist(self, mock_enforce):
         self._mock_enforce_setup(mock_enforce, 'metadata', True)
         res_name = 'WikiDatabase'
@@ -2091,8 +2132,9 @@ class ResourceControllerTest(ControllerTest, HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('describe_stack_resource',
-             {'stack_identity': stack_identity, 'resource_name': res_name})
+            ('describe_stack_resource_metadata',
+             {'stack_identity': stack_identity, 'resource_name': res_name,
+              'etag': None})
         ).AndRaise(to_remote_error(error))
         self.m.ReplayAll()
 
@@ -2121,8 +2163,9 @@ class ResourceControllerTest(ControllerTest, HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('describe_stack_resource',
-             {'stack_identity': stack_identity, 'resource_name': res_name})
+            ('describe_stack_resource_metadata',
+             {'stack_identity': stack_identity, 'resource_name': res_name,
+              'etag': None})
         ).AndRaise(to_remote_error(error))
         self.m.ReplayAll()
 
@@ -2222,7 +2265,9 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None,
+                  'filters': {'resource_name': res_name},
+                  'detail': False}
 
         engine_resp = [
             {
@@ -2307,7 +2352,8 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None, 'filters': None,
+                  'detail': False}
 
         engine_resp = [
             {
@@ -2366,7 +2412,8 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None, 'filters': None,
+                  'detail': False}
 
         error = heat_exc.StackNotFound(stack_name='a')
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
@@ -2417,7 +2464,9 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None,
+                  'filters': {'resource_name': res_name},
+                  'detail': False}
 
         engine_resp = [
             {
@@ -2473,7 +2522,7 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         rpc_call_args, _ = mock_call.call_args
         engine_args = rpc_call_args[1][1]
-        self.assertEqual(6, len(engine_args))
+        self.assertEqual(7, len(engine_args))
         self.assertIn('limit', engine_args)
         self.assertEqual('fake limit', engine_args['limit'])
         self.assertIn('sort_keys', engine_args)
@@ -2484,6 +2533,7 @@ class EventControllerTest(ControllerTest, HeatTestCase):
         self.assertEqual('fake sort dir', engine_args['sort_dir'])
         self.assertIn('filters', engine_args)
         self.assertIsNone(engine_args['filters'])
+        self.assertFalse(engine_args['detail'])
         self.assertNotIn('balrog', engine_args)
 
     @mock.patch.object(rpc_client.EngineClient, 'call')
@@ -2524,6 +2574,30 @@ class EventControllerTest(ControllerTest, HeatTestCase):
         self.assertEqual('OS::Nova::Server', filters['resource_type'])
         self.assertNotIn('balrog', filters)
 
+    @mock.patch.object(rpc_client.EngineClient, 'call')
+    def test_resource_index_filters_resource_name(self, mock_call,
+                                                  mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        stack_identity = identifier.HeatIdentifier(self.tenant,
+                                                   'wibble', '6')
+        req = self._get(stack_identity._tenant_path() +
+                        '/resources/my_server/events')
+        req.environ['QUERY_STRING'] = ('resource_name=my_server&'
+                                       'resource_name=other')
+        mock_call.return_value = []
+
+        self.assertRaises(webob.exc.HTTPNotFound,
+                          self.controller.index,
+                          req, tenant_id=self.tenant,
+                          stack_name=stack_identity.stack_name,
+                          stack_id=stack_identity.stack_id,
+                          resource_name='my_server')
+
+        rpc_call_args, _ = mock_call.call_args
+        engine_args = rpc_call_args[1][1]
+        self.assertEqual({'resource_name': 'my_server'},
+                         engine_args['filters'])
+
     def test_show_event_id_integer(self, mock_enforce):
         self._test_show('42', mock_enforce)
 
@@ -2547,7 +2621,10 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None,
+                  'filters': {'resource_name': res_name,
+                              'uuid': event_id},
+                  'detail': True}
 
         engine_resp = [
             {
@@ -2637,7 +2714,10 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None,
+                  'filters': {'resource_name': res_name,
+                              'uuid': event_id},
+                  'detail': True}
 
         engine_resp = [
             {
@@ -2683,7 +2763,10 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None,
+                  'filters': {'resource_name': res_name,
+                              'uuid': event_id},
+                  'detail': True}
 
         engine_resp = [
             {
@@ -2725,7 +2808,10 @@ class EventControllerTest(ControllerTest, HeatTestCase):
 
         kwargs = {'stack_identity': stack_identity,
                   'limit': None, 'sort_keys': None, 'marker': None,
-                  'sort_dir': None, 'filters': None}
+                  'sort_dir': None,
+                  'filters': {'resource_name': res_name,
+                              'uuid': event_id},
+                  'detail': True}
 
         error = heat_exc.StackNotFound(stack_name='a')
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
@@ -843,6 +843,36 @@ class AutoScalingTest(HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_lb_reload_unchanged_members(self):
+        t = template_format.parse(as_template)
+        t['Resources']['ElasticLoadBalancer'] = {
+            'Type': 'OS::Neutron::LoadBalancer',
+            'Properties': {
+                'protocol_port': 8080,
+                'pool_id': 'pool123'
+            }
+        }
+
+        self.m.StubOutWithMock(short_id, 'generate_id')
+        short_id.generate_id().AndReturn('aaaabbbbcccc')
+
+        # only the first reload has any change to pass on
+        self.m.StubOutWithMock(neutron_lb.LoadBalancer, 'handle_update')
+        neutron_lb.LoadBalancer.handle_update(mox.IgnoreArg(),
+                                              mox.IgnoreArg(),
+                                              mox.IgnoreArg()).AndReturn(None)
+
+        now = timeutils.utcnow()
+        self._stub_meta_expected(now, 'ExactCapacity : 1')
+        self._stub_create(1)
+        self.m.ReplayAll()
+        stack = utils.parse_stack(t, params=self.params)
+        rsrc = self.create_scaling_group(t, stack, 'WebServerGroup')
+        rsrc._lb_reload()
+        rsrc._lb_reload()
+
+        self.m.VerifyAll()
+
     def test_lb_reload_invalid_resource(self):
         t = template_format.parse(as_template)
         t['Resources']['ElasticLoadBalancer'] = {
@@ -904,7 +934,7 @@ class AutoScalingTest(HeatTestCase):
         # set to 2
         self._stub_lb_reload(2)
         self._stub_delete(1)
-        self._stub_image_validate(2)
+        self._stub_image_validate()
         self._stub_meta_expected(now, 'ExactCapacity : 2')
         self._stub_scale_notification(adjust=2, groupname=rsrc.FnGetRefId(),
                                       adjust_type='ExactCapacity',
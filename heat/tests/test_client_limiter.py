@@ -0,0 +1,86 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+from oslo.config import cfg
+
+from heat.engine import client_limiter
+from heat.tests.common import HeatTestCase
+
+
+class ClientLimiterTest(HeatTestCase):
+    def setUp(self):
+        super(ClientLimiterTest, self).setUp()
+        self.addCleanup(client_limiter.clear)
+
+    def _run_calls(self, client_name, count):
+        active = []
+        peak = []
+
+        def call():
+            with client_limiter.limit(client_name):
+                active.append(None)
+                peak.append(len(active))
+                eventlet.sleep()
+                active.pop()
+
+        threads = [eventlet.spawn(call) for i in range(count)]
+        for thread in threads:
+            thread.wait()
+        return max(peak)
+
+    def test_unlimited(self):
+        self.assertEqual(5, self._run_calls('nova', 5))
+        self.assertEqual({}, client_limiter.stats())
+
+    def test_limited(self):
+        cfg.CONF.set_override('max_concurrent_calls', 2,
+                              group='clients_nova')
+        self.assertEqual(2, self._run_calls('nova', 5))
+        self.assertEqual(5, self._run_calls('neutron', 5))
+
+        stats = client_limiter.stats()
+        self.assertEqual(['nova'], stats.keys())
+        self.assertEqual(2, stats['nova']['limit'])
+        self.assertEqual(0, stats['nova']['active'])
+        self.assertEqual(0, stats['nova']['waiting'])
+        self.assertEqual(5, stats['nova']['calls'])
+        self.assertEqual(3, stats['nova']['waits'])
+
+    def test_limit_changed(self):
+        cfg.CONF.set_override('max_concurrent_calls', 1,
+                              group='clients_nova')
+        self.assertEqual(1, self._run_calls('nova', 3))
+        cfg.CONF.set_override('max_concurrent_calls', 3,
+                              group='clients_nova')
+        self.assertEqual(3, self._run_calls('nova', 3))
+
+    def test_released_on_error(self):
+        cfg.CONF.set_override('max_concurrent_calls', 1,
+                              group='clients_nova')
+
+        def fail():
+            with client_limiter.limit('nova'):
+                raise ValueError()
+
+        self.assertRaises(ValueError, fail)
+        self.assertRaises(ValueError, fail)
+        self.assertEqual(0, client_limiter.stats()['nova']['active'])
+        self.assertEqual(0, client_limiter.stats()['nova']['waits'])
+
+    def test_no_client(self):
+        with client_limiter.limit(None):
+            pass
+        with client_limiter.limit('unknown'):
+            pass
+        self.assertEqual({}, client_limiter.stats())
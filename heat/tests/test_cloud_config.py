@@ -12,6 +12,7 @@
 #    under the License.
 
 import mock
+from oslo.config import cfg
 
 from heat.engine import parser
 from heat.engine.resources.software_config import cloud_config as cc
@@ -24,6 +25,7 @@ class CloudConfigTest(HeatTestCase):
 
     def setUp(self):
         super(CloudConfigTest, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', False)
         self.ctx = utils.dummy_context()
         self.properties = {
             'cloud_config': {'foo': 'bar'}
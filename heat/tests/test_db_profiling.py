@@ -0,0 +1,127 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+from oslo.config import cfg
+import sqlalchemy
+from sqlalchemy import pool
+
+from heat.db.sqlalchemy import profiling
+from heat.tests.common import HeatTestCase
+
+
+class DBProfilingTest(HeatTestCase):
+    def setUp(self):
+        super(DBProfilingTest, self).setUp()
+        self.engine = sqlalchemy.create_engine('sqlite://',
+                                               poolclass=pool.QueuePool,
+                                               pool_size=2)
+        profiling.attach(self.engine)
+        self.addCleanup(profiling._pools.remove, self.engine.pool)
+        profiling.clear()
+        self.addCleanup(profiling.clear)
+        self.warning = self.patchobject(profiling.LOG, 'warning')
+
+    def _execute(self, count=1, statement='SELECT 1'):
+        for i in range(count):
+            self.engine.execute(statement)
+
+    def test_track(self):
+        with profiling.track('outer'):
+            self._execute(2)
+            with profiling.track('inner'):
+                self._execute()
+            self._execute()
+        with profiling.track('outer'):
+            self._execute()
+        self._execute()
+
+        stats = profiling.stats()['statements']
+        self.assertEqual(['inner', 'outer'], sorted(stats))
+        self.assertEqual(1, stats['inner']['calls'])
+        self.assertEqual(1, stats['inner']['statements'])
+        self.assertEqual(2, stats['outer']['calls'])
+        self.assertEqual(4, stats['outer']['statements'])
+        self.assertEqual(3, stats['outer']['max_statements'])
+        self.assertTrue(stats['outer']['time'] > 0)
+        self.assertFalse(self.warning.called)
+
+    def test_track_threads(self):
+        def run(name):
+            with profiling.track(name):
+                self._execute()
+                eventlet.sleep()
+                self._execute()
+
+        threads = [eventlet.spawn(run, name) for name in ('a', 'b')]
+        for thread in threads:
+            thread.wait()
+
+        stats = profiling.stats()['statements']
+        self.assertEqual(2, stats['a']['statements'])
+        self.assertEqual(2, stats['b']['statements'])
+
+    def test_failed_query(self):
+        conn = self.engine.connect()
+        with mock.patch.object(profiling, 'wallclock') as wallclock:
+            wallclock.side_effect = [0.0, 1.0, 1.5]
+            self.assertRaises(sqlalchemy.exc.OperationalError,
+                              conn.execute, 'SELECT * FROM missing')
+            with profiling.track('foo'):
+                conn.execute('SELECT 1')
+        self.assertNotIn('query_start_time', conn.info)
+        conn.close()
+
+        self.assertEqual(0.5, profiling.stats()['statements']['foo']['time'])
+
+    def test_slow_query(self):
+        cfg.CONF.set_override('slow_query_time', 500)
+        with mock.patch.object(profiling, 'wallclock') as wallclock:
+            wallclock.side_effect = [0.0, 0.1, 1.0, 1.5]
+            self._execute(2)
+
+        self.assertEqual(1, self.warning.call_count)
+        self.assertIn('SELECT 1', self.warning.call_args[0][0])
+
+    def test_repeated_query(self):
+        cfg.CONF.set_override('repeated_query_limit', 2)
+        with profiling.track('foo'):
+            self._execute(5)
+            self._execute(2, 'SELECT 2')
+        with profiling.track('foo'):
+            self._execute(2)
+        self._execute(3)
+
+        self.assertEqual(1, self.warning.call_count)
+        self.assertIn('SELECT 1', self.warning.call_args[0][0])
+
+    def test_pool(self):
+        # connections may still be checked out from the test database
+        base = profiling.stats()['pool']['checked_out']
+        conns = [self.engine.connect() for i in range(3)]
+        stats = profiling.stats()['pool']
+        self.assertEqual(base + 3, stats['checked_out'])
+        self.assertEqual(base + 3, stats['max_checked_out'])
+        self.assertEqual(2, stats['size'])
+        self.assertEqual(1, stats['overflow'])
+
+        for conn in conns:
+            conn.close()
+        self._execute()
+        stats = profiling.stats()['pool']
+        self.assertEqual(base, stats['checked_out'])
+        self.assertEqual(base + 3, stats['max_checked_out'])
+        self.assertEqual(4, stats['checkouts'])
+        self.assertEqual(3, stats['connections'])
+        self.assertEqual(0, stats['overflow'])
@@ -200,6 +200,13 @@ class FormatTest(HeatTestCase):
                                            event_id_formatted['path'])
         self.assertEqual(event_id, event_identifier.event_id)
 
+    def test_format_event_summary(self):
+        event = self._dummy_event('abc123yc-9f88-404d-a85b-531529456xyz')
+
+        formatted = api.format_event(event, detail=False)
+        self.assertNotIn(rpc_api.EVENT_RES_PROPERTIES, formatted)
+        self.assertIn(rpc_api.EVENT_RES_TYPE, formatted)
+
     @mock.patch.object(api, 'format_stack_resource')
     def test_format_stack_preview(self, mock_fmt_resource):
         def mock_format_resources(res, **kwargs):
@@ -35,14 +35,17 @@ from heat.db import api as db_api
 from heat.engine.clients.os import glance
 from heat.engine.clients.os import keystone
 from heat.engine.clients.os import nova
+from heat.engine import client_limiter
 from heat.engine import dependencies
 from heat.engine import environment
+from heat.engine import metadata_cache
 from heat.engine import parser
 from heat.engine.properties import Properties
 from heat.engine import resource as res
 from heat.engine.resources import instance as instances
 from heat.engine.resources import nova_utils
 from heat.engine import service
+from heat.engine import signal_waiter
 from heat.engine import stack_lock
 from heat.engine import watchrule
 from heat.openstack.common import threadgroup
@@ -484,6 +487,85 @@ class StackServiceCreateUpdateDeleteTest(HeatTestCase):
         self.assertIn("You have reached the maximum stacks per tenant",
                       six.text_type(ex.exc_info[1]))
 
+    def _test_stack_create_async(self, stack_name):
+        cfg.CONF.set_override('async_stack_validation', True)
+        template = template_format.parse(wp_template)
+        create = self.patchobject(parser.Stack, 'create')
+        start = self.patchobject(self.man.thread_group_mgr, 'start_with_lock')
+
+        result = self.man.create_stack(self.ctx, stack_name, template,
+                                       {'KeyName': 'test'}, None, {})
+        self.assertEqual(stack_name, result['stack_name'])
+        db_stack = db_api.stack_get(self.ctx, result['stack_id'])
+        self.assertEqual('CREATE', db_stack.action)
+        self.assertEqual('IN_PROGRESS', db_stack.status)
+        self.assertEqual('Stack validation in progress',
+                         db_stack.status_reason)
+        self.assertFalse(parser.Stack.validate.called)
+
+        # Run the background validation and create
+        func, stack = start.call_args[0][3:]
+        func(stack)
+        parser.Stack.validate.assert_called_once_with()
+        return db_api.stack_get(self.ctx, result['stack_id']), create
+
+    def test_stack_create_async_validation(self):
+        self.patchobject(parser.Stack, 'validate')
+        db_stack, create = self._test_stack_create_async(
+            'service_create_async_test_stack')
+        create.assert_called_once_with()
+
+    def test_stack_create_async_validation_err(self):
+        validate = self.patchobject(parser.Stack, 'validate')
+        validate.side_effect = exception.StackValidationFailed(
+            message='fubar')
+        stack_name = 'service_create_async_err_test_stack'
+
+        db_stack, create = self._test_stack_create_async(stack_name)
+        self.assertFalse(create.called)
+        self.assertEqual('CREATE', db_stack.action)
+        self.assertEqual('FAILED', db_stack.status)
+        self.assertEqual('Stack validation failed: fubar',
+                         db_stack.status_reason)
+
+        events = db_api.event_get_all_by_stack(self.ctx, db_stack.id)
+        self.assertEqual(1, len(events))
+        self.assertEqual(stack_name, events[0].resource_name)
+        self.assertEqual('FAILED', events[0].resource_status)
+        self.assertEqual('Stack validation failed: fubar',
+                         events[0].resource_status_reason)
+
+    def test_stack_create_overloaded(self):
+        cfg.CONF.set_override('async_stack_validation', True)
+        check = self.patchobject(self.man.thread_group_mgr, 'check_capacity')
+        check.side_effect = exception.EngineOverloaded
+        start = self.patchobject(self.man.thread_group_mgr, 'start_with_lock')
+        stack_name = 'service_create_overloaded_test_stack'
+
+        ex = self.assertRaises(dispatcher.ExpectedException,
+                               self.man.create_stack, self.ctx, stack_name,
+                               template_format.parse(wp_template),
+                               {'KeyName': 'test'}, None, {})
+        self.assertEqual(exception.EngineOverloaded, ex.exc_info[0])
+        self.assertFalse(start.called)
+        self.assertIsNone(db_api.stack_get_by_name(self.ctx, stack_name))
+
+    def test_stack_create_overloaded_after_store(self):
+        cfg.CONF.set_override('async_stack_validation', True)
+        start = self.patchobject(self.man.thread_group_mgr, 'start_with_lock')
+        start.side_effect = exception.EngineOverloaded
+        stack_name = 'service_create_overloaded_test_stack'
+
+        ex = self.assertRaises(dispatcher.ExpectedException,
+                               self.man.create_stack, self.ctx, stack_name,
+                               template_format.parse(wp_template),
+                               {'KeyName': 'test'}, None, {})
+        self.assertEqual(exception.EngineOverloaded, ex.exc_info[0])
+        stack_id = start.call_args[0][1].id
+        self.assertIsNone(db_api.stack_get(self.ctx, stack_id))
+        # the name can be used again when the request is retried
+        self.assertIsNone(db_api.stack_get_by_name(self.ctx, stack_name))
+
     def test_stack_create_verify_err(self):
         stack_name = 'service_create_verify_err_test_stack'
         params = {'foo': 'bar'}
@@ -1359,6 +1441,132 @@ class StackServiceSuspendResumeTest(HeatTestCase):
         self.m.VerifyAll()
 
 
+class StackServiceNestedActionTest(HeatTestCase):
+
+    def setUp(self):
+        super(StackServiceNestedActionTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        mock_warnings(self)
+        self.man = service.EngineService('a-host', 'a-topic')
+        self.man.create_periodic_tasks()
+        self.man.engine_id = 'engine-fake-uuid'
+
+        self.parent = get_wordpress_stack('service_nested_parent', self.ctx)
+        self.parent.store()
+        template = parser.Template({'HeatTemplateFormatVersion':
+                                    '2012-12-12'})
+        self.nested = parser.Stack(self.ctx, 'service_nested_child',
+                                   template, owner_id=self.parent.id)
+        self.nested.store()
+
+        self.start = self.patchobject(service.ThreadGroupManager,
+                                      'start_with_lock')
+        self.notify = self.patchobject(signal_waiter, 'notify')
+
+    def _run_dispatched(self):
+        cnxt, stack, engine_id, func = self.start.call_args[0]
+        self.assertEqual(self.nested.id, stack.id)
+        self.assertEqual(self.parent.id, stack.parent_resource.stack.id)
+        self.assertEqual('engine-fake-uuid', engine_id)
+        self.assertFalse(self.notify.called)
+        func()
+        self.notify.assert_called_once_with(mock.ANY, self.parent.id,
+                                            self.nested.id)
+
+    def _nested_state(self):
+        s = db_api.stack_get(self.ctx, self.nested.id, show_deleted=True)
+        return s.action, s.status
+
+    def test_nested_stack_action_create(self):
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'CREATE', 'WebServer')
+        self._run_dispatched()
+        self.assertEqual(('CREATE', 'COMPLETE'), self._nested_state())
+
+    def test_nested_stack_action_delete(self):
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'DELETE', 'WebServer')
+        self._run_dispatched()
+        self.assertEqual(('DELETE', 'COMPLETE'), self._nested_state())
+
+    def test_nested_stack_action_update(self):
+        self.nested.create()
+        self.nested.state_set(self.nested.UPDATE, self.nested.IN_PROGRESS,
+                              'Stack UPDATE dispatched')
+        template = {'HeatTemplateFormatVersion': '2012-12-12',
+                    'Parameters': {'Foo': {'Type': 'String'}}}
+
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'UPDATE', 'WebServer',
+                                     template=template,
+                                     params={'parameters': {'Foo': 'bar'}},
+                                     files={}, timeout_mins=5)
+        self._run_dispatched()
+        self.assertEqual(('UPDATE', 'COMPLETE'), self._nested_state())
+        updated = parser.Stack.load(self.ctx, stack_id=self.nested.id)
+        self.assertEqual('bar', updated.parameters['Foo'])
+
+    def test_nested_stack_action_locked(self):
+        self.start.side_effect = exception.ActionInProgress(
+            stack_name=self.nested.name, action='CREATE')
+
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'CREATE', 'WebServer')
+        self.assertEqual(('CREATE', 'FAILED'), self._nested_state())
+        self.notify.assert_called_once_with(mock.ANY, self.parent.id,
+                                            self.nested.id)
+
+    def test_nested_stack_action_error(self):
+        self.start.side_effect = exception.StackValidationFailed(
+            message='fubar')
+
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'CREATE', 'WebServer')
+        self.assertEqual(('CREATE', 'FAILED'), self._nested_state())
+        self.notify.assert_called_once_with(mock.ANY, self.parent.id,
+                                            self.nested.id)
+
+    def test_nested_stack_action_bad_parent_resource(self):
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'CREATE', 'NoSuchResource')
+        self.assertFalse(self.start.called)
+        self.assertEqual(('CREATE', 'FAILED'), self._nested_state())
+        self.notify.assert_called_once_with(mock.ANY, self.parent.id,
+                                            self.nested.id)
+
+    def test_nested_stack_action_delete_stops_other_engine(self):
+        self.man.start()
+        self.man.engine_id = 'engine-fake-uuid'
+        # An earlier dispatched action is still running in another engine
+        db_api.stack_lock_create(self.nested.id, 'other-engine-fake-uuid')
+        alive = self.patchobject(stack_lock.StackLock, 'engine_alive')
+        alive.return_value = True
+        call = self.patchobject(rpc_client._CallContext, 'call')
+
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'DELETE', 'WebServer')
+        call.assert_called_once_with(
+            self.ctx, 'stop_stack',
+            stack_identity=dict(self.nested.identifier()))
+        self._run_dispatched()
+        self.assertEqual(('DELETE', 'COMPLETE'), self._nested_state())
+
+    def test_nested_stack_action_delete_stop_failed(self):
+        self.man.start()
+        db_api.stack_lock_create(self.nested.id, 'other-engine-fake-uuid')
+        alive = self.patchobject(stack_lock.StackLock, 'engine_alive')
+        alive.return_value = True
+        call = self.patchobject(rpc_client._CallContext, 'call')
+        call.side_effect = messaging.MessagingTimeout
+
+        self.man.nested_stack_action(self.ctx, self.nested.identifier(),
+                                     'DELETE', 'WebServer')
+        self.assertFalse(self.start.called)
+        self.assertEqual(('DELETE', 'FAILED'), self._nested_state())
+        self.notify.assert_called_once_with(mock.ANY, self.parent.id,
+                                            self.nested.id)
+
+
 class StackServiceAuthorizeTest(HeatTestCase):
 
     def setUp(self):
@@ -1487,6 +1695,33 @@ class StackServiceTest(HeatTestCase):
         self.assertIn(mock.call(1, mock.ANY), calls)
         self.assertIn(mock.call(2, mock.ANY), calls)
 
+    @mock.patch.object(service.db_api, 'stack_lock_release_dead_engines')
+    @mock.patch.object(service.db_api, 'engine_heartbeat_update')
+    def test_engine_heartbeat(self, mock_update, mock_release):
+        mock_release.return_value = 2
+        self.eng._engine_heartbeat()
+        mock_update.assert_called_once_with('engine-fake-uuid', 'a-host')
+        mock_release.assert_called_once_with(60)
+
+    @mock.patch.object(service.db_api, 'stack_lock_release_dead_engines')
+    @mock.patch.object(service.db_api, 'engine_heartbeat_update')
+    def test_engine_heartbeat_db_error(self, mock_update, mock_release):
+        mock_update.side_effect = Exception('DB unavailable')
+        self.eng._engine_heartbeat()
+        self.assertFalse(mock_release.called)
+
+    @mock.patch.object(service.service.Service, 'start')
+    @mock.patch.object(service, 'EngineListener')
+    @mock.patch.object(service.rpc_messaging, 'get_rpc_client')
+    @mock.patch.object(service.rpc_messaging, 'get_rpc_server')
+    def test_start_engine_heartbeat(self, mock_server, mock_client,
+                                    mock_listener, mock_super_start):
+        heartbeat = self.patchobject(self.eng, '_engine_heartbeat')
+        add_timer = self.patchobject(self.eng.tg, 'add_timer')
+        self.eng.start()
+        heartbeat.assert_called_once_with()
+        add_timer.assert_called_once_with(10, heartbeat, initial_delay=10)
+
     @stack_context('service_identify_test_stack', False)
     def test_stack_identify(self):
         self.m.StubOutWithMock(parser.Stack, 'load')
@@ -1720,7 +1955,8 @@ class StackServiceTest(HeatTestCase):
                                                     sort_keys=sort_keys,
                                                     marker=marker,
                                                     sort_dir=sort_dir,
-                                                    filters=filters)
+                                                    filters=filters,
+                                                    detail=True)
 
     @mock.patch.object(db_api, 'event_get_all_by_tenant')
     def test_tenant_events_list_passes_marker_and_filters(
@@ -1739,7 +1975,8 @@ class StackServiceTest(HeatTestCase):
                                                            sort_keys=sort_keys,
                                                            marker=marker,
                                                            sort_dir=sort_dir,
-                                                           filters=filters)
+                                                           filters=filters,
+                                                           detail=True)
 
     @stack_context('service_list_all_test_stack')
     def test_stack_list_all(self):
@@ -1964,6 +2201,11 @@ class StackServiceTest(HeatTestCase):
         self.assertIn('AWS::EC2::Instance', resources)
         self.assertIn('AWS::RDS::DBInstance', resources)
 
+    def test_rpc_statements_tracked(self):
+        track = self.patchobject(db_api, 'track_statements')
+        self.eng.count_stacks(self.ctx)
+        track.assert_called_once_with('count_stacks')
+
     def test_list_resource_types_deprecated(self):
         resources = self.eng.list_resource_types(self.ctx, "DEPRECATED")
         self.assertEqual(['OS::Neutron::RouterGateway'], resources)
@@ -2073,6 +2315,98 @@ class StackServiceTest(HeatTestCase):
 
         self.m.VerifyAll()
 
+    @stack_context('service_resource_describe_cached_test_stack')
+    def test_stack_resource_describe_shares_metadata_cache(self):
+        self.addCleanup(metadata_cache.clear)
+        self.ctx.roles = [cfg.CONF.heat_stack_user_role]
+        self.m.StubOutWithMock(service.EngineService, '_authorize_stack_user')
+        service.EngineService._authorize_stack_user(
+            self.ctx, mox.IgnoreArg(), 'WebServer').AndReturn(True)
+        self.m.ReplayAll()
+
+        self.stack['WebServer'].metadata_set({'foo': 'bar'})
+        r = self.eng.describe_stack_resource_metadata(
+            self.ctx, self.stack.identifier(), 'WebServer')
+        self.assertEqual({'foo': 'bar'}, r['metadata'])
+
+        # the authorisation and metadata cached by the call above are used
+        r = self.eng.describe_stack_resource(self.ctx, self.stack.identifier(),
+                                             'WebServer')
+        self.assertEqual({'foo': 'bar'}, r['metadata'])
+        self.assertEqual((r['metadata'], mock.ANY),
+                         metadata_cache.get_metadata(self.stack.id,
+                                                     'WebServer'))
+        self.m.VerifyAll()
+
+    @stack_context('service_resource_metadata_test_stack')
+    def test_stack_resource_metadata(self):
+        self.addCleanup(metadata_cache.clear)
+        self.m.StubOutWithMock(parser.Stack, 'load')
+        self.m.ReplayAll()
+
+        res = self.stack['WebServer']
+        res.metadata_set({'foo': 'bar'})
+        r = self.eng.describe_stack_resource_metadata(
+            self.ctx, self.stack.identifier(), 'WebServer')
+        self.assertEqual({'foo': 'bar'}, r['metadata'])
+        etag = r['metadata_etag']
+        self.assertIsNotNone(etag)
+
+        # unchanged metadata is not returned again
+        r = self.eng.describe_stack_resource_metadata(
+            self.ctx, self.stack.identifier(), 'WebServer', etag=etag)
+        self.assertEqual({'metadata_etag': etag}, r)
+
+        # updating the metadata invalidates the cached copy
+        res.metadata_set({'foo': 'baz'})
+        r = self.eng.describe_stack_resource_metadata(
+            self.ctx, self.stack.identifier(), 'WebServer', etag=etag)
+        self.assertEqual({'foo': 'baz'}, r['metadata'])
+        self.assertNotEqual(etag, r['metadata_etag'])
+        self.m.VerifyAll()
+
+    @stack_context('service_resource_metadata_cached_test_stack')
+    def test_stack_resource_metadata_cached(self):
+        self.addCleanup(metadata_cache.clear)
+        r = self.eng.describe_stack_resource_metadata(
+            self.ctx, self.stack.identifier(), 'WebServer')
+
+        self.m.StubOutWithMock(db_api, 'resource_get_by_name_and_stack')
+        self.m.ReplayAll()
+        self.assertEqual(r, self.eng.describe_stack_resource_metadata(
+            self.ctx, self.stack.identifier(), 'WebServer'))
+        self.m.VerifyAll()
+
+    @stack_context('service_resource_metadata_nonexist_test_stack')
+    def test_stack_resource_metadata_nonexist_resource(self):
+        ex = self.assertRaises(dispatcher.ExpectedException,
+                               self.eng.describe_stack_resource_metadata,
+                               self.ctx, self.stack.identifier(), 'foo')
+        self.assertEqual(ex.exc_info[0], exception.ResourceNotFound)
+
+    @stack_context('service_resource_metadata_user_test_stack')
+    def test_stack_resource_metadata_stack_user(self):
+        self.addCleanup(metadata_cache.clear)
+        self.ctx.roles = [cfg.CONF.heat_stack_user_role]
+        self.m.StubOutWithMock(service.EngineService, '_authorize_stack_user')
+        service.EngineService._authorize_stack_user(
+            self.ctx, mox.IgnoreArg(), 'WebServer').AndReturn(True)
+        service.EngineService._authorize_stack_user(
+            self.ctx, mox.IgnoreArg(), 'foo').AndReturn(False)
+        self.m.ReplayAll()
+
+        # the authorisation result is cached, so checked only once
+        for i in range(2):
+            r = self.eng.describe_stack_resource_metadata(
+                self.ctx, self.stack.identifier(), 'WebServer')
+            self.assertIn('metadata', r)
+            ex = self.assertRaises(dispatcher.ExpectedException,
+                                   self.eng.describe_stack_resource_metadata,
+                                   self.ctx, self.stack.identifier(), 'foo')
+            self.assertEqual(ex.exc_info[0], exception.Forbidden)
+
+        self.m.VerifyAll()
+
     @stack_context('service_resources_describe_test_stack')
     def test_stack_resources_describe(self):
         self.m.StubOutWithMock(parser.Stack, 'load')
@@ -2939,13 +3273,14 @@ class SoftwareConfigServiceTest(HeatTestCase):
 
         server_id = str(uuid.uuid4())
         self.m.StubOutWithMock(
-            self.engine, '_push_metadata_software_deployments')
+            self.engine.software_config,
+            '_push_metadata_software_deployments')
 
         # push on create
-        self.engine._push_metadata_software_deployments(
+        self.engine.software_config._push_metadata_software_deployments(
             self.ctx, server_id).AndReturn(None)
         # push on update with new config_id
-        self.engine._push_metadata_software_deployments(
+        self.engine.software_config._push_metadata_software_deployments(
             self.ctx, server_id).AndReturn(None)
 
         self.m.ReplayAll()
@@ -2971,9 +3306,10 @@ class SoftwareConfigServiceTest(HeatTestCase):
 
         server_id = str(uuid.uuid4())
         self.m.StubOutWithMock(
-            self.engine, '_push_metadata_software_deployments')
+            self.engine.software_config,
+            '_push_metadata_software_deployments')
         # push on create
-        self.engine._push_metadata_software_deployments(
+        self.engine.software_config._push_metadata_software_deployments(
             self.ctx, server_id).AndReturn(None)
         # _push_metadata_software_deployments should not be called
         # on update because config_id isn't being updated
@@ -3102,6 +3438,201 @@ class ThreadGroupManagerTest(HeatTestCase):
             self.f, *self.fargs, **self.fkwargs)
 
 
+class ThreadGroupManagerQueueTest(HeatTestCase):
+    def setUp(self):
+        super(ThreadGroupManagerQueueTest, self).setUp()
+        cfg.CONF.set_override('max_concurrent_stack_actions', 2)
+        cfg.CONF.set_override('max_queued_stack_actions', 3)
+        self.stack_update = self.patchobject(db_api, 'stack_update')
+        self.stack_event = self.patchobject(service, 'Event')
+        self.thm = service.ThreadGroupManager()
+        self.stacks = {}
+        self.events = {}
+        self.started = []
+        self.addCleanup(self._finish_all)
+
+    def _finish_all(self):
+        for event in self.events.values():
+            if not event.ready():
+                event.send()
+        eventlet.sleep()
+
+    def _start(self, stack_id, tenant_id, owner_id=None, action='UPDATE',
+               status='COMPLETE'):
+        stack = mock.Mock(id=stack_id, tenant_id=tenant_id,
+                          owner_id=owner_id, action=action, status=status,
+                          adopt_stack_data=None, CREATE='CREATE',
+                          IN_PROGRESS='IN_PROGRESS', FAILED='FAILED')
+        stack.name = stack_id
+        self.stacks[stack_id] = stack
+        lock = mock.Mock()
+        self.events[stack_id] = eventlet.event.Event()
+
+        def action():
+            self.started.append(stack_id)
+            self.events[stack_id].wait()
+
+        self.thm.start_with_acquired_lock(stack, lock, action)
+        eventlet.sleep()
+        return lock
+
+    def _finish(self, stack_id):
+        self.events[stack_id].send()
+        for i in range(5):
+            eventlet.sleep()
+
+    def test_queued_when_at_capacity(self):
+        self._start('s1', 't1')
+        self._start('s2', 't1')
+        lock = self._start('s3', 't1')
+
+        self.assertEqual(['s1', 's2'], self.started)
+        self.assertEqual({'running': 2, 'queued': 1,
+                          'queued_by_tenant': {'t1': 1}},
+                         self.thm.stats())
+        # the stack is left in its current state while queued
+        self.assertFalse(self.stack_update.called)
+        stack = self.stacks['s3']
+        self.stack_event.assert_called_once_with(
+            stack.context, stack, 'UPDATE', 'COMPLETE', 'Stack action queued',
+            's3', {}, 's3', 'OS::Heat::Stack')
+        self.stack_event.return_value.store.assert_called_once_with()
+
+        self._finish('s1')
+        self.assertEqual(['s1', 's2', 's3'], self.started)
+        self.assertEqual('Queued stack action started',
+                         self.stack_event.call_args[0][4])
+        self.assertEqual(0, self.thm.queue_depth())
+        self.assertFalse(lock.release.called)
+
+        self._finish('s3')
+        lock.release.assert_called_once_with('s3')
+        self.assertEqual(1, self.thm.stats()['running'])
+
+    def test_rejected_when_queue_full(self):
+        for i in range(5):
+            self._start('s%d' % i, 't1')
+
+        stack = mock.Mock(id='s5', tenant_id='t1', owner_id=None)
+        self.assertRaises(exception.EngineOverloaded,
+                          self.thm.start_with_acquired_lock,
+                          stack, mock.Mock(), mock.Mock())
+        self.assertEqual(3, self.thm.queue_depth())
+        self.assertRaises(exception.EngineOverloaded,
+                          self.thm.check_capacity, 's5')
+
+    def test_nested_not_queued(self):
+        for i in range(5):
+            self._start('s%d' % i, 't1')
+        lock = self._start('n1', 't1', owner_id='s0')
+
+        self.assertEqual(['s0', 's1', 'n1'], self.started)
+        self.assertEqual({'running': 2, 'queued': 3,
+                          'queued_by_tenant': {'t1': 3}},
+                         self.thm.stats())
+
+        self._finish('n1')
+        lock.release.assert_called_once_with('n1')
+        self.assertEqual(['s0', 's1', 'n1'], self.started)
+        self.assertEqual(2, self.thm.stats()['running'])
+
+    def test_fair_share(self):
+        self._start('a1', 'ta')
+        self._start('a2', 'ta')
+        self._start('a3', 'ta')
+        self._start('a4', 'ta')
+        self._start('b1', 'tb')
+
+        # tenant tb has no running actions, so goes ahead of ta's queue
+        self._finish('a1')
+        self.assertEqual(['a1', 'a2', 'b1'], self.started)
+        self._finish('a2')
+        self.assertEqual(['a1', 'a2', 'b1', 'a3'], self.started)
+
+    def test_unlimited(self):
+        cfg.CONF.set_override('max_concurrent_stack_actions', 0)
+        for i in range(5):
+            self._start('s%d' % i, 't1')
+        self.assertEqual(5, len(self.started))
+        self.assertFalse(self.stack_update.called)
+
+    def test_stop_queued(self):
+        self._start('s1', 't1')
+        self._start('s2', 't1')
+        lock = self._start('s3', 't1')
+
+        self.thm.stop('s3')
+        lock.release.assert_called_once_with('s3')
+        self.assertEqual(0, self.thm.queue_depth())
+
+        self._finish('s1')
+        self.assertEqual(['s1', 's2'], self.started)
+
+    def test_stop_queued_on_shutdown(self):
+        self._start('s1', 't1')
+        self._start('s2', 't1')
+        locks = [self._start('s3', 't1'),
+                 self._start('s4', 't2', action=None, status=None),
+                 self._start('s5', 't1', action='CREATE',
+                             status='IN_PROGRESS')]
+
+        self.thm.stop_queued()
+        self.assertEqual(0, self.thm.queue_depth())
+        for stack_id, lock in zip(('s3', 's4', 's5'), locks):
+            lock.release.assert_called_once_with(stack_id)
+        reason = 'Engine stopped before the stack action started'
+        self.assertFalse(self.stacks['s3'].state_set.called)
+        self.stacks['s4'].state_set.assert_called_once_with(
+            'CREATE', 'FAILED', reason)
+        self.stacks['s5'].state_set.assert_called_once_with(
+            'CREATE', 'FAILED', reason)
+        self.assertEqual(reason, self.stack_event.call_args[0][4])
+
+        self._finish('s1')
+        self.assertEqual(['s1', 's2'], self.started)
+
+    def test_engine_stop_with_queued_actions(self):
+        self._start('s1', 't1')
+        self._start('s2', 't1')
+        lock = self._start('s3', 't1')
+        engine = service.EngineService('a-host', 'a-topic')
+        engine.thread_group_mgr = self.thm
+        engine.conn = mock.Mock()
+
+        def finish_running():
+            self.events['s1'].send()
+            self.events['s2'].send()
+
+        eventlet.spawn(finish_running)
+        engine.stop()
+
+        self.assertEqual(['s1', 's2'], self.started)
+        lock.release.assert_called_once_with('s3')
+        self.assertEqual({'running': 0, 'queued': 0, 'queued_by_tenant': {}},
+                         self.thm.stats())
+
+    def test_engine_listener_queue_stats(self):
+        listener = service.EngineListener('a-host', 'engine-id', self.thm)
+        self.assertEqual({'running': 0, 'queued': 0, 'queued_by_tenant': {}},
+                         listener.queue_stats(None))
+
+    def test_engine_listener_client_call_stats(self):
+        listener = service.EngineListener('a-host', 'engine-id', self.thm)
+        stats = self.patchobject(client_limiter, 'stats')
+        self.assertEqual(stats.return_value,
+                         listener.client_call_stats(None))
+
+    def test_engine_listener_db_stats(self):
+        listener = service.EngineListener('a-host', 'engine-id', self.thm)
+        stats = self.patchobject(db_api, 'db_stats')
+        self.assertEqual(stats.return_value, listener.db_stats(None))
+
+    def test_action_statements_tracked(self):
+        track = self.patchobject(db_api, 'track_statements')
+        self._start('s1', 't1')
+        track.assert_called_once_with('stack action action')
+
+
 class ThreadGroupManagerStopTest(HeatTestCase):
     def test_tgm_stop(self):
         stack_id = 'test'
@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import os.path
 import sys
 
@@ -20,8 +21,10 @@ from oslo.config import cfg
 import six
 
 from heat.common import environment_format
+from heat.common import exception
 from heat.engine import environment
 from heat.engine import resources
+from heat.engine.resources import server
 from heat.tests import common
 from heat.tests import generic_resource
 
@@ -104,6 +107,47 @@ class EnvironmentTest(common.HeatTestCase):
                          env.get_resource_info('OS::Networking::FloatingIP',
                                                'my_fip').value)
 
+    def test_glob_prefixes(self):
+        registry = environment.ResourceRegistry(None)
+        registry.load({'OS::*': 'CloudX::*',
+                       'OS::Nova::*': 'CloudY::*',
+                       'OS::Neutron::*': 'CloudZ::*'})
+        matches = registry.iterable_by('OS::Nova::Server')
+        self.assertEqual(['CloudX::*', 'CloudY::*'],
+                         sorted(info.value for info in matches))
+
+    def test_lookups_cached(self):
+        g_registry = environment.ResourceRegistry(None)
+        g_registry.register_class('CloudX::Nova::Server',
+                                  generic_resource.GenericResource)
+        registry = environment.ResourceRegistry(g_registry)
+        registry.load({'OS::*': 'CloudX::*'})
+        iterable_by = self.patchobject(registry, 'iterable_by')
+        iterable_by.side_effect = environment.ResourceRegistry.iterable_by.\
+            __get__(registry)
+
+        for name in ('server1', 'server2'):
+            self.assertEqual(generic_resource.GenericResource,
+                             registry.get_class('OS::Nova::Server', name))
+        self.assertEqual(2, iterable_by.call_count)
+
+        registry.register_class('CloudX::Nova::Server',
+                                generic_resource.ResourceWithProps)
+        self.assertEqual(generic_resource.ResourceWithProps,
+                         registry.get_class('OS::Nova::Server', 'server1'))
+        self.assertEqual(4, iterable_by.call_count)
+
+    def test_global_changes_invalidate_lookups(self):
+        g_registry = environment.ResourceRegistry(None)
+        registry = environment.ResourceRegistry(g_registry)
+        registry.load({'OS::Nova::Server': 'CloudX::Nova::Server'})
+        self.assertIsNone(registry.get_resource_info('OS::Nova::Server'))
+
+        g_registry.register_class('CloudX::Nova::Server',
+                                  generic_resource.GenericResource)
+        self.assertEqual(generic_resource.GenericResource,
+                         registry.get_class('OS::Nova::Server'))
+
     def test_constraints(self):
         env = environment.Environment({})
 
@@ -203,6 +247,80 @@ class EnvironmentDuplicateTest(common.HeatTestCase):
                                                       'my_fip'))
 
 
+class PluginManifestTest(common.HeatTestCase):
+
+    def _use_manifest(self, manifest):
+        manifest_dir = self.useFixture(fixtures.TempDir())
+        path = os.path.join(manifest_dir.path, 'manifest.json')
+        with open(path, 'w') as manifest_fd:
+            json.dump(manifest, manifest_fd)
+        cfg.CONF.set_override('plugin_manifest', path)
+
+    def test_generate_manifest(self):
+        manifest = resources.generate_manifest()
+        self.assertEqual('heat.engine.resources.server',
+                         manifest['resources']['OS::Nova::Server'])
+        self.assertEqual('heat.engine.resources.server:FlavorConstraint',
+                         manifest['constraints']['nova.flavor'])
+
+    def test_lazy_loading(self):
+        self._use_manifest({
+            'resources': {'OS::Nova::Server': 'heat.engine.resources.server'},
+            'constraints': {
+                'nova.flavor': 'heat.engine.resources.server:FlavorConstraint'
+            }})
+        import_module = self.patchobject(resources.importlib,
+                                         'import_module')
+        import_module.return_value = server
+
+        env = environment.Environment({}, user_env=False)
+        resources._load_global_resources(env)
+        self.assertEqual(['OS::Nova::Server'], env.get_types())
+        self.assertFalse(import_module.called)
+
+        self.assertEqual(server.Server, env.get_class('OS::Nova::Server'))
+        self.assertEqual(server.FlavorConstraint,
+                         env.get_constraint('nova.flavor'))
+        self.assertIsNone(env.get_constraint('nova.keypair'))
+        import_module.assert_called_with('heat.engine.resources.server')
+        self.assertEqual(2, import_module.call_count)
+
+        env.get_class('OS::Nova::Server')
+        env.get_constraint('nova.flavor')
+        self.assertEqual(2, import_module.call_count)
+
+    def test_lazy_constraint_import_error(self):
+        env = environment.Environment({}, user_env=False)
+        load = mock.Mock(side_effect=[ImportError('broken'),
+                                      server.FlavorConstraint])
+        env.register_lazy_constraint('nova.flavor', load)
+
+        self.assertRaises(ImportError, env.get_constraint, 'nova.flavor')
+        self.assertEqual(server.FlavorConstraint,
+                         env.get_constraint('nova.flavor'))
+        self.assertEqual(server.FlavorConstraint,
+                         env.get_constraint('nova.flavor'))
+        self.assertEqual(2, load.call_count)
+
+    def test_out_of_date_manifest(self):
+        self._use_manifest({
+            'resources': {'OS::Nova::Gone': 'heat.engine.resources.server'}})
+
+        env = environment.Environment({}, user_env=False)
+        resources._load_global_resources(env)
+        self.assertRaises(exception.StackValidationFailed,
+                          env.get_class, 'OS::Nova::Gone')
+
+    def test_unreadable_manifest(self):
+        cfg.CONF.set_override('plugin_manifest', '/nonexistent/manifest')
+
+        env = environment.Environment({}, user_env=False)
+        resources._load_global_resources(env)
+        info = env.get_resource_info('OS::Nova::Server')
+        self.assertNotIsInstance(info, environment.LazyClassResourceInfo)
+        self.assertEqual(server.Server, info.get_class())
+
+
 class GlobalEnvLoadingTest(common.HeatTestCase):
 
     def test_happy_path(self):
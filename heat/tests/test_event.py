@@ -11,9 +11,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
 from oslo.config import cfg
 
 from heat.db import api as db_api
+from heat.db.sqlalchemy import models
 from heat.engine import event
 from heat.engine import parser
 from heat.engine import resource
@@ -102,6 +104,22 @@ class EventTest(HeatTestCase):
         self.assertIsNotNone(loaded_e.timestamp)
         self.assertEqual({'Foo': 'goo'}, loaded_e.resource_properties)
 
+    def test_load_properties_on_demand(self):
+        e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
+                        'wibble', self.resource.properties,
+                        self.resource.name, self.resource.type())
+        e.store()
+
+        with mock.patch.object(models.Event, 'resource_properties',
+                               new_callable=mock.PropertyMock) as props:
+            props.return_value = {'Foo': 'goo'}
+            loaded_e = event.Event.load(self.ctx, e.id, stack=self.stack)
+            self.assertFalse(props.called)
+
+            self.assertEqual({'Foo': 'goo'}, loaded_e.resource_properties)
+            self.assertEqual({'Foo': 'goo'}, loaded_e.resource_properties)
+            self.assertEqual(1, props.call_count)
+
     def test_store_caps_events(self):
         cfg.CONF.set_override('event_purge_batch_size', 1)
         cfg.CONF.set_override('max_events_per_stack', 1)
@@ -52,6 +52,12 @@ class FaultMiddlewareTest(HeatTestCase):
                     'title': 'Internal Server Error'}
         self.assertEqual(expected, msg)
 
+    def test_engine_overloaded(self):
+        wrapper = fault.FaultWrapper(None)
+        msg = wrapper._error(heat_exc.EngineOverloaded())
+        self.assertEqual(503, msg['code'])
+        self.assertEqual('EngineOverloaded', msg['error']['type'])
+
     def test_exception_with_non_ascii_chars(self):
         # We set debug to true to test the code path for serializing traces too
         cfg.CONF.set_override('debug', True)
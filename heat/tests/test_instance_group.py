@@ -13,7 +13,9 @@
 
 import copy
 
+import mock
 import mox
+from oslo.config import cfg
 
 from heat.common import exception
 from heat.common import template_format
@@ -217,6 +219,31 @@ class InstanceGroupTest(HeatTestCase):
         rsrc.delete()
         self.m.VerifyAll()
 
+    def test_resize_in_batches(self):
+        cfg.CONF.set_override('group_scale_batch_size', 2)
+        t = template_format.parse(ig_template)
+        stack = utils.parse_stack(t)
+        rsrc = stack['JobServerGroup']
+
+        self.patchobject(rsrc, 'get_instances').return_value = [object()]
+        create_template = self.patchobject(rsrc, '_create_template')
+        create_template.side_effect = lambda capacity: 'tmpl%d' % capacity
+        update = self.patchobject(rsrc, 'update_with_template')
+        self.patchobject(rsrc, 'check_update_complete')
+        lb_reload = self.patchobject(rsrc, '_lb_reload')
+        add_event = self.patchobject(rsrc, '_add_event')
+
+        rsrc.resize(6)
+        self.assertEqual([mock.call(3), mock.call(5), mock.call(6)],
+                         create_template.call_args_list)
+        self.assertEqual(['tmpl3', 'tmpl5', 'tmpl6'],
+                         [c[0][0] for c in update.call_args_list])
+        self.assertEqual(3, update.return_value.run_to_completion.call_count)
+        self.assertEqual(2, add_event.call_count)
+        add_event.assert_called_with(rsrc.INIT, rsrc.COMPLETE,
+                                     'Resized to 5 of 6 instances')
+        lb_reload.assert_called_once_with()
+
     def test_create_error(self):
         """
         If a resource in an instance group fails to be created, the instance
@@ -206,6 +206,39 @@ class LoadBalancerTest(HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_update_members_looks_up_new_instances_only(self):
+        t = template_format.parse(lb_template)
+        s = utils.parse_stack(t)
+        s.store()
+        resource_defns = s.t.resource_definitions(s)
+        rsrc = lb.LoadBalancer('LoadBalancer',
+                               resource_defns['LoadBalancer'], s)
+        rsrc._store()
+        self.patchobject(rsrc, 'nova')
+        md = {'AWS::CloudFormation::Init': {'config': {'files': {
+            '/etc/haproxy/haproxy.cfg': {'content': ''}}}}}
+        lb_instance = mock.Mock()
+        lb_instance.metadata_get.return_value = md
+        self.patchobject(rsrc, 'nested').return_value = {
+            'LB_instance': lb_instance}
+        to_ip = self.patchobject(lb.nova_utils, 'server_to_ipaddress')
+        to_ip.side_effect = ['1.2.3.4', '5.6.7.8', '9.9.9.9']
+
+        rsrc.update_members(['WikiServerOne', 'two'], [])
+        self.assertEqual(2, to_ip.call_count)
+        rsrc.properties.data['Instances'] = ['WikiServerOne', 'two']
+
+        rsrc.update_members(['three'], ['two'])
+        self.assertEqual(3, to_ip.call_count)
+        to_ip.assert_called_with(rsrc.nova(), 'three')
+        ha_cfg = md['AWS::CloudFormation::Init']['config']['files'][
+            '/etc/haproxy/haproxy.cfg']['content']
+        self.assertRegexpMatches(ha_cfg, 'server server1 1\.2\.3\.4:80')
+        self.assertRegexpMatches(ha_cfg, 'server server2 9\.9\.9\.9:80')
+        self.assertNotIn('5.6.7.8', ha_cfg)
+        self.assertEqual({'WikiServerOne': '1.2.3.4', 'three': '9.9.9.9'},
+                         rsrc.data())
+
     def test_loadbalancer_nokey(self):
         self._mock_get_image_id_success(u'F20-x86_64-cfntools', 746)
         self._create_stubs(key_name=None, stub_meta=False)
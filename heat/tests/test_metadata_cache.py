@@ -0,0 +1,77 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo.config import cfg
+
+from heat.engine import metadata_cache
+from heat.tests.common import HeatTestCase
+
+
+class MetadataCacheTest(HeatTestCase):
+    def setUp(self):
+        super(MetadataCacheTest, self).setUp()
+        cfg.CONF.set_override('metadata_cache_ttl', 10)
+        cfg.CONF.set_override('metadata_cache_size', 2)
+        self.wallclock = self.patchobject(metadata_cache, 'wallclock')
+        self.wallclock.return_value = 1000.0
+        self.addCleanup(metadata_cache.clear)
+
+    def test_etag_ignores_key_order(self):
+        self.assertEqual(metadata_cache.etag({'a': 1, 'b': 2}),
+                         metadata_cache.etag({'b': 2, 'a': 1}))
+        self.assertNotEqual(metadata_cache.etag({'a': 1}),
+                            metadata_cache.etag({'a': 2}))
+
+    def test_set_get(self):
+        self.assertIsNone(metadata_cache.get_metadata('s1', 'r1'))
+        entry = metadata_cache.set_metadata('s1', 'r1', {'a': 1})
+        self.assertEqual(({'a': 1}, metadata_cache.etag({'a': 1})), entry)
+        self.assertEqual(entry, metadata_cache.get_metadata('s1', 'r1'))
+        self.assertIsNone(metadata_cache.get_metadata('s1', 'r2'))
+
+    def test_expiry(self):
+        metadata_cache.set_metadata('s1', 'r1', {'a': 1})
+        self.wallclock.return_value = 1009.0
+        self.assertIsNotNone(metadata_cache.get_metadata('s1', 'r1'))
+        self.wallclock.return_value = 1010.0
+        self.assertIsNone(metadata_cache.get_metadata('s1', 'r1'))
+
+    def test_invalidate(self):
+        metadata_cache.set_metadata('s1', 'r1', {'a': 1})
+        metadata_cache.invalidate('s1', 'r1')
+        self.assertIsNone(metadata_cache.get_metadata('s1', 'r1'))
+        # invalidating an uncached resource is harmless
+        metadata_cache.invalidate('s1', 'r1')
+
+    def test_size_bound(self):
+        metadata_cache.set_metadata('s1', 'r1', {})
+        metadata_cache.set_metadata('s1', 'r2', {})
+        metadata_cache.set_metadata('s1', 'r3', {})
+        self.assertIsNone(metadata_cache.get_metadata('s1', 'r1'))
+        self.assertIsNotNone(metadata_cache.get_metadata('s1', 'r2'))
+        self.assertIsNotNone(metadata_cache.get_metadata('s1', 'r3'))
+
+    def test_disabled(self):
+        cfg.CONF.set_override('metadata_cache_ttl', 0)
+        entry = metadata_cache.set_metadata('s1', 'r1', {'a': 1})
+        self.assertEqual({'a': 1}, entry[0])
+        self.assertIsNone(metadata_cache.get_metadata('s1', 'r1'))
+
+    def test_access_allowed(self):
+        creds = ('user', 'access')
+        self.assertIsNone(
+            metadata_cache.get_access_allowed('s1', creds, 'r1'))
+        metadata_cache.set_access_allowed('s1', creds, 'r1', False)
+        self.assertFalse(metadata_cache.get_access_allowed('s1', creds, 'r1'))
+        self.assertIsNone(
+            metadata_cache.get_access_allowed('s1', creds, 'r2'))
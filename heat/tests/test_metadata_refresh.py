@@ -18,9 +18,11 @@ from oslo.config import cfg
 
 from heat.common import identifier
 from heat.common import template_format
+from heat.db import api as db_api
 from heat.engine.clients.os import glance
 from heat.engine import environment
 from heat.engine import parser
+from heat.engine import resource
 from heat.engine.resources import instance
 from heat.engine.resources import nova_keypair
 from heat.engine.resources import server
@@ -28,6 +30,7 @@ from heat.engine.resources import wait_condition as wc
 from heat.engine import scheduler
 from heat.engine import service
 from heat.tests.common import HeatTestCase
+from heat.tests import generic_resource as generic_rsrc
 from heat.tests import utils
 
 
@@ -306,6 +309,62 @@ class WaitCondMetadataUpdateTest(HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_refresh_dependent_metadata(self):
+        temp = template_format.parse(test_template_waitcondition)
+        template = parser.Template(temp)
+        self.stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                                  template)
+        self.stack.store()
+        for res in self.stack.dependencies:
+            res._store()
+
+        handle = self.stack['WH']
+        handle.metadata_set({'123': {'Data': 'foo', 'Reason': 'bar',
+                                     'Status': 'SUCCESS'}})
+
+        self.m.StubOutWithMock(instance.Instance, 'metadata_update')
+        self.m.StubOutWithMock(db_api, 'resource_metadata_set_all')
+        # Only S2 refers to the handle (through WC) in its metadata
+        instance.Instance.metadata_update().WithSideEffects(
+            lambda: self.stack['S2'].metadata_set({'test': 'foo'}))
+        db_api.resource_metadata_set_all(
+            self.stack.context, {self.stack['S2'].id: {'test': 'foo'}})
+        self.m.ReplayAll()
+
+        self.stack.refresh_dependent_metadata([handle])
+        self.assertEqual({'test': 'foo'}, self.stack['S2'].metadata_get())
+        self.m.VerifyAll()
+
+    def test_refresh_dependent_metadata_acted_on(self):
+        resource._register_class('GenericResourceType',
+                                 generic_rsrc.GenericResource)
+        template = parser.Template({
+            'HeatTemplateFormatVersion': '2012-12-12',
+            'Resources': {
+                'Group': {'Type': 'GenericResourceType'},
+                # stands in for a scaling policy, which adjusts the group
+                # it depends on when signalled
+                'Policy': {'Type': 'GenericResourceType',
+                           'DependsOn': 'Group'},
+                'Server': {'Type': 'GenericResourceType',
+                           'Metadata': {'group': {'Ref': 'Group'}}},
+                'Unrelated': {'Type': 'GenericResourceType'},
+                'Other': {'Type': 'GenericResourceType',
+                          'Metadata': {'other': {'Ref': 'Unrelated'}}}}})
+        self.stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                                  template)
+        self.stack.store()
+        for res in self.stack.dependencies:
+            res._store()
+
+        with mock.patch.object(generic_rsrc.GenericResource,
+                               'metadata_update',
+                               autospec=True) as metadata_update:
+            self.stack.refresh_dependent_metadata([self.stack['Policy']])
+
+        self.assertEqual([self.stack['Server']],
+                         [c[0][0] for c in metadata_update.call_args_list])
+
 
 class MetadataRefreshTestServer(HeatTestCase):
     '''
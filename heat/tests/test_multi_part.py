@@ -15,6 +15,7 @@ import email
 
 import heatclient.exc as exc
 import mock
+from oslo.config import cfg
 
 from heat.engine import parser
 from heat.engine.resources.software_config import multi_part as mp
@@ -27,6 +28,7 @@ class MultipartMimeTest(HeatTestCase):
 
     def setUp(self):
         super(MultipartMimeTest, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', False)
         self.ctx = utils.dummy_context()
         self.init_config()
 
@@ -1004,6 +1004,23 @@ class LoadBalancerTest(HeatTestCase):
         self.assertEqual((rsrc.UPDATE, rsrc.COMPLETE), rsrc.state)
         self.m.VerifyAll()
 
+    def test_update_members(self):
+        rsrc = self.create_load_balancer()
+        neutronclient.Client.create_member({
+            'member': {
+                'pool_id': 'pool123', 'protocol_port': 8080,
+                'address': '4.5.6.7'}}
+        ).AndReturn({'member': {'id': 'memberxyz'}})
+
+        self.m.ReplayAll()
+        scheduler.TaskRunner(rsrc.create)()
+
+        # the existing member is neither deleted nor recreated
+        rsrc.update_members(['1234', '5678'], [])
+        self.assertEqual({'1234': 'member5678', '5678': 'memberxyz'},
+                         rsrc.data())
+        self.m.VerifyAll()
+
     def test_delete(self):
         rsrc = self.create_load_balancer()
         neutronclient.Client.delete_member(u'member5678')
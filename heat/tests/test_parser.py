@@ -654,6 +654,50 @@ Mappings:
 
         self.assertEqual(cfn_tpl['Resources'], empty.t['Resources'])
 
+    def test_snapshot(self):
+        cfn_tpl = template_format.parse('''
+        AWSTemplateFormatVersion: 2010-09-09
+        Resources:
+          resource1:
+            Type: AWS::EC2::Instance
+          resource2:
+            Type: AWS::EC2::Instance
+        ''')
+        tmpl = parser.Template(cfn_tpl)
+        stack = parser.Stack(self.ctx, 'test_stack', tmpl)
+        defn = tmpl.resource_definitions(stack)['resource1']
+
+        snap = tmpl.snapshot()
+        self.assertIs(tmpl.t['Resources']['resource1'],
+                      snap.t['Resources']['resource1'])
+
+        tmpl.remove_resource('resource2')
+        tmpl.add_resource(defn, 'resource3')
+        self.assertEqual(['resource1', 'resource3'],
+                         sorted(tmpl.t['Resources']))
+        self.assertEqual(['resource1', 'resource2'],
+                         sorted(snap.t['Resources']))
+        self.assertIs(tmpl.t['Resources']['resource1'],
+                      snap.t['Resources']['resource1'])
+
+        snap.remove_resource('resource1')
+        self.assertEqual(['resource2'], sorted(snap.t['Resources']))
+        self.assertEqual(['resource1', 'resource3'],
+                         sorted(tmpl.t['Resources']))
+
+    def test_load_files_on_demand(self):
+        tmpl = parser.Template(copy.deepcopy(resource_template),
+                               files={'foo.yaml': 'foo'})
+        tmpl.store(self.ctx)
+
+        loaded = parser.Template.load(self.ctx, tmpl.id)
+        self.assertIsNotNone(loaded._load_files)
+        self.assertEqual({'foo.yaml': 'foo'}, loaded.files)
+        self.assertIsNone(loaded._load_files)
+
+        loaded.files = {'bar.yaml': 'bar'}
+        self.assertEqual({'bar.yaml': 'bar'}, loaded.files)
+
 
 class TemplateFnErrorTest(HeatTestCase):
     scenarios = [
@@ -3037,6 +3081,35 @@ class StackTest(HeatTestCase):
         db_stack = db_api.stack_get(self.ctx, stack_ownee.id)
         self.assertEqual(self.stack.id, db_stack.owner_id)
 
+    def test_store_bulk_creates_resources(self):
+        cfg.CONF.set_override('bulk_create_resources', True)
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {'A': {'Type': 'GenericResourceType'},
+                              'B': {'Type': 'GenericResourceType'}}}
+        self.stack = parser.Stack(self.ctx, 'bulk_stack',
+                                  template.Template(tmpl))
+        self.m.StubOutWithMock(db_api, 'resource_create')
+        self.m.ReplayAll()
+
+        self.stack.store()
+        db_resources = db_api.resource_get_all_by_stack(self.ctx,
+                                                        self.stack.id)
+        self.assertEqual(['A', 'B'], sorted(db_resources))
+        for name, db_res in db_resources.items():
+            self.assertEqual(db_res.id, self.stack[name].id)
+            self.assertEqual((resource.Resource.INIT,
+                              resource.Resource.COMPLETE),
+                             (db_res.action, db_res.status))
+
+        # the rows are updated rather than created as the resources change
+        self.stack.create()
+        self.assertEqual((parser.Stack.CREATE, parser.Stack.COMPLETE),
+                         self.stack.state)
+        db_res = db_api.resource_get(self.ctx, self.stack['A'].id)
+        self.assertEqual((resource.Resource.CREATE,
+                          resource.Resource.COMPLETE),
+                         (db_res.action, db_res.status))
+
     def test_init_user_creds_id(self):
         ctx_init = utils.dummy_context(user='my_user',
                                        password='my_pass')
@@ -21,6 +21,7 @@ import six
 from heat.common import exception
 from heat.db import api as db_api
 from heat.engine import attributes
+from heat.engine import client_limiter
 from heat.engine.cfn import functions as cfn_funcs
 from heat.engine import dependencies
 from heat.engine import environment
@@ -431,6 +432,23 @@ class ResourceTest(HeatTestCase):
         scheduler.TaskRunner(res.create)()
         self.assertEqual((res.CREATE, res.COMPLETE), res.state)
 
+    def test_create_client_calls_limited(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo',
+                                            {'Foo': 'abc'})
+        res = generic_rsrc.ResourceWithProps('test_resource', tmpl, self.stack)
+        res.default_client_name = 'nova'
+        limit = self.patchobject(client_limiter, 'limit')
+        self.patchobject(res, 'handle_create').return_value = 'data'
+        check = mock.Mock(side_effect=[False, True])
+        res.check_create_complete = check
+
+        scheduler.TaskRunner(res.create)()
+        self.assertEqual((res.CREATE, res.COMPLETE), res.state)
+        self.assertEqual([mock.call('nova')] * 3, limit.call_args_list)
+        self.assertEqual(3, limit.return_value.__enter__.call_count)
+        self.assertEqual(3, limit.return_value.__exit__.call_count)
+        check.assert_called_with('data')
+
     def test_create_fail_missing_req_prop(self):
         rname = 'test_resource'
         tmpl = rsrc_defn.ResourceDefinition(rname, 'Foo', {})
@@ -13,6 +13,7 @@
 
 import copy
 import mock
+from oslo.config import cfg
 import six
 
 from heat.common import exception
@@ -178,6 +179,40 @@ class ResourceGroupTest(common.HeatTestCase):
         self.assertEqual((resg.UPDATE, resg.COMPLETE), resg.nested().state)
         self.assertEqual(3, len(resg.nested()))
 
+    def test_create_shares_member_definition(self):
+        validate = self.patchobject(ResourceWithPropsAndId, 'validate')
+        validate.return_value = None
+        resg = self._create_dummy_stack()
+        member0, member1 = resg.nested()['0'], resg.nested()['1']
+        self.assertEqual('1', member1.t.name)
+        self.assertIs(member0.t._properties, member1.t._properties)
+        # the identical members are validated only once
+        self.assertEqual(1, validate.call_count)
+
+    def test_update_in_batches(self):
+        cfg.CONF.set_override('group_scale_batch_size', 2)
+        resg = self._create_dummy_stack()
+        add_event = self.patchobject(resg, '_add_event')
+        new_snip = copy.deepcopy(resg.t)
+        new_snip['Properties']['count'] = 5
+        scheduler.TaskRunner(resg.update, new_snip)()
+        self.assertEqual((resg.UPDATE, resg.COMPLETE), resg.state)
+        self.assertEqual((resg.UPDATE, resg.COMPLETE), resg.nested().state)
+        self.assertEqual(5, len(resg.nested()))
+        self.assertIn(mock.call(resg.UPDATE, resg.IN_PROGRESS,
+                                'Resized to 4 of 5 resources'),
+                      add_event.call_args_list)
+
+        add_event.reset_mock()
+        new_snip = copy.deepcopy(resg.t)
+        new_snip['Properties']['count'] = 1
+        scheduler.TaskRunner(resg.update, new_snip)()
+        self.assertEqual((resg.UPDATE, resg.COMPLETE), resg.state)
+        self.assertEqual(1, len(resg.nested()))
+        progress = [c[0][2] for c in add_event.call_args_list
+                    if c[0][2].startswith('Resized')]
+        self.assertEqual(['Resized to 3 of 1 resources'], progress)
+
     def test_aggregate_attribs(self):
         """
         Test attribute aggregation and that we mimic the nested resource's
@@ -155,7 +155,8 @@ class EngineRpcAPITestCase(testtools.TestCase):
                   'marker': None,
                   'sort_keys': None,
                   'sort_dir': None,
-                  'filters': None}
+                  'filters': None,
+                  'detail': True}
         self._test_engine_api('list_events', 'call', **kwargs)
 
     def test_describe_stack_resource(self):
@@ -163,6 +164,22 @@ class EngineRpcAPITestCase(testtools.TestCase):
                               stack_identity=self.identity,
                               resource_name='LogicalResourceId')
 
+    def test_describe_stack_resource_metadata(self):
+        self._test_engine_api('describe_stack_resource_metadata', 'call',
+                              stack_identity=self.identity,
+                              resource_name='LogicalResourceId',
+                              etag='abc123')
+
+    def test_nested_stack_action(self):
+        self._test_engine_api('nested_stack_action', 'cast',
+                              stack_identity=self.identity,
+                              action='UPDATE',
+                              parent_resource_name='LogicalResourceId',
+                              template={u'Foo': u'bar'},
+                              params={u'InstanceType': u'm1.xlarge'},
+                              files={},
+                              timeout_mins=30)
+
     def test_find_physical_resource(self):
         self._test_engine_api('find_physical_resource', 'call',
                               physical_resource_id=u'404d-a85b-5315293e67de')
@@ -268,3 +285,24 @@ class EngineRpcAPITestCase(testtools.TestCase):
         deployment_id = '86729f02-4648-44d8-af44-d0ec65b6abc9'
         self._test_engine_api('delete_software_deployment', 'call',
                               deployment_id=deployment_id)
+
+    def test_queue_stats(self):
+        rpcapi = rpc_client.EngineClient()
+        with mock.patch.object(rpcapi._client, 'prepare') as prepare:
+            prepare.return_value.call.return_value = 'foo'
+            self.assertEqual('foo', rpcapi.queue_stats(self.context,
+                                                       'engine-id',
+                                                       timeout=2))
+        prepare.assert_called_once_with(topic='engine-id', timeout=2)
+        prepare.return_value.call.assert_called_once_with(self.context,
+                                                          'queue_stats')
+
+    def test_db_stats(self):
+        rpcapi = rpc_client.EngineClient()
+        with mock.patch.object(rpcapi._client, 'prepare') as prepare:
+            prepare.return_value.call.return_value = 'foo'
+            self.assertEqual('foo', rpcapi.db_stats(self.context,
+                                                    'engine-id'))
+        prepare.assert_called_once_with(topic='engine-id')
+        prepare.return_value.call.assert_called_once_with(self.context,
+                                                          'db_stats')
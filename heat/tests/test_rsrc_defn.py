@@ -139,6 +139,15 @@ class ResourceDefinitionTest(HeatTestCase):
         self.assertEqual(rd1, rd2)
         self.assertEqual(hash(rd1), hash(rd2))
 
+    def test_renamed(self):
+        rd = self.make_me_one_with_everything()
+        renamed = rd.renamed('other')
+        self.assertEqual('other', renamed.name)
+        self.assertEqual('rsrc', rd.name)
+        self.assertEqual(rd, renamed)
+        self.assertEqual(hash(rd), hash(renamed))
+        self.assertIs(rd._properties, renamed._properties)
+
     def test_hash_types(self):
         rd1 = rsrc_defn.ResourceDefinition('rsrc', 'SomeType1')
         rd2 = rsrc_defn.ResourceDefinition('rsrc', 'SomeType2')
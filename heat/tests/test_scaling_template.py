@@ -98,3 +98,19 @@ class ResourceTemplatesTest(HeatTestCase):
             ('old-id-0', {'type': 'Bar'}),
             ('old-id-1', {'type': 'Bar'})]
         self.assertEqual(second_batch_expected, list(templates))
+
+
+class BatchCapacitiesTest(HeatTestCase):
+    def test_unbatched(self):
+        self.assertEqual([10], template.batch_capacities(0, 10, 0))
+        self.assertEqual([0], template.batch_capacities(10, 0, -1))
+
+    def test_single_batch(self):
+        self.assertEqual([3], template.batch_capacities(1, 3, 2))
+        self.assertEqual([1], template.batch_capacities(3, 1, 2))
+
+    def test_grow(self):
+        self.assertEqual([3, 5, 6], template.batch_capacities(1, 6, 2))
+
+    def test_shrink(self):
+        self.assertEqual([4, 2, 0], template.batch_capacities(6, 0, 2))
@@ -0,0 +1,157 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo.config import cfg
+
+from heat.common import messaging as rpc_messaging
+from heat.db import api as db_api
+from heat.engine import parser
+from heat.engine import signal_waiter
+from heat.tests.common import HeatTestCase
+from heat.tests import utils
+
+
+class SignalWaiterTest(HeatTestCase):
+    def setUp(self):
+        super(SignalWaiterTest, self).setUp()
+        cfg.CONF.set_override('signal_wait_recheck_interval', 30)
+        self.context = utils.dummy_context()
+        self.stack_id = 'aae01f2d-52ae-47ac-8a0d-3fde3d220fea'
+        self.wallclock = self.patchobject(signal_waiter, 'wallclock')
+        self.wallclock.return_value = 1000.0
+
+    def _register(self, key):
+        waiter = signal_waiter.register(key)
+        self.addCleanup(signal_waiter.unregister, waiter)
+        return waiter
+
+    def test_ready_first_check(self):
+        waiter = self._register('key1')
+        self.assertTrue(waiter.ready())
+        self.assertFalse(waiter.ready())
+
+    def test_ready_after_notify(self):
+        waiter = self._register('key1')
+        other = self._register('key2')
+        waiter.ready()
+        other.ready()
+
+        self.assertTrue(signal_waiter.notify_local('key1'))
+        self.assertTrue(waiter.ready())
+        self.assertFalse(waiter.ready())
+        self.assertFalse(other.ready())
+
+    def test_ready_after_recheck_interval(self):
+        waiter = self._register('key1')
+        waiter.ready()
+        self.wallclock.return_value = 1029.0
+        self.assertFalse(waiter.ready())
+        self.wallclock.return_value = 1030.0
+        self.assertTrue(waiter.ready())
+        self.assertFalse(waiter.ready())
+
+    def test_ready_recheck_disabled(self):
+        cfg.CONF.set_override('signal_wait_recheck_interval', 0)
+        waiter = self._register('key1')
+        self.assertTrue(waiter.ready())
+        self.assertTrue(waiter.ready())
+
+    def test_unregister(self):
+        waiter = signal_waiter.register('key1')
+        signal_waiter.unregister(waiter)
+        self.assertNotIn('key1', signal_waiter._waiters)
+        self.assertFalse(signal_waiter.notify_local('key1'))
+        # unregistering twice is harmless
+        signal_waiter.unregister(waiter)
+
+    def test_notify_local_waiter(self):
+        waiter = self._register('key1')
+        waiter.ready()
+        lock_get = self.patchobject(db_api, 'stack_lock_get_engine_id')
+
+        signal_waiter.notify(self.context, self.stack_id, 'key1')
+        self.assertTrue(waiter.ready())
+        self.assertFalse(lock_get.called)
+
+    def test_notify_not_locked(self):
+        lock_get = self.patchobject(db_api, 'stack_lock_get_engine_id')
+        lock_get.return_value = None
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+
+        signal_waiter.notify(self.context, self.stack_id, 'key1')
+        lock_get.assert_called_once_with(self.stack_id)
+        self.assertFalse(get_client.called)
+
+    def test_notify_forwards_to_lock_engine(self):
+        lock_get = self.patchobject(db_api, 'stack_lock_get_engine_id')
+        lock_get.return_value = 'engine-2'
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+
+        signal_waiter.notify(self.context, self.stack_id, 'key1')
+        get_client.assert_called_once_with(version='1.0', topic='engine-2')
+        get_client.return_value.cast.assert_called_once_with(
+            self.context, 'notify_signal_waiters', key='key1')
+
+    def test_notify_forwards_to_root_stack_lock_engine(self):
+        # The waiter is on another engine, running an action on the root
+        # stack, and only the root stack is locked
+        template = parser.Template({'HeatTemplateFormatVersion':
+                                    '2012-12-12'})
+        root = parser.Stack(self.context, 'root', template)
+        root.store()
+        middle = parser.Stack(self.context, 'middle', template,
+                              owner_id=root.id)
+        middle.store()
+        nested = parser.Stack(self.context, 'nested', template,
+                              owner_id=middle.id)
+        nested.store()
+        db_api.stack_lock_create(root.id, 'engine-2')
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+
+        signal_waiter.notify(self.context, nested.id, 'key1')
+        get_client.assert_called_once_with(version='1.0', topic='engine-2')
+        get_client.return_value.cast.assert_called_once_with(
+            self.context, 'notify_signal_waiters', key='key1')
+
+    def test_notify_forwards_to_nested_stack_lock_engine(self):
+        template = parser.Template({'HeatTemplateFormatVersion':
+                                    '2012-12-12'})
+        root = parser.Stack(self.context, 'root', template)
+        root.store()
+        nested = parser.Stack(self.context, 'nested', template,
+                              owner_id=root.id)
+        nested.store()
+        # an action on the nested stack was dispatched to another engine
+        db_api.stack_lock_create(root.id, 'engine-2')
+        db_api.stack_lock_create(nested.id, 'engine-3')
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+
+        signal_waiter.notify(self.context, nested.id, 'key1')
+        get_client.assert_called_once_with(version='1.0', topic='engine-3')
+
+    def test_notify_no_stack(self):
+        lock_get = self.patchobject(db_api, 'stack_lock_get_engine_id')
+        signal_waiter.notify(self.context, None, 'key1')
+        self.assertFalse(lock_get.called)
+
+    def test_waiters_not_leaked(self):
+        waiter = signal_waiter.register('key1')
+        del waiter
+        self.assertFalse(signal_waiter.notify_local('key1'))
+        signal_waiter._waiters.pop('key1', None)
+
+    def test_stack_lock_get_engine_id(self):
+        self.assertIsNone(db_api.stack_lock_get_engine_id(self.stack_id))
+        db_api.stack_lock_create(self.stack_id, 'engine-1')
+        self.assertEqual('engine-1',
+                         db_api.stack_lock_get_engine_id(self.stack_id))
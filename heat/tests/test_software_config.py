@@ -10,12 +10,14 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+from oslo.config import cfg
 
 from heatclient.exc import HTTPNotFound
 import mock
 import six
 
 from heat.common import exception
+from heat.db import api as db_api
 from heat.engine import parser
 from heat.engine.resources.software_config import software_config as sc
 from heat.engine import template
@@ -27,6 +29,7 @@ class SoftwareConfigTest(HeatTestCase):
 
     def setUp(self):
         super(SoftwareConfigTest, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', False)
         self.ctx = utils.dummy_context()
         self.properties = {
             'group': 'Heat::Shell',
@@ -106,3 +109,42 @@ class SoftwareConfigTest(HeatTestCase):
             '#!/bin/bash', self.config._resolve_attribute('config'))
         self.software_configs.get.side_effect = HTTPNotFound()
         self.assertEqual('', self.config._resolve_attribute('config'))
+
+
+class SoftwareConfigDirectDBTest(HeatTestCase):
+
+    def setUp(self):
+        super(SoftwareConfigDirectDBTest, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', True)
+        self.ctx = utils.dummy_context()
+        self.stack = parser.Stack(
+            self.ctx, 'software_config_test_stack',
+            template.Template({
+                'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'config_mysql': {
+                        'Type': 'OS::Heat::SoftwareConfig',
+                        'Properties': {
+                            'group': 'Heat::Shell',
+                            'config': '#!/bin/bash'
+                        }
+                    }}}))
+        self.config = self.stack['config_mysql']
+        self.config.heat = mock.Mock(side_effect=AssertionError(
+            'heatclient should not be used'))
+
+    def test_handle_create_delete(self):
+        self.config.handle_create()
+        config_id = self.config.resource_id
+        stored = db_api.software_config_get(self.ctx, config_id)
+        self.assertEqual('Heat::Shell', stored.group)
+        self.assertEqual('#!/bin/bash', stored.config['config'])
+        self.assertEqual(
+            '#!/bin/bash', self.config._resolve_attribute('config'))
+
+        self.config.handle_delete()
+        self.assertRaises(exception.NotFound,
+                          db_api.software_config_get, self.ctx, config_id)
+        self.assertEqual('', self.config._resolve_attribute('config'))
+        # deleting a config which is already gone is not an error
+        self.assertIsNone(self.config.handle_delete())
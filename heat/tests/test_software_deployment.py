@@ -10,6 +10,7 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+from oslo.config import cfg
 
 from heatclient.exc import HTTPNotFound
 
@@ -18,6 +19,7 @@ import mock
 import six
 
 from heat.common import exception
+from heat.db import api as db_api
 from heat.engine import parser
 from heat.engine.resources.software_config import software_deployment as sd
 from heat.engine import rsrc_defn
@@ -97,6 +99,8 @@ class SoftwareDeploymentTest(HeatTestCase):
 
     def setUp(self):
         super(SoftwareDeploymentTest, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', False)
+        cfg.CONF.set_override('signal_wait_recheck_interval', 0)
         self.ctx = utils.dummy_context()
 
     def _create_stack(self, tmpl):
@@ -604,3 +608,107 @@ class SoftwareDeploymentTest(HeatTestCase):
             self.assertIsNone(self.deployment._handle_action(action))
         for action in ('CREATE', 'UPDATE'):
             self.assertIsNotNone(self.deployment._handle_action(action))
+
+
+class SoftwareDeploymentDirectDBTest(HeatTestCase):
+
+    def setUp(self):
+        super(SoftwareDeploymentDirectDBTest, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', True)
+        self.ctx = utils.dummy_context()
+        config = db_api.software_config_create(self.ctx, {
+            'group': 'Test::Group',
+            'name': 'myconfig',
+            'config': {
+                'config': 'the config',
+                'options': {},
+                'inputs': [{'name': 'foo', 'type': 'String',
+                            'default': 'baa'}],
+                'outputs': [{'name': 'result'},
+                            {'name': 'failed', 'error_output': True}],
+            },
+            'tenant': self.ctx.tenant_id})
+        self.config_id = config.id
+        self.stack = parser.Stack(
+            self.ctx, 'software_deployment_test_stack',
+            template.Template({
+                'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'deployment_mysql': {
+                        'Type': 'OS::Heat::SoftwareDeployment',
+                        'Properties': {
+                            'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                            'config': self.config_id,
+                            'input_values': {'foo': 'bar'},
+                        }
+                    }
+                }
+            }),
+            stack_id='42f6f66b-631a-44e7-8d01-e22fb54574a9',
+            stack_user_project_id='65728b74-cfe7-4f17-9c15-11d4f686e591'
+        )
+
+        self.patchobject(sd.SoftwareDeployment, '_create_user')
+        self.patchobject(sd.SoftwareDeployment, '_create_keypair')
+        self.patchobject(sd.SoftwareDeployment, '_delete_user')
+        self.patchobject(sd.SoftwareDeployment, '_delete_signed_url')
+        get_signed_url = self.patchobject(
+            sd.SoftwareDeployment, '_get_signed_url')
+        get_signed_url.return_value = 'http://192.0.2.2/signed_url'
+
+        self.deployment = self.stack['deployment_mysql']
+        self.deployment.heat = mock.Mock(side_effect=AssertionError(
+            'heatclient should not be used'))
+
+    def test_deployment_lifecycle(self):
+        deployment_id = self.deployment.handle_create()
+        self.assertEqual(deployment_id, self.deployment.resource_id)
+
+        stored = db_api.software_deployment_get(self.ctx, deployment_id)
+        self.assertEqual('IN_PROGRESS', stored.status)
+        self.assertEqual('CREATE', stored.action)
+        self.assertNotEqual(self.config_id, stored.config_id)
+        derived_config_id = stored.config_id
+        self.assertEqual('myconfig', stored.config.name)
+        self.assertFalse(
+            self.deployment.check_create_complete(deployment_id))
+
+        self.deployment.handle_signal({'result': 'ok',
+                                       'deploy_status_code': 0})
+        self.assertTrue(
+            self.deployment.check_create_complete(deployment_id))
+        self.assertEqual('ok', self.deployment.FnGetAtt('result'))
+        self.assertEqual(0, self.deployment.FnGetAtt('deploy_status_code'))
+        self.assertRaises(exception.InvalidTemplateAttribute,
+                          self.deployment.FnGetAtt, 'missing')
+
+        self.assertIsNone(self.deployment.handle_delete())
+        self.assertRaises(exception.NotFound,
+                          db_api.software_deployment_get,
+                          self.ctx, deployment_id)
+        self.assertRaises(exception.NotFound,
+                          db_api.software_config_get,
+                          self.ctx, derived_config_id)
+
+    def test_deployment_failed(self):
+        deployment_id = self.deployment.handle_create()
+        self.deployment.handle_signal({'failed': 'out of memory'})
+        err = self.assertRaises(
+            exception.Error,
+            self.deployment.check_create_complete, deployment_id)
+        self.assertIn('failed : out of memory', six.text_type(err))
+
+    def test_handle_update_replaces_derived_config(self):
+        deployment_id = self.deployment.handle_create()
+        derived_config_id = db_api.software_deployment_get(
+            self.ctx, deployment_id).config_id
+
+        self.assertEqual(deployment_id,
+                         self.deployment._handle_action('UPDATE'))
+        stored = db_api.software_deployment_get(self.ctx, deployment_id)
+        self.assertEqual('UPDATE', stored.action)
+        self.assertEqual('IN_PROGRESS', stored.status)
+        self.assertNotEqual(derived_config_id, stored.config_id)
+        self.assertRaises(exception.NotFound,
+                          db_api.software_config_get,
+                          self.ctx, derived_config_id)
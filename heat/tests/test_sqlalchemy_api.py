@@ -21,11 +21,13 @@ import uuid
 import fixtures
 import mock
 import mox
+from oslo.config import cfg
 
 from heat.common import context
 from heat.common import exception
 from heat.common import template_format
 from heat.db.sqlalchemy import api as db_api
+from heat.db.sqlalchemy import models
 from heat.engine.clients.os import glance
 from heat.engine.clients.os import nova
 from heat.engine import environment
@@ -241,14 +243,18 @@ class SqlAlchemyTest(HeatTestCase):
         model = mock.Mock()
         marker = mock.Mock()
 
+        real_marker = ('2014-01-01', 'id')
         mock_query_object = mock.Mock()
-        mock_query_object.get.return_value = 'real_marker'
+        mock_query_object.filter.return_value.first.return_value = real_marker
         mock_query.return_value = mock_query_object
 
         db_api._paginate_query(self.ctx, query, model, marker=marker)
-        mock_query_object.get.assert_called_once_with(marker)
+        mock_query.assert_called_once_with(self.ctx, model.created_at,
+                                           model.id)
+        mock_query_object.filter.assert_called_once_with(model.id == marker)
         args, _ = mock_paginate_query.call_args
-        self.assertIn('real_marker', args)
+        self.assertIn(real_marker, args)
+        query.filter.assert_called_once_with(model.created_at <= '2014-01-01')
 
     @mock.patch.object(db_api.utils, 'paginate_query')
     def test_paginate_query_raises_invalid_sort_key(self, mock_paginate_query):
@@ -1141,6 +1147,25 @@ class DBAPIRawTemplateTest(HeatTestCase):
         self.assertEqual(tp.id, template.id)
         self.assertEqual(tp.template, template.template)
 
+    def test_raw_template_create_shares_files(self):
+        templates = [create_raw_template(self.ctx),
+                     create_raw_template(self.ctx),
+                     create_raw_template(self.ctx, files={'foo': 'baz'})]
+        self.assertEqual(templates[0].files_id, templates[1].files_id)
+        self.assertNotEqual(templates[0].files_id, templates[2].files_id)
+        self.assertEqual({'foo': 'baz'}, templates[2].files)
+
+        # the shared copy is not changed through any one template
+        templates[0].files['foo'] = 'qux'
+        self.assertEqual({'foo': 'bar'}, templates[1].files)
+
+    def test_raw_template_files_deferred(self):
+        tp = create_raw_template(self.ctx)
+        ctx = utils.dummy_context()
+        template = db_api.raw_template_get(ctx, tp.id)
+        self.assertNotIn('files', template.__dict__)
+        self.assertEqual({'foo': 'bar'}, template.files)
+
 
 class DBAPIUserCredsTest(HeatTestCase):
     def setUp(self):
@@ -1435,6 +1460,213 @@ class DBAPIStackTest(HeatTestCase):
         self._deleted_stack_existance(utils.dummy_context(), stacks,
                                       (), (0, 1, 2, 3, 4))
 
+    def test_purge_deleted_child_rows(self):
+        deleted_at = datetime.now() - timedelta(days=2)
+        shared_template = create_raw_template(self.ctx)
+        stacks = [create_stack(self.ctx, shared_template, self.user_creds,
+                               deleted_at=deleted_at),
+                  create_stack(self.ctx, shared_template,
+                               create_user_creds(self.ctx))]
+        for stack in stacks:
+            rs = create_resource(self.ctx, stack)
+            rs.context = self.ctx
+            create_resource_data(self.ctx, rs)
+            create_event(self.ctx, stack_id=stack.id)
+            create_event(self.ctx, stack_id=stack.id,
+                         resource_properties={'stack': stack.id})
+            create_watch_data(self.ctx, create_watch_rule(self.ctx, stack))
+        self.ctx.session.query(models.ResourcePropertiesData).update(
+            {'created_at': deleted_at, 'updated_at': None})
+
+        counts = db_api.purge_deleted(age=1, dry_run=True)
+        self.assertEqual(1, counts['stack'])
+        self.assertEqual(1, counts['resource'])
+        self.assertEqual(1, counts['resource_data'])
+        self.assertEqual(2, counts['event'])
+        # the other properties are also recorded in the other stack's events
+        self.assertEqual(1, counts['resource_properties_data'])
+        self.assertEqual(1, counts['watch_rule'])
+        self.assertEqual(1, counts['watch_data'])
+        self.assertEqual(1, counts['user_creds'])
+        # the template is still used by the other stack
+        self.assertEqual(0, counts['raw_template'])
+        self.assertIsNotNone(db_api.stack_get(self.ctx, stacks[0].id,
+                                              show_deleted=True))
+
+        self.assertEqual(counts, db_api.purge_deleted(age=1))
+        ctx = utils.dummy_context()
+        self.assertIsNone(db_api.stack_get(ctx, stacks[0].id,
+                                           show_deleted=True))
+        self.assertEqual([stacks[1].id],
+                         [r.stack_id for r in db_api.resource_get_all(
+                             ctx)])
+        self.assertEqual([stacks[1].id] * 2,
+                         [e.stack_id for e in db_api.event_get_all(
+                             ctx)])
+        self.assertEqual(
+            [{'name': 'foo'}, {'stack': stacks[1].id}],
+            [e.resource_properties for e in db_api.event_get_all(ctx)])
+        self.assertEqual([stacks[1].id],
+                         [w.stack_id for w in db_api.watch_rule_get_all(
+                             ctx)])
+        self.assertEqual(1, len(db_api.watch_data_get_all(ctx)))
+        self.assertIsNotNone(db_api.raw_template_get(ctx,
+                                                     shared_template.id))
+
+    def test_purge_deleted_recent_properties(self):
+        deleted_at = datetime.now() - timedelta(days=2)
+        stack = create_stack(self.ctx, self.template, self.user_creds,
+                             deleted_at=deleted_at)
+        event = create_event(self.ctx, stack_id=stack.id)
+        self.ctx.session.query(models.ResourcePropertiesData).update(
+            {'created_at': deleted_at, 'updated_at': None})
+        # found for reuse by an event that is still being created
+        db_api._resource_properties_data(self.ctx, {'name': 'foo'})
+
+        counts = db_api.purge_deleted(age=1)
+        self.assertEqual(1, counts['event'])
+        self.assertEqual(0, counts['resource_properties_data'])
+
+        ctx = utils.dummy_context()
+        new_event = create_event(ctx)
+        self.assertEqual(event.rsrc_prop_data_id, new_event.rsrc_prop_data_id)
+
+    def test_purge_deleted_properties_of_batch(self):
+        deleted_at = datetime.now() - timedelta(days=2)
+        stack = create_stack(self.ctx, self.template, self.user_creds,
+                             deleted_at=deleted_at)
+        create_event(self.ctx, stack_id=stack.id)
+        # not recorded by any of the purged events
+        other = db_api._resource_properties_data(self.ctx, {'other': 1})
+        self.ctx.session.query(models.ResourcePropertiesData).update(
+            {'created_at': deleted_at, 'updated_at': None})
+
+        counts = db_api.purge_deleted(age=1)
+        self.assertEqual(1, counts['resource_properties_data'])
+        self.assertEqual(
+            [other.id],
+            [p.id for p in self.ctx.session.query(
+                models.ResourcePropertiesData)])
+
+    def test_purge_deleted_utc(self):
+        timeutils.set_time_override(datetime(2014, 8, 1, 12, 0, 0))
+        self.addCleanup(timeutils.clear_time_override)
+        stacks = [create_stack(self.ctx, self.template, self.user_creds,
+                               deleted_at=datetime(2014, 8, 1, 10, 30, 0)),
+                  create_stack(self.ctx, self.template, self.user_creds,
+                               deleted_at=datetime(2014, 8, 1, 11, 30, 0))]
+
+        db_api.purge_deleted(age=1, granularity='hours')
+        self._deleted_stack_existance(utils.dummy_context(), stacks,
+                                      (1,), (0,))
+
+    def test_purge_deleted_template_files(self):
+        deleted_at = datetime.now() - timedelta(days=2)
+        templates = [create_raw_template(self.ctx),
+                     create_raw_template(self.ctx),
+                     create_raw_template(self.ctx, files={'foo': 'baz'})]
+        create_stack(self.ctx, templates[0], self.user_creds)
+        for template in templates[1:]:
+            create_stack(self.ctx, template, create_user_creds(self.ctx),
+                         deleted_at=deleted_at)
+        # not used by any of the purged templates
+        other = db_api._raw_template_files(self.ctx, {'other': 'files'})
+        self.ctx.session.query(models.RawTemplateFiles).update(
+            {'created_at': deleted_at, 'updated_at': None})
+
+        counts = db_api.purge_deleted(age=1, dry_run=True)
+        self.assertEqual(2, counts['raw_template'])
+        # the other files are still used by the remaining template
+        self.assertEqual(1, counts['raw_template_files'])
+
+        self.assertEqual(counts, db_api.purge_deleted(age=1))
+        ctx = utils.dummy_context()
+        self.assertEqual({'foo': 'bar'},
+                         db_api.raw_template_get(ctx, templates[0].id).files)
+        self.assertEqual(
+            sorted([templates[0].files_id, other.id]),
+            sorted(f.id for f in self.ctx.session.query(
+                models.RawTemplateFiles)))
+
+    def test_purge_deleted_recent_template_files(self):
+        deleted_at = datetime.now() - timedelta(days=2)
+        template = create_raw_template(self.ctx)
+        create_stack(self.ctx, template, self.user_creds,
+                     deleted_at=deleted_at)
+        self.ctx.session.query(models.RawTemplateFiles).update(
+            {'created_at': deleted_at, 'updated_at': None})
+        # found for reuse by a template that is still being created
+        files = db_api._raw_template_files(self.ctx, {'foo': 'bar'})
+
+        counts = db_api.purge_deleted(age=1)
+        self.assertEqual(1, counts['raw_template'])
+        self.assertEqual(0, counts['raw_template_files'])
+
+        ctx = utils.dummy_context()
+        new_template = create_raw_template(ctx)
+        self.assertEqual(files.id, new_template.files_id)
+
+    def test_purge_deleted_deployments(self):
+        deleted_at = datetime.now() - timedelta(days=2)
+        stacks = [create_stack(self.ctx, self.template, self.user_creds,
+                               deleted_at=deleted_at),
+                  create_stack(self.ctx, self.template, self.user_creds)]
+
+        def deploy(stack, server_id, config_id=None):
+            if config_id is None:
+                config_id = db_api.software_config_create(
+                    self.ctx, {'name': 'derived',
+                               'tenant': self.ctx.tenant_id}).id
+            sd = db_api.software_deployment_create(
+                self.ctx, {'config_id': config_id,
+                           'server_id': server_id,
+                           'tenant': self.ctx.tenant_id})
+            create_resource(self.ctx, stack, name='deployment',
+                            nova_instance=sd.id)
+            return sd
+
+        # a server retained by the deleted stack, and deployed to by both
+        server_id = str(uuid.uuid4())
+        create_resource(self.ctx, stacks[0], nova_instance=server_id)
+        purged = deploy(stacks[0], server_id)
+        live = deploy(stacks[1], server_id)
+        # a derived config also used by the deployment of the other stack
+        shared = deploy(stacks[0], server_id, live.config_id)
+
+        counts = db_api.purge_deleted(age=1, dry_run=True)
+        self.assertEqual(2, counts['software_deployment'])
+        self.assertEqual(1, counts['software_config'])
+
+        self.assertEqual(counts, db_api.purge_deleted(age=1))
+        ctx = utils.dummy_context()
+        for sd in (purged, shared):
+            self.assertRaises(exception.NotFound,
+                              db_api.software_deployment_get, ctx, sd.id)
+        self.assertRaises(exception.NotFound,
+                          db_api.software_config_get, ctx, purged.config_id)
+        self.assertEqual(live.config_id,
+                         db_api.software_deployment_get(
+                             ctx, live.id).config_id)
+        self.assertIsNotNone(db_api.software_config_get(ctx, live.config_id))
+
+    def test_purge_deleted_batches(self):
+        deleted_at = datetime.now() - timedelta(days=2)
+        stacks = [create_stack(self.ctx, create_raw_template(self.ctx),
+                               self.user_creds, deleted_at=deleted_at)
+                  for i in range(5)]
+        progress = []
+
+        counts = db_api.purge_deleted(
+            age=1, batch_size=2,
+            progress=lambda c: progress.append(c['stack']))
+        self.assertEqual([2, 4, 5], progress)
+        self.assertEqual(5, counts['raw_template'])
+        self.assertEqual(1, counts['user_creds'])
+        self._deleted_stack_existance(utils.dummy_context(), stacks,
+                                      (), range(5))
+
+        self.assertEqual({}, db_api.purge_deleted(age=1))
+
     def _deleted_stack_existance(self, ctx, stacks, existing, deleted):
         for s in existing:
             self.assertIsNotNone(db_api.stack_get(ctx, stacks[s].id,
@@ -1477,6 +1709,39 @@ class DBAPIResourceTest(HeatTestCase):
         self.assertRaises(exception.NotFound, db_api.resource_get,
                           self.ctx, UUID2)
 
+    def test_resource_update(self):
+        res = create_resource(self.ctx, self.stack)
+        db_api.resource_update(self.ctx, res.id,
+                               {'action': 'UPDATE',
+                                'status_reason': 'x' * 300,
+                                'rsrc_metadata': {'foo': 'bar'}})
+        # the session's copy is kept up to date without reloading it
+        self.assertEqual('UPDATE', res.action)
+
+        ret_res = db_api.resource_get(utils.dummy_context(), res.id)
+        self.assertEqual('UPDATE', ret_res.action)
+        self.assertEqual('x' * 255, ret_res.status_reason)
+        self.assertEqual({'foo': 'bar'}, ret_res.rsrc_metadata)
+        self.assertEqual('test_resource_name', ret_res.name)
+
+        self.assertRaises(exception.NotFound, db_api.resource_update,
+                          self.ctx, UUID2, {'action': 'UPDATE'})
+
+    def test_resource_create_all(self):
+        values = [{'name': name, 'action': 'INIT', 'status': 'COMPLETE',
+                   'rsrc_metadata': {}, 'stack_id': self.stack.id}
+                  for name in ('res1', 'res2')]
+        resources = db_api.resource_create_all(self.ctx, values)
+        self.assertEqual(['res1', 'res2'], [r.name for r in resources])
+        self.assertEqual(2, len(set(r.id for r in resources)))
+
+        ret_res = db_api.resource_get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(['res1', 'res2'], sorted(ret_res))
+        for res in resources:
+            self.assertEqual(res.id, ret_res[res.name].id)
+            self.assertEqual('INIT', ret_res[res.name].action)
+            self.assertIsNotNone(ret_res[res.name].created_at)
+
     def test_resource_get_by_name_and_stack(self):
         create_resource(self.ctx, self.stack)
 
@@ -1534,6 +1799,21 @@ class DBAPIResourceTest(HeatTestCase):
         self.assertRaises(exception.NotFound, db_api.resource_get_all_by_stack,
                           self.ctx, self.stack2.id)
 
+    def test_resource_metadata_set_all(self):
+        res1 = create_resource(self.ctx, self.stack, name='res1')
+        res2 = create_resource(self.ctx, self.stack, name='res2')
+        res3 = create_resource(self.ctx, self.stack, name='res3')
+
+        db_api.resource_metadata_set_all(self.ctx, {res1.id: {'a': 1},
+                                                    res2.id: {'b': 2}})
+
+        for res, metadata in ((res1, {'a': 1}), (res2, {'b': 2})):
+            ret_res = db_api.resource_get(self.ctx, res.id)
+            ret_res.refresh()
+            self.assertEqual(metadata, ret_res.rsrc_metadata)
+        ret_res = db_api.resource_get(self.ctx, res3.id)
+        self.assertEqual(res3.rsrc_metadata, ret_res.rsrc_metadata)
+
     def test_resource_status_reason_truncate(self):
         res = create_resource(self.ctx, self.stack,
                               status_reason='a' * 1024)
@@ -1600,6 +1880,83 @@ class DBAPIStackLockTest(HeatTestCase):
         observed = db_api.stack_lock_release(self.stack.id, UUID2)
         self.assertTrue(observed)
 
+    def test_stack_lock_release_dead_engines(self):
+        timeutils.set_time_override(datetime(2014, 8, 1, 12, 0, 0))
+        self.addCleanup(timeutils.clear_time_override)
+        db_now = self.patchobject(db_api, '_db_now')
+        db_now.side_effect = lambda session: timeutils.utcnow()
+        stack2 = create_stack(self.ctx, self.template, self.user_creds)
+        stack3 = create_stack(self.ctx, self.template, self.user_creds)
+        db_api.engine_heartbeat_update(UUID1, 'host1')
+        db_api.engine_heartbeat_update(UUID2, 'host2')
+        db_api.stack_lock_create(self.stack.id, UUID1)
+        db_api.stack_lock_create(stack2.id, UUID2)
+        # no heartbeat recorded for this engine
+        db_api.stack_lock_create(stack3.id, UUID3)
+
+        timeutils.advance_time_seconds(30)
+        db_api.engine_heartbeat_update(UUID2, 'host2')
+        timeutils.advance_time_seconds(31)
+
+        self.assertEqual(1, db_api.stack_lock_release_dead_engines(60))
+        self.assertIsNone(db_api.stack_lock_get_engine_id(self.stack.id))
+        self.assertEqual(UUID2, db_api.stack_lock_get_engine_id(stack2.id))
+        self.assertEqual(UUID3, db_api.stack_lock_get_engine_id(stack3.id))
+        self.assertIsNone(db_api.engine_heartbeat_alive(UUID1, 60))
+        self.assertEqual(0, db_api.stack_lock_release_dead_engines(60))
+
+
+class DBAPIEngineHeartbeatTest(HeatTestCase):
+    def setUp(self):
+        super(DBAPIEngineHeartbeatTest, self).setUp()
+        # the time according to the database server
+        self.db_now = datetime(2014, 8, 1, 12, 0, 0)
+        self.real_db_now = db_api._db_now
+        db_now = self.patchobject(db_api, '_db_now')
+        db_now.side_effect = lambda session: self.db_now
+
+    def test_engine_heartbeat_alive(self):
+        self.assertIsNone(db_api.engine_heartbeat_alive(UUID1, 60))
+        db_api.engine_heartbeat_update(UUID1, 'host1')
+        self.assertTrue(db_api.engine_heartbeat_alive(UUID1, 60))
+
+        self.db_now += timedelta(seconds=61)
+        self.assertFalse(db_api.engine_heartbeat_alive(UUID1, 60))
+
+        db_api.engine_heartbeat_update(UUID1, 'host1')
+        self.assertTrue(db_api.engine_heartbeat_alive(UUID1, 60))
+
+    def test_engine_heartbeat_get_all_alive(self):
+        db_api.engine_heartbeat_update(UUID2, 'host2')
+        self.db_now += timedelta(seconds=30)
+        db_api.engine_heartbeat_update(UUID1, 'host1')
+        db_api.engine_heartbeat_update(UUID3, 'host3')
+        self.assertEqual(
+            [(UUID1, 'host1'), (UUID2, 'host2'), (UUID3, 'host3')],
+            [(hb.engine_id, hb.hostname)
+             for hb in db_api.engine_heartbeat_get_all_alive(60)])
+
+        self.db_now += timedelta(seconds=31)
+        self.assertEqual(
+            [UUID1, UUID3],
+            [hb.engine_id
+             for hb in db_api.engine_heartbeat_get_all_alive(60)])
+
+    def test_engine_heartbeat_ignores_host_clock(self):
+        timeutils.set_time_override(datetime(2014, 8, 1, 11, 0, 0))
+        self.addCleanup(timeutils.clear_time_override)
+        db_api.engine_heartbeat_update(UUID1, 'host1')
+
+        # checked from a host whose clock is an hour ahead
+        timeutils.set_time_override(datetime(2014, 8, 1, 13, 0, 0))
+        self.assertTrue(db_api.engine_heartbeat_alive(UUID1, 60))
+        self.assertEqual(0, db_api.stack_lock_release_dead_engines(60))
+
+    def test_db_now(self):
+        now = self.real_db_now(db_api.get_session())
+        self.assertIsInstance(now, datetime)
+        self.assertTrue(abs(now - datetime.utcnow()) < timedelta(minutes=1))
+
 
 class DBAPIResourceDataTest(HeatTestCase):
     def setUp(self):
@@ -1651,6 +2008,17 @@ class DBAPIResourceDataTest(HeatTestCase):
                           self.ctx, self.resource.id, 'test_resource_key')
         self.assertIsNotNone(res_data)
 
+    def test_resource_data_set_existing(self):
+        create_resource_data(self.ctx, self.resource)
+        res_data = db_api.resource_data_get_by_key(self.ctx, self.resource.id,
+                                                   'test_resource_key')
+        create_resource_data(self.ctx, self.resource, value='foo',
+                             redact=True)
+        self.assertEqual('foo', db_api.resource_data_get(self.resource,
+                                                         'test_resource_key'))
+        self.assertEqual(1, len(db_api.resource_data_get_all(self.resource)))
+        self.assertTrue(res_data.redact)
+
 
 class DBAPIEventTest(HeatTestCase):
     def setUp(self):
@@ -1671,6 +2039,41 @@ class DBAPIEventTest(HeatTestCase):
         self.assertEqual('create_complete', ret_event.resource_status_reason)
         self.assertEqual({'name': 'foo'}, ret_event.resource_properties)
 
+    def test_event_create_shares_properties(self):
+        events = [create_event(self.ctx),
+                  create_event(self.ctx),
+                  create_event(self.ctx, resource_properties={'name': 'bar'})]
+        self.assertEqual(events[0].rsrc_prop_data_id,
+                         events[1].rsrc_prop_data_id)
+        self.assertNotEqual(events[0].rsrc_prop_data_id,
+                            events[2].rsrc_prop_data_id)
+        self.assertFalse(events[0].rsrc_prop_data.compressed)
+        self.assertEqual({'name': 'bar'}, events[2].resource_properties)
+
+    def test_event_create_purged_properties(self):
+        data = db_api._resource_properties_data(self.ctx, {'name': 'foo'})
+        # purged after it was found for reuse
+        self.ctx.session.query(models.ResourcePropertiesData).delete()
+        self.assertIsNone(db_api._reuse_shared(
+            self.ctx.session, models.ResourcePropertiesData, data))
+
+        event = create_event(self.ctx)
+        ctx = utils.dummy_context()
+        self.assertEqual({'name': 'foo'},
+                         db_api.event_get(ctx, event.id).resource_properties)
+
+    def test_event_create_compressed_properties(self):
+        cfg.CONF.set_override('compress_event_properties', True)
+        small = create_event(self.ctx)
+        properties = {'user_data': 'x' * 1000}
+        large = create_event(self.ctx, resource_properties=properties)
+        self.assertFalse(small.rsrc_prop_data.compressed)
+        self.assertTrue(large.rsrc_prop_data.compressed)
+
+        ctx = utils.dummy_context()
+        ret_event = db_api.event_get(ctx, large.id)
+        self.assertEqual(properties, ret_event.resource_properties)
+
     def test_event_get_all(self):
         self.stack1 = create_stack(self.ctx, self.template, self.user_creds,
                                    tenant='tenant1')
@@ -1749,6 +2152,29 @@ class DBAPIEventTest(HeatTestCase):
         events = db_api.event_get_all_by_stack(self.ctx, self.stack2.id)
         self.assertEqual(1, len(events))
 
+    def test_event_get_all_detail(self):
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        for i in range(2):
+            create_event(self.ctx, stack_id=stack.id,
+                         resource_properties={'index': i})
+
+        ctx = utils.dummy_context()
+        events = db_api.event_get_all_by_stack(ctx, stack.id)
+        self.assertNotIn('rsrc_prop_data', events[0].__dict__)
+
+        ctx = utils.dummy_context()
+        events = db_api.event_get_all_by_stack(ctx, stack.id, detail=True)
+        self.assertEqual(2, len(events))
+        for event in events:
+            # loaded along with the events rather than one at a time
+            self.assertIn('rsrc_prop_data', event.__dict__)
+
+        ctx = utils.dummy_context(tenant_id=stack.tenant)
+        events = db_api.event_get_all_by_tenant(ctx, detail=True)
+        self.assertEqual(2, len(events))
+        for event in events:
+            self.assertIn('rsrc_prop_data', event.__dict__)
+
     def test_event_count_all_by_stack(self):
         self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
         self.stack2 = create_stack(self.ctx, self.template, self.user_creds)
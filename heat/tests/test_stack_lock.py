@@ -13,9 +13,11 @@
 
 import mock
 
+from oslo.config import cfg
 from oslo import messaging
 
 from heat.common import exception
+from heat.common import messaging as rpc_messaging
 from heat.db import api as db_api
 from heat.engine import stack_lock
 from heat.tests.common import HeatTestCase
@@ -218,3 +220,43 @@ class StackLockTest(HeatTestCase):
                 raise self.TestThreadLockException
         self.assertRaises(self.TestThreadLockException, check_thread_lock)
         assert not db_api.stack_lock_release.called
+
+    def test_engine_alive_heartbeat(self):
+        self.patchobject(db_api, 'engine_heartbeat_alive').return_value = True
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+
+        self.assertTrue(stack_lock.StackLock.engine_alive(self.context,
+                                                          self.engine_id))
+        db_api.engine_heartbeat_alive.assert_called_once_with(self.engine_id,
+                                                              60)
+        self.assertFalse(get_client.called)
+
+    def test_engine_dead_heartbeat(self):
+        self.patchobject(db_api, 'engine_heartbeat_alive').return_value = False
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+
+        self.assertFalse(stack_lock.StackLock.engine_alive(self.context,
+                                                           self.engine_id))
+        self.assertFalse(get_client.called)
+
+    def test_engine_alive_no_heartbeat(self):
+        self.patchobject(db_api, 'engine_heartbeat_alive').return_value = None
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+        prepare = get_client.return_value.prepare
+        prepare.return_value.call.return_value = True
+
+        self.assertTrue(stack_lock.StackLock.engine_alive(self.context,
+                                                          self.engine_id))
+        prepare.return_value.call.assert_called_once_with(self.context,
+                                                          'listening')
+
+    def test_engine_alive_heartbeat_disabled(self):
+        cfg.CONF.set_override('engine_heartbeat_interval', 0)
+        heartbeat = self.patchobject(db_api, 'engine_heartbeat_alive')
+        get_client = self.patchobject(rpc_messaging, 'get_rpc_client')
+        prepare = get_client.return_value.prepare
+        prepare.return_value.call.side_effect = messaging.MessagingTimeout
+
+        self.assertFalse(stack_lock.StackLock.engine_alive(self.context,
+                                                           self.engine_id))
+        self.assertFalse(heartbeat.called)
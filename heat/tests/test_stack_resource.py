@@ -16,14 +16,18 @@ import uuid
 
 import mock
 import mox
+from oslo.config import cfg
 
 from heat.common import exception
 from heat.common import template_format
+from heat.db import api as db_api
 from heat.engine import environment
 from heat.engine import parser
 from heat.engine import resource
 from heat.engine import scheduler
+from heat.engine import signal_waiter
 from heat.engine import stack_resource
+from heat.rpc import client as rpc_client
 from heat.tests.common import HeatTestCase
 from heat.tests import generic_resource as generic_rsrc
 from heat.tests import utils
@@ -623,3 +627,124 @@ class StackResourceTest(HeatTestCase):
         self.m.VerifyAll()
         # Restore state_set to let clean up proceed
         self.stack.state_set = st_set
+
+
+class StackResourceDispatchTest(HeatTestCase):
+
+    def setUp(self):
+        super(StackResourceDispatchTest, self).setUp()
+        resource._register_class('some_magic_type',
+                                 MyStackResource)
+        resource._register_class('GenericResource',
+                                 generic_rsrc.GenericResource)
+        t = parser.Template({'HeatTemplateFormatVersion': '2012-12-12',
+                             'Resources':
+                             {'provider_resource': ws_res_snippet}})
+        self.parent_stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                                         t, stack_id=str(uuid.uuid4()),
+                                         user_creds_id='uc123')
+        resource_defns = t.resource_definitions(self.parent_stack)
+        self.parent_resource = MyStackResource(
+            'test', resource_defns['provider_resource'], self.parent_stack)
+        self.simple_template = template_format.parse(simple_template)
+        cfg.CONF.set_override('signal_wait_recheck_interval', 30)
+        self.cast = self.patchobject(rpc_client.EngineClient,
+                                     'nested_stack_action')
+
+    def _finish(self, stack, action, status, reason=''):
+        '''Complete a dispatched action, as the other engine would.'''
+        db_api.stack_get(stack.context, stack.id).update_and_save(
+            {'action': action, 'status': status, 'status_reason': reason})
+        signal_waiter.notify_local(stack.id)
+
+    def _create(self):
+        self.parent_resource.create_with_template(
+            self.simple_template, {}).run_to_completion()
+        return self.parent_resource.nested()
+
+    def test_create_with_template_dispatch(self):
+        cfg.CONF.set_override('nested_stack_rpc_dispatch', True)
+        dispatch = self.parent_resource.create_with_template(
+            self.simple_template, {})
+        self.assertIsInstance(dispatch, stack_resource.NestedStackDispatch)
+
+        nested = self.parent_resource.nested()
+        self.assertEqual((nested.CREATE, nested.IN_PROGRESS), nested.state)
+        self.cast.assert_called_once_with(
+            self.parent_resource.context, dict(nested.identifier()),
+            nested.CREATE, 'test')
+
+        self.assertFalse(self.parent_resource.check_create_complete(dispatch))
+        self._finish(nested, nested.CREATE, nested.COMPLETE)
+        self.parent_resource._nested = None
+        self.assertTrue(self.parent_resource.check_create_complete(dispatch))
+        self.assertTrue(self.parent_resource.check_create_complete(dispatch))
+
+        nested = self.parent_resource.nested()
+        self.assertEqual((nested.CREATE, nested.COMPLETE), nested.state)
+
+    def test_create_with_template_dispatch_failed(self):
+        cfg.CONF.set_override('nested_stack_rpc_dispatch', True)
+        dispatch = self.parent_resource.create_with_template(
+            self.simple_template, {})
+        nested = self.parent_resource.nested()
+
+        self._finish(nested, nested.CREATE, nested.FAILED, 'Boom')
+        ex = self.assertRaises(exception.Error,
+                               self.parent_resource.check_create_complete,
+                               dispatch)
+        self.assertEqual('Boom', six.text_type(ex))
+
+    def test_dispatch_waits_for_notification(self):
+        cfg.CONF.set_override('nested_stack_rpc_dispatch', True)
+        dispatch = self.parent_resource.create_with_template(
+            self.simple_template, {})
+        self.assertFalse(dispatch.step())
+
+        stack_get = self.patchobject(db_api, 'stack_get')
+        self.assertFalse(dispatch.step())
+        self.assertFalse(stack_get.called)
+
+    def test_update_with_template_dispatch(self):
+        nested = self._create()
+        cfg.CONF.set_override('nested_stack_rpc_dispatch', True)
+        self.parent_stack.t.files['foo'] = 'bar'
+
+        templ = template_format.parse(param_template)
+        dispatch = self.parent_resource.update_with_template(
+            templ, {'KeyName': 'key'}, timeout_mins=10)
+        self.assertIsInstance(dispatch, stack_resource.NestedStackDispatch)
+        self.assertEqual((nested.UPDATE, nested.IN_PROGRESS), nested.state)
+        self.cast.assert_called_once_with(
+            self.parent_resource.context, dict(nested.identifier()),
+            nested.UPDATE, 'test', template=templ,
+            params={'parameters': {'KeyName': 'key'},
+                    'resource_registry': {'resources': {}}},
+            files={'foo': 'bar'}, timeout_mins=10)
+
+        self._finish(nested, nested.UPDATE, nested.COMPLETE)
+        dispatch.run_to_completion(wait_time=None)
+        self.assertTrue(self.parent_resource.check_update_complete(dispatch))
+
+    def test_update_with_template_dispatch_state_err(self):
+        nested = self._create()
+        nested.state_set(nested.CREATE, nested.FAILED, '')
+        cfg.CONF.set_override('nested_stack_rpc_dispatch', True)
+
+        self.assertRaises(exception.Error,
+                          self.parent_resource.update_with_template,
+                          self.simple_template, {})
+        self.assertFalse(self.cast.called)
+
+    def test_delete_nested_dispatch(self):
+        nested = self._create()
+        cfg.CONF.set_override('nested_stack_rpc_dispatch', True)
+
+        dispatch = self.parent_resource.delete_nested()
+        self.cast.assert_called_once_with(
+            self.parent_resource.context, dict(nested.identifier()),
+            nested.DELETE, 'test')
+
+        self._finish(nested, nested.DELETE, nested.COMPLETE)
+        db_api.stack_delete(nested.context, nested.id)
+        self.assertTrue(self.parent_resource.check_delete_complete(dispatch))
@@ -12,6 +12,7 @@
 #    under the License.
 
 import mock
+from oslo.config import cfg
 
 from heat.engine import parser
 from heat.engine.resources.software_config import structured_config as sc
@@ -36,6 +37,7 @@ class StructuredConfigTestJSON(HeatTestCase):
 
     def setUp(self):
         super(StructuredConfigTestJSON, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', False)
         self.ctx = utils.dummy_context()
         self.properties = {
             'config': {'foo': 'bar'}
@@ -81,6 +83,7 @@ class StructuredDeploymentDerivedTest(HeatTestCase):
 
     def setUp(self):
         super(StructuredDeploymentDerivedTest, self).setUp()
+        cfg.CONF.set_override('software_config_direct_db', False)
         self.ctx = utils.dummy_context()
         props = {
             'input_values': {'bar': 'baz'},
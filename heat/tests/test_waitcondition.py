@@ -18,6 +18,7 @@ import six
 import time
 import uuid
 
+import mock
 import mox
 from oslo.config import cfg
 
@@ -135,6 +136,7 @@ class WaitConditionTest(HeatTestCase):
 
     def setUp(self):
         super(WaitConditionTest, self).setUp()
+        cfg.CONF.set_override('signal_wait_recheck_interval', 0)
         cfg.CONF.set_default('heat_waitcondition_server_url',
                              'http://server.test:8000/v1/waitcondition')
         self.stub_keystoneclient()
@@ -310,6 +312,31 @@ class WaitConditionTest(HeatTestCase):
         self.assertEqual(u'{"123": "foo", "456": "dog"}', wc_att)
         self.m.VerifyAll()
 
+    def test_wait_woken_by_signal(self):
+        cfg.CONF.set_override('signal_wait_recheck_interval', 3600)
+        self.stack = self.create_stack(stub=False, stub_status=False)
+
+        handle = self.stack['WaitHandle']
+        scheduler.TaskRunner(handle.create)()
+        get_status = mock.Mock(wraps=handle.get_status)
+        handle.get_status = get_status
+
+        rsrc = self.stack['WaitForTheHandle']
+        runner = scheduler.TaskRunner(rsrc._wait, handle)
+        runner.start()
+        self.assertFalse(runner.step())
+        self.assertEqual(1, get_status.call_count)
+
+        # without a signal the handle status is not read again
+        for i in range(3):
+            self.assertFalse(runner.step())
+        self.assertEqual(1, get_status.call_count)
+
+        handle.handle_signal({'Data': 'foo', 'Reason': 'bar',
+                              'Status': 'SUCCESS', 'UniqueId': '123'})
+        self.assertTrue(runner.step())
+        self.assertEqual(2, get_status.call_count)
+
     def test_validate_handle_url_bad_stackid(self):
         self.m.ReplayAll()
 
@@ -571,6 +598,7 @@ class WaitConditionHandleTest(HeatTestCase):
 class WaitConditionUpdateTest(HeatTestCase):
     def setUp(self):
         super(WaitConditionUpdateTest, self).setUp()
+        cfg.CONF.set_override('signal_wait_recheck_interval', 0)
         cfg.CONF.set_default('heat_waitcondition_server_url',
                              'http://server.test:8000/v1/waitcondition')
         self.stub_keystoneclient()
@@ -761,6 +789,7 @@ class HeatWaitConditionTest(HeatTestCase):
 
     def setUp(self):
         super(HeatWaitConditionTest, self).setUp()
+        cfg.CONF.set_override('signal_wait_recheck_interval', 0)
         self.stub_keystoneclient()
         self.tenant_id = 'test_tenant'
 